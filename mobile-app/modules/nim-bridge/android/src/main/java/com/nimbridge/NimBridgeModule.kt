@@ -4,6 +4,9 @@
 
 package com.nimbridge
 
+import com.facebook.react.bridge.Arguments
+import com.facebook.react.bridge.ReadableArray
+import com.facebook.react.bridge.WritableArray
 import com.facebook.react.bridge.ReactApplicationContext
 import com.facebook.react.module.annotations.ReactModule
 import com.nimbridge.NativeNimBridgeSpec
@@ -24,8 +27,6 @@ class NimBridgeModule(reactContext: ReactApplicationContext) : NativeNimBridgeSp
             }
         }
 
-        @JvmStatic
-        private external fun nativeHelloWorld(): String
         @JvmStatic
         private external fun nativeAddNumbers(a: Int, b: Int): Int
         @JvmStatic
@@ -41,20 +42,12 @@ class NimBridgeModule(reactContext: ReactApplicationContext) : NativeNimBridgeSp
         @JvmStatic
         private external fun nativeMobileValidateEmail(email: String): Int
         @JvmStatic
-        private external fun nativeGetNimCoreVersion(): String
+        private external fun nativeMobileIsPrimeMany(n: IntArray): ByteArray
     }
     
     override fun getName(): String = NAME
 
 
-    override fun helloWorld(): String {
-        return try {
-            nativeHelloWorld()
-        } catch (e: Exception) {
-            "Error: ${e.message}"
-        }
-    }
-
     override fun addNumbers(a: Double, b: Double): Double {
         return try {
             nativeAddNumbers(a.toInt(), b.toInt()).toDouble()
@@ -87,6 +80,19 @@ class NimBridgeModule(reactContext: ReactApplicationContext) : NativeNimBridgeSp
         }
     }
 
+    override fun isPrimeMany(n: ReadableArray): WritableArray {
+        return try {
+            val result = nativeMobileIsPrimeMany(IntArray(n.size()) { n.getDouble(it).toInt() })
+            val array = Arguments.createArray()
+            for (value in result) {
+                array.pushInt(value.toInt())
+            }
+            array
+        } catch (e: Exception) {
+            Arguments.createArray()
+        }
+    }
+
     override fun factorize(n: Double): String {
         return try {
             nativeMobileFactorize(n.toInt())
@@ -110,12 +116,4 @@ class NimBridgeModule(reactContext: ReactApplicationContext) : NativeNimBridgeSp
             false
         }
     }
-
-    override fun getVersion(): String {
-        return try {
-            nativeGetNimCoreVersion()
-        } catch (e: Exception) {
-            "Error: ${e.message}"
-        }
-    }
 }
\ No newline at end of file
@@ -1,3 +1,7 @@
-export { default } from './NativeNimBridge';
-export { default as NimCore } from './NativeNimBridge';
-export type { Spec as NimBridge } from './NativeNimBridge';
+import { NimCore } from './NimBridge';
+
+// The facade, not the raw TurboModule: folded constants, typed handles and
+// vectorized companions are only callable through it
+export default NimCore;
+export * from './NimBridge';
+export type NimBridge = typeof NimCore;
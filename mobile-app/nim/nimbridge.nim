@@ -8,12 +8,27 @@ type
     email: string
     active: bool
 
+when defined(nimBridgeTelemetry):
+  # Implemented by the bridge (NimBridgeMemory.h): per-export allocation telemetry
+  proc nimBridgeTrackAlloc(p: pointer, size: csize_t) {.importc.}
+  proc nimBridgeTrackFree(p: pointer) {.importc.}
+
 proc allocCString(s: string): cstring =
   ## Allocates a new C string that persists beyond function scope
   let cstr = cast[cstring](alloc0(s.len + 1))
   copyMem(cstr, s.cstring, s.len)
+  when defined(nimBridgeTelemetry):
+    nimBridgeTrackAlloc(cast[pointer](cstr), csize_t(s.len + 1))
   return cstr
 
+proc nimBridgeScratch(size: csize_t): cstring {.importc.}
+
+proc scratchCString(s: string): cstring =
+  ## Copies into the bridge's per-thread scratch buffer. The result is only
+  ## valid until the next @scratch return on the same thread.
+  result = nimBridgeScratch(csize_t(s.len + 1))
+  copyMem(result, s.cstring, s.len + 1)
+
 proc helloWorld*(): cstring {.exportc.} =
   ## @literal
   return "Hello from Nim!"
@@ -27,6 +42,8 @@ proc getSystemInfo*(): cstring {.exportc.} =
   return allocCString(info)
 
 proc mobileFibonacci*(n: cint): int64 {.exportc.} =
+  ## @precompute(0..92)
+  # Summed in int64: Nim's int is 32 bits on armeabi-v7a and x86
   if n <= 1: return n.int64
   var a: int64 = 0
   var b: int64 = 1
@@ -37,13 +54,21 @@ proc mobileFibonacci*(n: cint): int64 {.exportc.} =
   return b
 
 proc mobileIsPrime*(n: cint): cint {.exportc.} =
-  if n <= 1: return 0
-  for i in 2..<n:
-    if n mod i == 0: return 0
+  ## @boolean
+  ## @vectorize
+  ## @precompute(0..<1024)
+  if n < 2: return 0
+  # int64: d * d must not overflow a 32-bit int near high(cint)
+  let m = n.int64
+  var d: int64 = 2
+  while d * d <= m:
+    if m mod d == 0: return 0
+    inc d
   return 1
 
 proc mobileFactorize*(n: cint): cstring {.exportc.} =
-  ## @allocated
+  ## @scratch
+  # Prime factors by trial division up to sqrt(n), e.g. "@[2, 2, 3]" for 12
   var factors: seq[int] = @[]
   var num = n.int
   var d = 2
@@ -54,14 +79,15 @@ proc mobileFactorize*(n: cint): cstring {.exportc.} =
     d += 1
   if num > 1:
     factors.add(num)
-  return allocCString($factors)
+  return scratchCString($factors)
 
 proc mobileCreateUser*(id: cint, name: cstring, email: cstring): cstring {.exportc.} =
-  ## @allocated
+  ## @scratch
   let user = User(id: id.int, name: $name, email: $email, active: true)
-  return allocCString(Json.encode(user))
+  return scratchCString(Json.encode(user))
 
 proc mobileValidateEmail*(email: cstring): cint {.exportc.} =
+  ## @boolean
   let emailStr = $email
   if "@" in emailStr and "." in emailStr:
     return 1
@@ -74,8 +100,16 @@ proc getNimCoreVersion*(): cstring {.exportc.} =
 proc freeString*(s: cstring) {.exportc.} =
   ## Frees a string allocated by Nim functions
   if s != nil:
+    when defined(nimBridgeTelemetry):
+      nimBridgeTrackFree(cast[pointer](s))
     dealloc(s)
 
+proc nimBridgeHeapStats*(stats: ptr array[3, int64]) {.exportc.} =
+  ## Nim heap of the calling thread for getNativeMemoryStats: occupied, free, total bytes
+  stats[0] = int64(getOccupiedMem())
+  stats[1] = int64(getFreeMem())
+  stats[2] = int64(getTotalMem())
+
 proc mobileNimInit*() {.exportc.} =
   discard
 
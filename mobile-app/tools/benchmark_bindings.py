@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Scalability benchmark of the binding generator
+Times parsing, discovery and every generator on synthesized Nim modules of
+growing size and compares throughput and peak memory against a saved baseline
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from bindings import GeneratorConfig, BindingGenerator
+from bindings.benchmark import benchmark_settings, compare_benchmarks, print_benchmark, run_benchmark
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        help="Comma-separated export counts (default: benchmark.sizes)")
+    parser.add_argument("--repeat", type=int, help="Timed runs per stage, the best counts (default: benchmark.repeat)")
+    parser.add_argument("--json", type=Path, help="Also write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Baseline to compare against (default: benchmark.baseline)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write these results as the new baseline instead of comparing")
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    config_file = Path(__file__).parent / "generator_config.json"
+
+    try:
+        config = GeneratorConfig.from_file(config_file)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    settings = benchmark_settings(config)
+    sizes = args.sizes or settings["sizes"]
+    repeat = args.repeat or settings["repeat"]
+    if not sizes or min(sizes) < 1 or repeat < 1:
+        print("Error: sizes and repeat must be positive")
+        return 1
+
+    print(f"Benchmarking {', '.join(str(size) for size in sizes)} exports, best of {repeat}")
+    result = run_benchmark(config, sizes, repeat, progress=lambda line: print(f"  {line}"))
+    print_benchmark(result)
+
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nWrote {args.json}")
+
+    baseline_path = args.baseline or BindingGenerator(config).base_dir / settings["baseline"]
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nSaved baseline {baseline_path}")
+        return 0
+
+    try:
+        baseline = json.loads(baseline_path.read_text())
+    except FileNotFoundError:
+        baseline = None
+        print(f"\nNo baseline at {baseline_path} (save one with --save-baseline); checking scaling only")
+    except ValueError as e:
+        print(f"Error: {baseline_path}: {e}")
+        return 1
+
+    diff = compare_benchmarks(baseline, result, settings["max_regression_percent"],
+                              settings["max_memory_regression_percent"], settings["min_seconds"],
+                              settings["max_scaling"])
+    if baseline is not None:
+        print(f"\nCompared with {baseline_path}:")
+    for line in diff["changes"]:
+        print(f"  {line}")
+    for line in diff["regressions"]:
+        print(f"  ❌ {line}")
+    if baseline is not None and not diff["changes"] and not diff["regressions"]:
+        print("  no changes")
+    if diff["regressions"]:
+        print(f"\n❌ {len(diff['regressions'])} performance regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
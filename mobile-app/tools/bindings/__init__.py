@@ -5,15 +5,27 @@ A modular system for generating React Native bridge code from Nim functions.
 Supports iOS (Objective-C++), Android (JNI/Kotlin), and TypeScript bindings.
 """
 
-from .config import GeneratorConfig
-from .models import NimFunction, TypeMapper
-from .parser import NimParser
-from .orchestrator import BindingGenerator
+import importlib
+
+# Imported on first use, so `bindings.client` loads without the generators
+_EXPORTS = {
+    'GeneratorConfig': '.config',
+    'NimFunction': '.models',
+    'TypeMapper': '.models',
+    'NimParser': '.parser',
+    'BindingGenerator': '.orchestrator',
+}
 
 __all__ = [
     'GeneratorConfig',
-    'NimFunction', 
+    'NimFunction',
     'TypeMapper',
     'NimParser',
     'BindingGenerator'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
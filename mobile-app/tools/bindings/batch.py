@@ -0,0 +1,100 @@
+"""
+Batch generation of several targets from one parse of their Nim sources.
+
+One Nim core can sit behind several apps or modules, each with its own
+config: its own package and module names, function name mappings and
+`boolean_returns`. The targets come from several config files or from the
+`targets` list of one config. They share a parse cache, so every Nim file
+is parsed once. Discovery then annotates each target's own copy of the
+exports, and the targets render concurrently.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .config import GeneratorConfig
+from .fingerprint import fingerprint_path
+from .generators.glue import glue_sources
+from .orchestrator import BindingGenerator, generation_workers
+from .profiling import Profiler
+
+
+class BatchGenerator:
+    """Generates several targets, parsing the Nim files they share once."""
+
+    def __init__(self, configs: List[GeneratorConfig], profiler: Optional[Profiler] = None):
+        self.generators = [BindingGenerator(config) for config in configs]
+        self.parse_cache: Dict[Path, tuple] = {}
+        self.workers = generation_workers(configs[0])
+        # The targets run side by side, so each gets its share of the workers for its own outputs
+        target_workers = max(1, self.workers // len(configs))
+        for generator in self.generators:
+            generator.parse_cache = self.parse_cache
+            generator.quiet = True
+            generator.config.data.setdefault('generation', {})['workers'] = target_workers
+            if profiler is not None:
+                generator.profiler = profiler
+        self.profiler = profiler or Profiler()
+
+    def validate(self) -> None:
+        """Raise ValueError when two targets would write the same files or different Nim glue."""
+        owners: Dict[Path, str] = {}
+        glue: Dict[Path, tuple] = {}
+        for generator in self.generators:
+            name = generator.config.target_name
+            outputs = [generator.output_dir, fingerprint_path(generator.config, generator.base_dir, generator.output_dir)]
+            for path in outputs:
+                path = path.resolve()
+                if path in owners:
+                    raise ValueError(f"targets '{owners[path]}' and '{name}' both write {path}")
+                owners[path] = name
+            # The glue module is written into nim_dir, which the targets sharing it also parse
+            nim_dir = generator.nim_dir.resolve()
+            settings = generator.config.data.get('glue', {}) if glue_sources(generator.config) else {}
+            if nim_dir in glue and glue[nim_dir][1] != settings:
+                raise ValueError(f"targets '{glue[nim_dir][0]}' and '{name}' share {nim_dir} "
+                                 f"but configure different Nim glue")
+            glue.setdefault(nim_dir, (name, settings))
+
+    def _run(self, work: Callable[[BindingGenerator], object]) -> list:
+        """`work` for every target, concurrently unless there is a single worker."""
+        if self.workers == 1:
+            return [work(generator) for generator in self.generators]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(self.generators))) as executor:
+            return list(executor.map(work, self.generators))
+
+    def discover_functions(self) -> bool:
+        """Discover every target's exports; the first target to read a Nim file parses it."""
+        for generator in self.generators:
+            with self.profiler.phase(f"discovery {generator.config.target_name}", "discover"):
+                if not generator.discover_functions():
+                    print(f"Error: no exports for target '{generator.config.target_name}'")
+                    return False
+        return True
+
+    def render(self) -> Dict[Path, str]:
+        """Every output of every target in memory, as {path: content}."""
+        files = {}
+        for rendered in self._run(lambda generator: generator.render()):
+            files.update(rendered)
+        return files
+
+    def generate_all(self) -> bool:
+        """Generate every target; False if any output failed."""
+        self._run(lambda generator: generator.generate_all(compare_dispatch=False))
+        return all(len(generator.generated_files) == len(generator.generation_timings)
+                   for generator in self.generators)
+
+    def print_summary(self) -> None:
+        for generator in self.generators:
+            for path in generator.written_files:
+                print(f"Generated {path}")
+        print(f"\n✅ Generated {len(self.generators)} targets from {len(self.parse_cache)} parsed Nim file(s):")
+        for generator in self.generators:
+            failed = len(generator.generation_timings) - len(generator.generated_files)
+            unchanged = len(generator.generated_files) - len(generator.written_files)
+            print(f"  {generator.config.target_name}: {len(generator.functions)} functions, "
+                  f"{len(generator.written_files)} file(s) written, {unchanged} unchanged"
+                  + (f", {failed} failed" if failed else "")
+                  + f" in {generator.output_dir} ({generator.generation_wall:.2f}s)")
@@ -0,0 +1,257 @@
+"""
+Scalability benchmarks for the parser and the generators.
+
+Synthesizes Nim modules with a growing number of exports of mixed
+signatures (strings, ints, int64, floats, bools, `@allocated`/`@literal`
+returns, long doc comments) and times, per module size:
+
+- `parse`: NimParser.parse_nim_exports;
+- `discovery`: BindingGenerator.discover_functions;
+- `generate <file>`: each output rendered in memory, without fragment caches.
+
+Every stage records the best wall time of `repeat` runs, exports per second
+and, from one extra run under tracemalloc, its peak Python heap. Results are
+compared against a committed baseline in two ways. Time regresses beyond
+`max_regression_percent` and peak memory beyond
+`max_memory_regression_percent`. The cost per export at the largest size may
+not exceed `max_scaling` times the cost at the reference size, which catches
+quadratic behavior on any machine, regardless of the baseline.
+"""
+
+import gc
+import platform
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .config import GeneratorConfig
+from .generators.base import CodeGenerator
+from .generators.emitter import Emitter
+from .orchestrator import BindingGenerator
+from .parser import NimParser
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 50000]
+DEFAULT_BASELINE = "tools/benchmark_baseline.json"
+DEFAULT_REPEAT = 3
+DEFAULT_MAX_REGRESSION_PERCENT = 50.0
+DEFAULT_MAX_MEMORY_REGRESSION_PERCENT = 10.0
+DEFAULT_MIN_SECONDS = 0.005
+DEFAULT_MAX_SCALING = 4.0
+REFERENCE_SIZE = 1000
+
+DOC_COMMENT = [
+    "## Computes a value for the benchmark from its inputs. The description is",
+    "## deliberately long, the way documented business APIs are, so that the",
+    "## annotation scanner has several lines of prose to walk past.",
+]
+
+
+def synthesize_module(count: int) -> str:
+    """A Nim module with `count` exports cycling through the supported signatures."""
+    lines = ["# Synthetic module for tools/benchmark_bindings.py", "import strutils", "",
+             "proc allocCString(s: string): cstring =",
+             "  let cstr = cast[cstring](alloc0(s.len + 1))",
+             "  copyMem(cstr, s.cstring, s.len)",
+             "  return cstr", ""]
+    for i in range(count):
+        kind = i % 8
+        docs = DOC_COMMENT if i % 3 == 0 else []
+        if kind == 0:
+            lines += [f"proc benchAdd{i}*(a: cint, b: cint): cint {{.exportc.}} =", *docs, f"  return a + b + {i % 97}"]
+        elif kind == 1:
+            lines += [*docs, "## @allocated", f"proc benchLabel{i}*(name: cstring, n: cint): cstring {{.exportc.}} =",
+                      "  return allocCString($name & $n)"]
+        elif kind == 2:
+            lines += [f"proc benchVersion{i}*(): cstring {{.exportc.}} =", "  ## @literal", *docs,
+                      f"  return \"v{i}\""]
+        elif kind == 3:
+            lines += [f"proc benchScale{i}*(x: int64, factor: float64): int64 {{.exportc.}} =", *docs,
+                      "  return int64(x.float64 * factor)"]
+        elif kind == 4:
+            lines += [f"proc benchCheck{i}*(value: cint, strict: bool): bool {{.exportc.}} =", *docs,
+                      "  return strict and value > 0"]
+        elif kind == 5:
+            lines += [f"proc benchJoin{i}*(a: cstring, b: cstring, sep: cstring): cstring {{.exportc.}} =",
+                      "  ## @allocated", *docs, "  return allocCString($a & $sep & $b)"]
+        elif kind == 6:
+            lines += [f"proc benchRatio{i}*(a: float64, b: float64): float64 {{.exportc.}} =", *docs,
+                      "  if b == 0: return 0.0", "  return a / b"]
+        else:
+            lines += [f"proc benchCount{i}*(text: cstring): int64 {{.exportc.}} =", *docs,
+                      "  var n: int64 = 0", "  for c in $text:", "    if c == ' ': inc n", "  return n"]
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def benchmark_settings(config: GeneratorConfig) -> dict:
+    settings = config.data.get('benchmark', {})
+    return {
+        "sizes": settings.get('sizes', DEFAULT_SIZES),
+        "repeat": settings.get('repeat', DEFAULT_REPEAT),
+        "baseline": settings.get('baseline', DEFAULT_BASELINE),
+        "max_regression_percent": settings.get('max_regression_percent', DEFAULT_MAX_REGRESSION_PERCENT),
+        "max_memory_regression_percent": settings.get('max_memory_regression_percent',
+                                                      DEFAULT_MAX_MEMORY_REGRESSION_PERCENT),
+        "min_seconds": settings.get('min_seconds', DEFAULT_MIN_SECONDS),
+        "max_scaling": settings.get('max_scaling', DEFAULT_MAX_SCALING),
+    }
+
+
+def _benchmark_config(config: GeneratorConfig, nim_dir: Path, output_dir: Path) -> GeneratorConfig:
+    """The app's config pointed at the synthetic module, without inputs it does not provide."""
+    data = {key: value for key, value in config.data.items()
+            if key not in ('glue', 'prune', 'fragment_cache', 'precompute')}
+    data['frame_budget'] = {**config.data.get('frame_budget', {}), 'reports': []}
+    data['fragment_cache'] = {'enabled': False}
+    data['generation'] = {**config.data.get('generation', {}), 'workers': 1}
+    return replace(config, nim_dir=str(nim_dir), output_dir=str(output_dir), data=data)
+
+
+def _measure(run: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best wall time over `repeat` runs, then the peak Python heap of one traced run."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        # As in timeit: collections triggered by earlier stages' garbage are not this stage's cost
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def _render(generator) -> str:
+    code = Emitter()
+    if isinstance(generator, CodeGenerator):
+        generator.emit(code)
+    else:
+        code += generator.generate()
+    return code.getvalue()
+
+
+def run_benchmark(config: GeneratorConfig, sizes: List[int], repeat: int,
+                  progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """Benchmark every stage at every size; {"sizes": {size: {stage: metrics}}, ...}."""
+    result = {"python": platform.python_version(), "machine": platform.machine(), "repeat": repeat, "sizes": {}}
+    parser = NimParser()
+    with tempfile.TemporaryDirectory(prefix="nimbridge-bench-") as tmp:
+        for size in sorted(set(sizes)):
+            nim_dir = Path(tmp) / f"nim{size}"
+            nim_dir.mkdir()
+            nim_file = nim_dir / "bench.nim"
+            nim_file.write_text(synthesize_module(size))
+            bench_config = _benchmark_config(config, nim_dir, Path(tmp) / f"out{size}")
+            stages = {}
+
+            stages["parse"] = _measure(lambda: parser.parse_nim_exports(nim_file), repeat)
+
+            def discover() -> BindingGenerator:
+                generator = BindingGenerator(bench_config)
+                generator.quiet = True
+                generator.discover_functions()
+                return generator
+
+            stages["discovery"] = _measure(discover, repeat)
+
+            generator = discover()
+            targets, _ = generator._build_targets()
+            for name, (target, file_path) in targets.items():
+                stages[f"generate {file_path.name}"] = _measure(lambda: _render(target), repeat)
+
+            for metrics in stages.values():
+                metrics["exports_per_second"] = size / metrics["seconds"] if metrics["seconds"] else 0.0
+            result["sizes"][str(size)] = stages
+            if progress:
+                progress(f"{size} exports: " + ", ".join(f"{stage} {metrics['seconds'] * 1000:.1f} ms"
+                                                         for stage, metrics in stages.items()))
+    return result
+
+
+def scaling(result: Dict) -> Dict[str, float]:
+    """Per-export cost at the largest size relative to the reference size, by stage."""
+    sizes = sorted(int(size) for size in result["sizes"])
+    reference = REFERENCE_SIZE if REFERENCE_SIZE in sizes else next((size for size in sizes if size >= 100), None)
+    largest = sizes[-1] if sizes else None
+    if reference is None or largest is None or largest <= reference:
+        return {}
+    ratios = {}
+    for stage, metrics in result["sizes"][str(largest)].items():
+        base = result["sizes"][str(reference)].get(stage)
+        if base and base["seconds"] > 0:
+            ratios[stage] = (metrics["seconds"] / largest) / (base["seconds"] / reference)
+    return ratios
+
+
+def compare_benchmarks(baseline: Optional[Dict], current: Dict, max_regression_percent: float,
+                       max_memory_regression_percent: float, min_seconds: float,
+                       max_scaling: float) -> Dict[str, List[str]]:
+    """Changes and regressions as printable lines: {"regressions": [...], "changes": [...]}.
+
+    Time regresses when it grows by more than `max_regression_percent` and
+    by more than `min_seconds`, so that sub-millisecond noise is ignored. Peak
+    memory does not depend on the machine's load and has its own, tighter
+    threshold. Superlinear growth is a regression even without a baseline.
+    """
+    result = {"regressions": [], "changes": []}
+    sizes = sorted(int(size) for size in current["sizes"])
+    for stage, ratio in scaling(current).items():
+        largest = current["sizes"][str(sizes[-1])][stage]["seconds"]
+        # Stages too fast to time reliably at the reference size can show any ratio
+        if ratio > max_scaling and largest - largest / ratio > min_seconds:
+            result["regressions"].append(
+                f"{stage}: {ratio:.1f}x the per-export cost at {sizes[-1]} exports (limit {max_scaling:g}x), "
+                f"growth is superlinear")
+    if baseline is None:
+        return result
+    for size in sizes:
+        base_stages = baseline.get("sizes", {}).get(str(size))
+        if base_stages is None:
+            result["changes"].append(f"{size} exports: not in the baseline")
+            continue
+        for stage, metrics in current["sizes"][str(size)].items():
+            base = base_stages.get(stage)
+            if base is None:
+                result["changes"].append(f"{size} {stage}: new stage")
+                continue
+            delta = metrics["seconds"] - base["seconds"]
+            percent = delta * 100.0 / base["seconds"] if base["seconds"] else float('inf')
+            line = (f"{size} {stage}: {base['seconds'] * 1000:.1f} -> {metrics['seconds'] * 1000:.1f} ms "
+                    f"({percent:+.0f}%)")
+            if delta > min_seconds and percent > max_regression_percent:
+                result["regressions"].append(line)
+            elif abs(percent) > max_regression_percent and abs(delta) > min_seconds:
+                result["changes"].append(line)
+            memory_delta = metrics["peak_bytes"] - base["peak_bytes"]
+            memory_percent = memory_delta * 100.0 / base["peak_bytes"] if base["peak_bytes"] else 0.0
+            if memory_percent > max_memory_regression_percent:
+                result["regressions"].append(
+                    f"{size} {stage}: peak {base['peak_bytes'] // 1024} -> {metrics['peak_bytes'] // 1024} KiB "
+                    f"({memory_percent:+.0f}%)")
+    return result
+
+
+def print_benchmark(result: Dict) -> None:
+    for size, stages in sorted(result["sizes"].items(), key=lambda item: int(item[0])):
+        print(f"\n{size} exports")
+        print(f"  {'stage':<40} {'ms':>10} {'exports/s':>12} {'peak KiB':>10}")
+        for stage, metrics in stages.items():
+            print(f"  {stage:<40} {metrics['seconds'] * 1000:>10.1f} {metrics['exports_per_second']:>12.0f} "
+                  f"{metrics['peak_bytes'] / 1024:>10.0f}")
+    ratios = scaling(result)
+    if ratios:
+        print("\nPer-export cost at the largest size relative to the reference size:")
+        for stage, ratio in ratios.items():
+            print(f"  {stage:<40} {ratio:>6.2f}x")
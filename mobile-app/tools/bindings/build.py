@@ -0,0 +1,452 @@
+"""
+Concurrent native build driver for the Nim bridge.
+
+Models the native pipeline (Nim -> C per platform/ABI, iOS object compilation
+and archiving, binding generation and header copying) as a task graph and runs
+independent tasks concurrently.
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .orchestrator import BindingGenerator
+from .generators.glue import glue_module, glue_sources
+from .generators.pgo import pgo_use_flags, profile_c_flags, profile_nim_flags, resolve_build_profile
+
+
+DEFAULT_ANDROID_CPUS = {
+    "arm64-v8a": "arm64",
+    "x86_64": "amd64",
+    "armeabi-v7a": "arm",
+    "x86": "i386",
+}
+
+DEFAULT_IOS_TARGETS = {
+    "arm64-simulator": {
+        "cpu": "arm64",
+        "clang_target": "arm64-apple-ios15.1-simulator",
+        "nimcache": "cache_ios_sim",
+        "library": "libnim_core.a",
+    }
+}
+
+
+@dataclass
+class BuildTask:
+    """A single node in the build graph."""
+    name: str
+    action: Callable[[], Optional[List['BuildTask']]]
+    deps: List[str] = field(default_factory=list)
+    description: str = ""
+    # Filled in by the scheduler
+    status: str = "pending"  # pending, running, done, failed, skipped
+    start: float = 0.0
+    end: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.end - self.start)
+
+
+class BuildError(Exception):
+    """Raised by task actions when a build step fails."""
+
+
+class TaskGraph:
+    """Dependency graph of build tasks executed on a thread pool.
+
+    A task action may return further tasks. These are added to the graph and
+    every pending task that depended on the expanding task also waits on them,
+    which lets a step fan out over work that is only known once it has run
+    (for example the C files emitted by the Nim compiler).
+    """
+
+    def __init__(self, jobs: int = 1):
+        self.jobs = max(1, jobs)
+        self.tasks: Dict[str, BuildTask] = {}
+        self._lock = threading.Lock()
+
+    def add(self, task: BuildTask) -> BuildTask:
+        """Register a task. Dependencies may be added before or after it."""
+        if task.name in self.tasks:
+            raise ValueError(f"Duplicate build task: {task.name}")
+        self.tasks[task.name] = task
+        return task
+
+    def _validate(self) -> None:
+        for task in self.tasks.values():
+            for dep in task.deps:
+                if dep not in self.tasks:
+                    raise ValueError(f"Task {task.name} depends on unknown task {dep}")
+
+        # Detect cycles with a DFS over the static graph
+        visiting, visited = set(), set()
+
+        def visit(name: str, path: List[str]) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                cycle = path[path.index(name):] + [name]
+                raise ValueError(f"Dependency cycle: {' -> '.join(cycle)}")
+            visiting.add(name)
+            for dep in self.tasks[name].deps:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.tasks:
+            visit(name, [])
+
+    def _expand(self, parent: BuildTask, children: List[BuildTask]) -> None:
+        """Add tasks spawned by `parent` and make its dependents wait on them."""
+        for child in children:
+            self.add(child)
+        child_names = [child.name for child in children]
+        for task in self.tasks.values():
+            if task.status == "pending" and parent.name in task.deps and task.name not in child_names:
+                task.deps.extend(name for name in child_names if name not in task.deps)
+
+    def _run_task(self, task: BuildTask) -> Optional[List[BuildTask]]:
+        task.start = time.perf_counter()
+        try:
+            return task.action()
+        finally:
+            task.end = time.perf_counter()
+
+    def run(self) -> bool:
+        """Execute all tasks, returning True when every task succeeded."""
+        self._validate()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while True:
+                with self._lock:
+                    for task in self.tasks.values():
+                        if task.status != "pending":
+                            continue
+                        dep_states = [self.tasks[d].status for d in task.deps]
+                        if any(s in ("failed", "skipped") for s in dep_states):
+                            task.status = "skipped"
+                            print(f"⏭  {task.name} (dependency failed)")
+                        elif all(s == "done" for s in dep_states):
+                            task.status = "running"
+                            running[executor.submit(self._run_task, task)] = task
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    try:
+                        children = future.result()
+                    except Exception as e:
+                        task.status = "failed"
+                        task.error = str(e)
+                        print(f"❌ {task.name} failed after {task.duration:.2f}s: {e}")
+                        continue
+
+                    with self._lock:
+                        task.status = "done"
+                        if children:
+                            self._expand(task, children)
+                    print(f"✓ {task.name} ({task.duration:.2f}s)")
+
+        return all(task.status == "done" for task in self.tasks.values())
+
+    def critical_path(self) -> List[BuildTask]:
+        """Return the chain of completed tasks with the longest total duration."""
+        memo: Dict[str, float] = {}
+        best_dep: Dict[str, Optional[str]] = {}
+
+        def cost(name: str) -> float:
+            if name not in memo:
+                task = self.tasks[name]
+                longest, longest_dep = 0.0, None
+                for dep in task.deps:
+                    dep_cost = cost(dep)
+                    if dep_cost > longest:
+                        longest, longest_dep = dep_cost, dep
+                memo[name] = task.duration + longest
+                best_dep[name] = longest_dep
+            return memo[name]
+
+        finished = [name for name, task in self.tasks.items() if task.status in ("done", "failed")]
+        if not finished:
+            return []
+
+        tail = max(finished, key=cost)
+        path = []
+        while tail is not None:
+            path.append(self.tasks[tail])
+            tail = best_dep[tail]
+        return list(reversed(path))
+
+    def print_summary(self, wall_time: float) -> None:
+        """Print timing and critical-path summary."""
+        total_task_time = sum(task.duration for task in self.tasks.values())
+        failed = [task for task in self.tasks.values() if task.status == "failed"]
+        skipped = [task for task in self.tasks.values() if task.status == "skipped"]
+
+        print(f"\nBuild graph: {len(self.tasks)} tasks on {self.jobs} job(s)")
+        print(f"  Wall time:        {wall_time:.2f}s")
+        print(f"  Summed task time: {total_task_time:.2f}s")
+        if wall_time > 0:
+            print(f"  Parallelism:      {total_task_time / wall_time:.2f}x")
+
+        path = self.critical_path()
+        if path:
+            print(f"\nCritical path ({sum(task.duration for task in path):.2f}s):")
+            for task in path:
+                print(f"  {task.duration:8.2f}s  {task.name}")
+
+        if failed:
+            print(f"\n❌ {len(failed)} task(s) failed: {', '.join(task.name for task in failed)}")
+        if skipped:
+            print(f"⏭  {len(skipped)} task(s) skipped: {', '.join(task.name for task in skipped)}")
+
+
+def run_command(cmd: List[str], cwd: Path, env: Optional[Dict[str, str]] = None) -> str:
+    """Run a build command, raising BuildError with its output on failure.
+
+    `env` entries are added to the inherited environment. Returns stdout.
+    """
+    try:
+        result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True,
+                                env={**os.environ, **env} if env else None)
+    except FileNotFoundError:
+        raise BuildError(f"Command not found: {cmd[0]}")
+    if result.returncode != 0:
+        output = (result.stderr or result.stdout).strip().splitlines()
+        raise BuildError(f"{' '.join(cmd)} exited with {result.returncode}\n" + "\n".join(output[-20:]))
+    return result.stdout
+
+
+def find_nim_lib_path() -> Optional[Path]:
+    """Locate the Nim lib directory containing nimbase.h."""
+    try:
+        result = subprocess.run(["nim", "dump"], capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    for line in (result.stdout + result.stderr).splitlines():
+        candidate = Path(line.strip())
+        if (candidate / "nimbase.h").is_file():
+            return candidate
+    for candidate in ("/opt/nim/lib", "/opt/homebrew/lib/nim", "/usr/local/lib/nim", "/usr/lib/nim"):
+        if (Path(candidate) / "nimbase.h").is_file():
+            return Path(candidate)
+    return None
+
+
+class NativeBuildPipeline:
+    """Builds the task graph for the full native pipeline of a BindingGenerator."""
+
+    def __init__(self, generator: BindingGenerator, platforms: List[str],
+                 android_abis: Optional[List[str]] = None,
+                 nim_lib_path: Optional[Path] = None):
+        self.generator = generator
+        self.config = generator.config
+        self.nim_dir = generator.nim_dir
+        self.output_dir = generator.output_dir
+        self.platforms = platforms
+        self.nim_lib_path = nim_lib_path
+
+        build_config = self.config.data.get('build', {})
+        self.nim_source = build_config.get('nim_source', 'nimbridge.nim')
+        self.profile = resolve_build_profile(self.config)
+        self.nim_flags = profile_nim_flags(self.config, self.profile)
+        self.c_flags = profile_c_flags(self.profile)
+        self.android_cpus = build_config.get('android_cpus', DEFAULT_ANDROID_CPUS)
+        self.ios_targets = build_config.get('ios_targets', DEFAULT_IOS_TARGETS)
+
+        configured_abis = self.config.data.get('cmake', {}).get('android_abis', list(self.android_cpus))
+        self.android_abis = android_abis or configured_abis
+        unknown = [abi for abi in self.android_abis if abi not in self.android_cpus]
+        if unknown:
+            raise ValueError(f"No Nim CPU mapping for Android ABIs: {unknown}")
+
+    @property
+    def nim_header(self) -> str:
+        return Path(self.nim_source).with_suffix('.h').name
+
+    def android_cache_dir(self, abi: str) -> Path:
+        """Per-ABI nimcache, picked up by the generated CMakeLists.txt."""
+        return self.nim_dir / "cache_android" / abi
+
+    def build_graph(self, graph: TaskGraph) -> TaskGraph:
+        """Populate `graph` with all tasks for the selected platforms."""
+        nimble_files = list(self.nim_dir.glob("*.nimble"))
+        deps_root = []
+        if nimble_files:
+            graph.add(BuildTask(
+                "nim-deps",
+                lambda: run_command(["nimble", "install", "-d", "-y"], self.nim_dir),
+                description="nimble install -d -y",
+            ))
+            deps_root = ["nim-deps"]
+
+        # Generated @bridge wrappers are part of the Nim sources being compiled
+        if glue_sources(self.config):
+            graph.add(BuildTask("nim-glue", self._generate_glue,
+                                description=f"Generate nim/{glue_module(self.config)}"))
+            deps_root = deps_root + ["nim-glue"]
+
+        bindings = graph.add(BuildTask("nim-bindings", self._generate_bindings,
+                                       description="tools/generate_bindings.py (in-process)"))
+
+        if "ios" in self.platforms:
+            for target, target_config in self.ios_targets.items():
+                self._add_ios_tasks(graph, target, target_config, deps_root)
+
+        if "android" in self.platforms:
+            compile_tasks = []
+            for abi in self.android_abis:
+                name = f"nim-compile:android:{abi}"
+                graph.add(BuildTask(
+                    name,
+                    self._android_compile_action(abi),
+                    deps=list(deps_root),
+                    description=" ".join(self._nim_command("android", self.android_cpus[abi],
+                                                           self.android_cache_dir(abi))),
+                ))
+                compile_tasks.append(name)
+
+            # The CMake generator reads the exact compile units from the Nim build manifest
+            if compile_tasks and self.config.data.get('cmake', {}).get('use_build_manifest', True):
+                bindings.deps.append(compile_tasks[0])
+
+            if compile_tasks:
+                graph.add(BuildTask(
+                    "nim-headers:android",
+                    self._copy_android_headers,
+                    deps=[compile_tasks[0]],
+                    description="Copy nimbase.h and Nim header into android/src/main/cpp",
+                ))
+
+        return graph
+
+    def _nim_command(self, os_name: str, cpu: str, cache_dir: Path) -> List[str]:
+        return [
+            "nim", "c", "-c", f"--os:{os_name}", f"--cpu:{cpu}", f"-d:{os_name}",
+            *self.nim_flags, "--app:staticlib", "--noMain:on",
+            f"--nimcache:{cache_dir}", self.nim_source,
+        ]
+
+    def _generate_glue(self) -> None:
+        if not BindingGenerator(self.config).generate_glue():
+            raise BuildError("Glue sources not found")
+
+    def _generate_bindings(self) -> None:
+        generator = BindingGenerator(self.config)
+        if not generator.discover_functions():
+            raise BuildError("No exported functions found")
+        generator.generate_all()
+
+    def _android_compile_action(self, abi: str) -> Callable[[], None]:
+        def action() -> None:
+            cache_dir = self.android_cache_dir(abi)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            run_command(self._nim_command("android", self.android_cpus[abi], cache_dir), self.nim_dir)
+        return action
+
+    def _copy_android_headers(self) -> None:
+        cpp_dir = self.output_dir / "android" / "src" / "main" / "cpp"
+        cpp_dir.mkdir(parents=True, exist_ok=True)
+        header = self.android_cache_dir(self.android_abis[0]) / self.nim_header
+        if header.exists():
+            shutil.copy2(header, cpp_dir / self.nim_header)
+        self._copy_nimbase(cpp_dir)
+
+    def _copy_nimbase(self, dest_dir: Path) -> None:
+        if self.nim_lib_path is None:
+            raise BuildError("Nim lib path (nimbase.h) not found; pass --nim-lib-path")
+        shutil.copy2(self.nim_lib_path / "nimbase.h", dest_dir / "nimbase.h")
+
+    def _add_ios_tasks(self, graph: TaskGraph, target: str, target_config: dict,
+                       deps_root: List[str]) -> None:
+        cache_dir = self.nim_dir / target_config.get('nimcache', f"cache_ios_{target}")
+        library = target_config.get('library', 'libnim_core.a')
+        clang_target = target_config['clang_target']
+        compile_name = f"nim-compile:ios:{target}"
+
+        def compile_action() -> List[BuildTask]:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            run_command(self._nim_command("ios", target_config.get('cpu', 'arm64'), cache_dir), self.nim_dir)
+            # Fan out one clang invocation per emitted C file
+            return [
+                BuildTask(
+                    f"cc:ios:{target}:{c_file.name}",
+                    self._ios_object_action(c_file, clang_target),
+                    deps=[compile_name],
+                )
+                for c_file in sorted(cache_dir.glob("*.c"))
+            ]
+
+        def archive_action() -> None:
+            objects = sorted(str(p.name) for p in cache_dir.glob("*.c.o"))
+            if not objects:
+                raise BuildError(f"No object files in {cache_dir}")
+            lib_path = self.nim_dir / library
+            lib_path.unlink(missing_ok=True)
+            run_command(["ar", "rcs", str(lib_path), *objects], cache_dir)
+            ios_dir = self.output_dir / "ios"
+            ios_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(lib_path, ios_dir / library)
+
+        def headers_action() -> None:
+            ios_dir = self.output_dir / "ios"
+            ios_dir.mkdir(parents=True, exist_ok=True)
+            header = cache_dir / self.nim_header
+            if header.exists():
+                shutil.copy2(header, ios_dir / "main.h")
+            self._copy_nimbase(ios_dir)
+
+        graph.add(BuildTask(compile_name, compile_action, deps=list(deps_root),
+                            description=" ".join(self._nim_command("ios", target_config.get('cpu', 'arm64'), cache_dir))))
+        graph.add(BuildTask(f"static-lib:ios:{target}", archive_action, deps=[compile_name],
+                            description=f"clang -target {clang_target} (per C file) + ar rcs {library}"))
+        graph.add(BuildTask(f"nim-headers:ios:{target}", headers_action, deps=[compile_name],
+                            description="Copy nimbase.h and Nim header into ios/"))
+
+    def _ios_object_action(self, c_file: Path, clang_target: str) -> Callable[[], None]:
+        def action() -> None:
+            include_args = [f"-I{self.nim_lib_path}"] if self.nim_lib_path else []
+            run_command([
+                "clang", "-c", "-w", "-ferror-limit=3", "-pthread",
+                *include_args, "-I..", "-target", clang_target,
+                *self.c_flags, *pgo_use_flags(self.config, self.generator.base_dir),
+                "-o", f"{c_file.name}.o", c_file.name,
+            ], c_file.parent)
+        return action
+
+
+def print_plan(graph: TaskGraph) -> None:
+    """Print the tasks grouped into dependency levels without running them."""
+    levels: Dict[str, int] = {}
+
+    def level(name: str) -> int:
+        if name not in levels:
+            deps = graph.tasks[name].deps
+            levels[name] = 1 + max((level(dep) for dep in deps), default=-1)
+        return levels[name]
+
+    graph._validate()
+    by_level: Dict[int, List[BuildTask]] = {}
+    for name, task in graph.tasks.items():
+        by_level.setdefault(level(name), []).append(task)
+
+    for lvl in sorted(by_level):
+        print(f"Stage {lvl}:")
+        for task in by_level[lvl]:
+            deps = f" (after {', '.join(task.deps)})" if task.deps else ""
+            print(f"  {task.name}{deps}")
+            if task.description:
+                print(f"      {task.description}")
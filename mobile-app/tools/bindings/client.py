@@ -0,0 +1,48 @@
+"""
+Client side of the generation server (tools/generate_bindings.py --server).
+
+Only the standard library is imported here, so build tools asking a warm
+server pay for interpreter startup and nothing else. The protocol is one JSON
+request line answered by one JSON response line over a Unix socket.
+"""
+
+import hashlib
+import json
+import socket
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_TIMEOUT_S = 120.0
+
+
+def socket_path(config_data: dict, base_dir: Path) -> Path:
+    """`server.socket` relative to the app, or a per-app socket in the temp directory.
+
+    The default stays short, because Unix socket paths are limited to about
+    100 bytes.
+    """
+    configured = config_data.get('server', {}).get('socket')
+    if configured:
+        return base_dir / configured
+    app = hashlib.sha256(str(base_dir.resolve()).encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"nimbridge-{app}.sock"
+
+
+def request(path: Path, op: str, timeout: float = DEFAULT_TIMEOUT_S, **params) -> Optional[dict]:
+    """Send one request; None when no server is listening on `path`."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        try:
+            sock.connect(str(path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        sock.sendall(json.dumps({"op": op, **params}).encode() + b"\n")
+        with sock.makefile('rb') as reply:
+            line = reply.readline()
+        if not line:
+            raise ConnectionError(f"generation server at {path} closed the connection")
+        return json.loads(line)
+    finally:
+        sock.close()
@@ -2,10 +2,16 @@
 Configuration management for Nim bridge generator.
 """
 
+import copy
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+KNOWN_FIELDS = {
+    'nim_dir', 'output_dir', 'package_name', 'module_name',
+    'library_name', 'generate_ios', 'generate_android', 'generate_typescript'
+}
 
 
 @dataclass
@@ -38,22 +44,42 @@ class GeneratorConfig:
         except (json.JSONDecodeError, TypeError) as e:
             raise ValueError(f"Invalid config file {config_file}: {e}")
 
-        # Extract known fields and keep full data
-        known_fields = {
-            'nim_dir', 'output_dir', 'package_name', 'module_name',
-            'library_name', 'generate_ios', 'generate_android', 'generate_typescript'
-        }
+        return cls.from_data(config_data)
 
+    @classmethod
+    def from_data(cls, config_data: dict) -> 'GeneratorConfig':
+        """Build a configuration from parsed JSON, keeping the full data."""
         # Validate required fields
-        missing_fields = known_fields - set(config_data.keys())
+        missing_fields = KNOWN_FIELDS - set(config_data.keys())
         if missing_fields:
             raise ValueError(f"Missing required fields in config: {missing_fields}")
 
-        kwargs = {k: config_data[k] for k in known_fields}
+        kwargs = {k: config_data[k] for k in KNOWN_FIELDS}
         kwargs['data'] = config_data
 
         return cls(**kwargs)
 
+    @property
+    def target_name(self) -> str:
+        return self.data.get('name', self.module_name)
+
+    def targets(self) -> List['GeneratorConfig']:
+        """One config per entry of `targets`, or just this one without it.
+
+        Each entry overrides top-level keys of the surrounding config, so a
+        target replaces whole sections such as `function_name_mappings`.
+        """
+        entries = self.data.get('targets')
+        if not entries:
+            return [self]
+        base = {key: value for key, value in self.data.items() if key != 'targets'}
+        configs = []
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                raise ValueError(f"targets[{index}] must be an object of config overrides")
+            configs.append(GeneratorConfig.from_data({**copy.deepcopy(base), **copy.deepcopy(entry)}))
+        return configs
+
     def to_file(self, config_file: Path) -> None:
         """Save configuration to a JSON file."""
         config_data = {
@@ -0,0 +1,247 @@
+"""
+Minimal pure-Python reader for ELF objects, shared libraries and ar archives.
+
+Reads what the size report needs — sections, symbol tables and relocations —
+from 32- and 64-bit files of either byte order, without binutils. Archive
+members that are not ELF (Mach-O from iOS builds, LLVM bitcode from LTO) are
+returned as raw bytes for the caller to skip.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+ELF_MAGIC = b'\x7fELF'
+AR_MAGIC = b'!<arch>\n'
+THIN_AR_MAGIC = b'!<thin>\n'
+
+ET_REL, ET_EXEC, ET_DYN = 1, 2, 3
+EM_ARM = 40
+
+SHT_SYMTAB, SHT_RELA, SHT_NOBITS, SHT_REL, SHT_DYNSYM = 2, 4, 8, 9, 11
+SHT_SYMTAB_SHNDX, SHT_RELR = 18, 19
+SHT_ANDROID_REL, SHT_ANDROID_RELA, SHT_ANDROID_RELR = 0x60000001, 0x60000002, 0x6fffff00
+SHF_WRITE, SHF_ALLOC, SHF_EXECINSTR = 0x1, 0x2, 0x4
+
+STT_OBJECT, STT_FUNC, STT_SECTION, STT_COMMON, STT_TLS = 1, 2, 3, 5, 6
+STB_LOCAL, STB_GLOBAL, STB_WEAK = 0, 1, 2
+STV_DEFAULT = 0
+SHN_UNDEF, SHN_ABS, SHN_COMMON, SHN_XINDEX = 0, 0xfff1, 0xfff2, 0xffff
+
+
+class ElfError(Exception):
+    """Raised for files that are not ELF or are truncated."""
+
+
+@dataclass
+class ElfSection:
+    index: int
+    name: str
+    type: int
+    flags: int
+    addr: int
+    offset: int
+    size: int
+    link: int
+    info: int
+    entsize: int
+
+    @property
+    def allocated(self) -> bool:
+        return bool(self.flags & SHF_ALLOC)
+
+    @property
+    def executable(self) -> bool:
+        return bool(self.flags & SHF_EXECINSTR)
+
+
+@dataclass
+class ElfSymbol:
+    name: str
+    value: int
+    size: int
+    type: int
+    bind: int
+    visibility: int
+    shndx: int
+
+    @property
+    def defined(self) -> bool:
+        return self.shndx != SHN_UNDEF
+
+
+@dataclass
+class ElfRelocation:
+    offset: int
+    symbol: int
+    type: int
+    addend: Optional[int] = None
+
+
+class ElfFile:
+    """Parsed ELF image. `symbols` is .symtab (or .dynsym when stripped)."""
+
+    def __init__(self, data: bytes, name: str = "<elf>"):
+        if data[:4] != ELF_MAGIC:
+            raise ElfError(f"{name}: not an ELF file")
+        self.name = name
+        self.data = data
+        if data[4] not in (1, 2) or data[5] not in (1, 2):
+            raise ElfError(f"{name}: unsupported ELF class/encoding {data[4]}/{data[5]}")
+        self.is64 = data[4] == 2
+        self.endian = '<' if data[5] == 1 else '>'
+        self.word_size = 8 if self.is64 else 4
+
+        header = '6xHHI' + ('QQQ' if self.is64 else 'III') + 'IHHHHHH'
+        (self.type, self.machine, _, _, _, shoff, _, _, _, _, shentsize, shnum,
+         shstrndx) = self._unpack(header, 10)
+        self.sections = self._read_sections(shoff, shentsize, shnum, shstrndx)
+        self._shndx_tables = {section.link: section for section in self.sections
+                              if section.type == SHT_SYMTAB_SHNDX}
+
+        symtab = self.section_of_type(SHT_SYMTAB)
+        dynsym = self.section_of_type(SHT_DYNSYM)
+        self.dynamic_symbols = self._read_symbols(dynsym) if dynsym else []
+        self.symbols = self._read_symbols(symtab) if symtab else list(self.dynamic_symbols)
+        self.symbol_section = symtab or dynsym
+
+    def _unpack(self, fmt: str, offset: int) -> Tuple:
+        fmt = self.endian + fmt
+        end = offset + struct.calcsize(fmt)
+        if end > len(self.data):
+            raise ElfError(f"{self.name}: truncated at offset {offset}")
+        return struct.unpack_from(fmt, self.data, offset)
+
+    def _string(self, table: ElfSection, offset: int) -> str:
+        start = table.offset + offset
+        end = self.data.find(b'\0', start, table.offset + table.size)
+        return self.data[start:end if end >= 0 else table.offset + table.size].decode('utf-8', 'replace')
+
+    def _read_sections(self, shoff: int, shentsize: int, shnum: int, shstrndx: int) -> List[ElfSection]:
+        if not shoff:
+            return []
+        fmt = 'IIQQQQIIQQ' if self.is64 else 'IIIIIIIIII'
+
+        def raw(index: int) -> Tuple:
+            name, stype, flags, addr, offset, size, link, info, _, entsize = \
+                self._unpack(fmt, shoff + index * shentsize)
+            return name, stype, flags, addr, offset, size, link, info, entsize
+
+        # Counts that do not fit the header live in section 0
+        first = raw(0)
+        if shnum == 0:
+            shnum = first[5]
+        if shstrndx == SHN_XINDEX:
+            shstrndx = first[6]
+        entries = [raw(index) for index in range(shnum)]
+        names = ElfSection(shstrndx, "", *entries[shstrndx][1:]) if shstrndx < shnum else None
+        return [ElfSection(index, self._string(names, entry[0]) if names else "", *entry[1:])
+                for index, entry in enumerate(entries)]
+
+    def section_of_type(self, section_type: int) -> Optional[ElfSection]:
+        return next((section for section in self.sections if section.type == section_type), None)
+
+    def section_bytes(self, section: ElfSection) -> bytes:
+        if section.type == SHT_NOBITS:
+            return b''
+        return self.data[section.offset:section.offset + section.size]
+
+    def _read_symbols(self, table: ElfSection) -> List[ElfSymbol]:
+        strings = self.sections[table.link]
+        fmt, size = ('IBBHQQ', 24) if self.is64 else ('IIIBBH', 16)
+        extended = self._shndx_tables.get(table.index)
+        symbols = []
+        for index in range(table.size // size):
+            fields = self._unpack(fmt, table.offset + index * size)
+            if self.is64:
+                name, info, other, shndx, value, sym_size = fields
+            else:
+                name, value, sym_size, info, other, shndx = fields
+            if shndx == SHN_XINDEX and extended:
+                shndx, = self._unpack('I', extended.offset + index * 4)
+            sym_type = info & 0xf
+            if self.machine == EM_ARM and sym_type == STT_FUNC:
+                value &= ~1  # Thumb bit
+            symbols.append(ElfSymbol(self._string(strings, name), value, sym_size, sym_type,
+                                     info >> 4, other & 0x3, shndx))
+        return symbols
+
+    def relocations(self, section: ElfSection) -> List[ElfRelocation]:
+        """Entries of a REL/RELA/RELR section; Android packed formats are not decoded."""
+        if section.type == SHT_RELR:
+            return [ElfRelocation(offset, 0, 0) for offset in self._relr_offsets(section)]
+        if section.type not in (SHT_REL, SHT_RELA):
+            return []
+        rela = section.type == SHT_RELA
+        if self.is64:
+            fmt = 'QQq' if rela else 'QQ'
+        else:
+            fmt = 'IIi' if rela else 'II'
+        size = struct.calcsize(fmt)
+        entries = []
+        for index in range(section.size // size):
+            fields = self._unpack(fmt, section.offset + index * size)
+            info = fields[1]
+            symbol, rtype = (info >> 32, info & 0xffffffff) if self.is64 else (info >> 8, info & 0xff)
+            entries.append(ElfRelocation(fields[0], symbol, rtype, fields[2] if rela else None))
+        return entries
+
+    def _relr_offsets(self, section: ElfSection) -> List[int]:
+        fmt = 'Q' if self.is64 else 'I'
+        bits = self.word_size * 8
+        offsets, base = [], 0
+        for index in range(section.size // self.word_size):
+            entry, = self._unpack(fmt, section.offset + index * self.word_size)
+            if entry & 1 == 0:
+                offsets.append(entry)
+                base = entry + self.word_size
+                continue
+            for bit in range(1, bits):
+                if entry >> bit & 1:
+                    offsets.append(base + (bit - 1) * self.word_size)
+            base += (bits - 1) * self.word_size
+        return offsets
+
+    def relocation_sections(self) -> List[ElfSection]:
+        return [section for section in self.sections
+                if section.type in (SHT_REL, SHT_RELA, SHT_RELR, SHT_ANDROID_REL, SHT_ANDROID_RELA,
+                                    SHT_ANDROID_RELR)]
+
+
+def read_archive(data: bytes, name: str = "<archive>") -> List[Tuple[str, bytes]]:
+    """Members of a GNU or BSD ar archive as (name, bytes), symbol tables excluded."""
+    if data.startswith(THIN_AR_MAGIC):
+        raise ElfError(f"{name}: thin archives reference their members by path; pass the objects instead")
+    if not data.startswith(AR_MAGIC):
+        raise ElfError(f"{name}: not an ar archive")
+    members: List[Tuple[str, bytes]] = []
+    long_names = b''
+    offset = len(AR_MAGIC)
+    while offset + 60 <= len(data):
+        header = data[offset:offset + 60]
+        if header[58:60] != b'`\n':
+            raise ElfError(f"{name}: corrupt member header at offset {offset}")
+        member_name = header[:16].decode('utf-8', 'replace').rstrip()
+        size = int(header[48:58].decode().strip() or 0)
+        body = data[offset + 60:offset + 60 + size]
+        offset += 60 + size + (size & 1)
+
+        if member_name in ('/', '/SYM64/') or member_name.startswith('__.SYMDEF'):
+            continue
+        if member_name == '//':
+            long_names = body
+            continue
+        if member_name.startswith('#1/'):
+            # BSD: the name precedes the member data
+            length = int(member_name[3:])
+            member_name, body = body[:length].rstrip(b'\0').decode('utf-8', 'replace'), body[length:]
+            if member_name.startswith('__.SYMDEF'):
+                continue
+        elif member_name.startswith('/') and member_name[1:].isdigit():
+            start = int(member_name[1:])
+            end = long_names.find(b'/\n', start)
+            member_name = long_names[start:end if end >= 0 else len(long_names)].decode('utf-8', 'replace')
+        else:
+            member_name = member_name.rstrip('/')
+        members.append((member_name, body))
+    return members
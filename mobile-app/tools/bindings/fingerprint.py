@@ -0,0 +1,142 @@
+"""
+Fingerprints of the generated bridge for skipping slow build steps.
+
+After generation the bridge publishes digests of what its downstream steps
+consume: React Native codegen reads the TurboModule specs (`src/Native*.ts`)
+and the module's `codegenConfig`; `pod install` depends on the set of native
+files the podspec globs, the podspec itself and the specs (it runs codegen for
+the new architecture). Only names of the native files count, since Xcode
+recompiles edited sources on its own.
+
+Each gated step leaves a stamp next to its outputs after a successful run,
+holding its digest combined with the app-level inputs of the step (Podfile,
+package.json, ...). `tools/fingerprint.py check <step>` compares the two, so
+a clean of the outputs also drops the stamp.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_FINGERPRINT_FILE = "build/bindings.fingerprint.json"
+DEFAULT_STEPS = {
+    "codegen": {
+        "stamp": "ios/build/generated/.nimbridge-codegen.json",
+        "inputs": ["package.json"],
+    },
+    "pods": {
+        "stamp": "ios/Pods/.nimbridge-pods.json",
+        "inputs": ["package.json", "ios/Podfile", "ios/Podfile.lock"],
+    },
+}
+NATIVE_SUFFIXES = ('.h', '.m', '.mm', '.a')
+
+
+def fingerprint_path(config, base_dir: Path, output_dir: Path) -> Path:
+    """Published fingerprint; `fingerprint.file` is relative to the app, the default to the module."""
+    configured = config.data.get('fingerprint', {}).get('file')
+    return base_dir / configured if configured else output_dir / DEFAULT_FINGERPRINT_FILE
+
+
+def fingerprint_steps(config) -> Dict[str, dict]:
+    steps = {name: dict(step) for name, step in DEFAULT_STEPS.items()}
+    for name, overrides in config.data.get('fingerprint', {}).get('steps', {}).items():
+        if name not in steps:
+            raise ValueError(f"fingerprint.steps: unknown step '{name}' (known: {', '.join(steps)})")
+        steps[name].update(overrides)
+    return steps
+
+
+def _digest(parts: Iterable[bytes]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        # Length-prefixed so that moving bytes between parts changes the digest
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _file_parts(paths: Iterable[Path], root: Path) -> List[bytes]:
+    """Relative name and content of each file; absent files count as absent."""
+    parts = []
+    for path in paths:
+        parts.append(path.relative_to(root).as_posix().encode())
+        parts.append(path.read_bytes() if path.is_file() else b'\0missing')
+    return parts
+
+
+def bridge_fingerprint(output_dir: Path) -> Dict[str, str]:
+    """Digests of the generated module per downstream step."""
+    specs = sorted((output_dir / "src").glob("Native*.ts"))
+    package = output_dir / "package.json"
+    codegen_config = json.loads(package.read_text()).get('codegenConfig') if package.is_file() else None
+    codegen = _digest(_file_parts(specs, output_dir) + [json.dumps(codegen_config, sort_keys=True).encode()])
+
+    native_files = sorted(path.relative_to(output_dir).as_posix()
+                          for path in (output_dir / "ios").rglob("*") if path.suffix in NATIVE_SUFFIXES)
+    podspecs = sorted(output_dir.glob("*.podspec"))
+    pods = _digest([codegen.encode(), *(name.encode() for name in native_files),
+                    *_file_parts(podspecs, output_dir)])
+    return {"codegen": codegen, "pods": pods}
+
+
+def publish_fingerprint(path: Path, fingerprint: Dict[str, str]) -> bool:
+    """Write the fingerprint when it changed; returns whether it did."""
+    text = json.dumps(fingerprint, indent=2, sort_keys=True) + "\n"
+    if path.is_file() and path.read_text() == text:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return True
+
+
+class StepGate:
+    """Decides whether a gated build step has to run, and records its successful runs."""
+
+    def __init__(self, config, base_dir: Path, output_dir: Path):
+        self.base_dir = base_dir
+        self.fingerprint_file = fingerprint_path(config, base_dir, output_dir)
+        self.steps = fingerprint_steps(config)
+
+    def _step(self, step: str) -> dict:
+        if step not in self.steps:
+            raise ValueError(f"Unknown step '{step}' (known: {', '.join(sorted(self.steps))})")
+        return self.steps[step]
+
+    def stamp_path(self, step: str) -> Path:
+        return self.base_dir / self._step(step)['stamp']
+
+    def current(self, step: str) -> Optional[str]:
+        """Digest the step would record now, or None without a published fingerprint."""
+        inputs = [self.base_dir / name for name in self._step(step).get('inputs', [])]
+        if not self.fingerprint_file.is_file():
+            return None
+        bridge = json.loads(self.fingerprint_file.read_text()).get(step)
+        if bridge is None:
+            return None
+        return _digest([bridge.encode(), *_file_parts(inputs, self.base_dir)])
+
+    def stale_reason(self, step: str) -> Optional[str]:
+        """Why the step must run, or None when its last successful run is still current."""
+        current = self.current(step)
+        if current is None:
+            return f"no published fingerprint at {self.fingerprint_file} (run tools/generate_bindings.py)"
+        stamp = self.stamp_path(step)
+        if not stamp.is_file():
+            return f"no record of a previous run ({stamp.relative_to(self.base_dir)})"
+        try:
+            recorded = json.loads(stamp.read_text()).get('digest')
+        except ValueError:
+            return f"unreadable stamp {stamp.relative_to(self.base_dir)}"
+        if recorded != current:
+            return "generated spec, native file set or step inputs changed"
+        return None
+
+    def record(self, step: str) -> None:
+        current = self.current(step)
+        if current is None:
+            raise ValueError(f"No published fingerprint at {self.fingerprint_file}")
+        stamp = self.stamp_path(step)
+        stamp.parent.mkdir(parents=True, exist_ok=True)
+        stamp.write_text(json.dumps({"digest": current}) + "\n")
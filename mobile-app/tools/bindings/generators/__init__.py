@@ -3,13 +3,20 @@ Platform-specific code generators for Nim bridge bindings.
 """
 
 from .base import CodeGenerator
+from .emitter import Emitter
+from .fragments import FragmentCache
 from .ios import CppWrapperGenerator, ObjcHeaderGenerator, ObjcBridgeGenerator
 from .android import AndroidKotlinGenerator, AndroidKotlinPackageGenerator, AndroidJNIGenerator
-from .typescript import TypeScriptInterfaceGenerator
+from .typescript import TypeScriptInterfaceGenerator, TypeScriptModuleGenerator
 from .cmake import CMakeGenerator
+from .events import EventRingHeaderGenerator
+from .budget import SyncBudgetHeaderGenerator
+from .memory import MemoryTelemetryHeaderGenerator
 
 __all__ = [
     'CodeGenerator',
+    'Emitter',
+    'FragmentCache',
     'CppWrapperGenerator',
     'ObjcHeaderGenerator', 
     'ObjcBridgeGenerator',
@@ -17,5 +24,9 @@ __all__ = [
     'AndroidKotlinPackageGenerator',
     'AndroidJNIGenerator',
     'TypeScriptInterfaceGenerator',
-    'CMakeGenerator'
+    'TypeScriptModuleGenerator',
+    'CMakeGenerator',
+    'EventRingHeaderGenerator',
+    'SyncBudgetHeaderGenerator',
+    'MemoryTelemetryHeaderGenerator'
 ]
\ No newline at end of file
@@ -2,33 +2,104 @@
 Android platform generators for Nim bridge (Kotlin/JNI).
 """
 
-from typing import List
+from typing import List, Optional
 
 from .base import CodeGenerator
-from ..models import NimFunction
+from .emitter import Emitter
+from .fragments import fragment
+from .events import (
+    CALL_ID_PARAM, callback_c_params, callback_typedef_name, callback_trampoline_name,
+    callback_typedefs, event_ring_definitions, json_payload_builder,
+)
+from .budget import REPORT_FILE, records_sync_budget
+from .dispatch import DispatchTable, shape_function, uses_table_dispatch
+from .memory import (
+    memory_hook_definitions, memory_scope, records_memory, scratch_buffer_definitions,
+)
+from .mapped import mapped_functions, mapped_release, mapped_releases
+from .shards import shard_count, shard_index
+from .precompute import callee, precomputed_functions
+from .vectorize import (
+    VECTOR_PARAM_TYPES, VECTOR_RETURN_TYPES, parallel_for_definition, vector_functions, vector_kernel,
+    vector_kernel_name, vector_name,
+)
+from ..models import NimConstant, NimFunction, NimHandleType
 from ..config import GeneratorConfig
 
 
+# Signature-shape kinds of the JNI trampolines (see dispatch.py); JNI passes
+# every non-string argument as jint and copies scratch returns like literals
+JNI_PARAM_KINDS = {'cstring': 's', 'string': 's'}
+JNI_RETURN_KINDS = {'allocated': 'a', 'int64': 'l'}
+JNI_KIND_PARAM_TYPES = {'s': 'cstring', 'i': 'cint'}
+JNI_KIND_RETURN_TYPES = {'s': 'cstring', 'a': 'cstring', 'l': 'int64', 'i': 'cint'}
+
+# C element type of a vectorized column -> (Kotlin array, JNI array, JNI element type, JNI accessor stem)
+JNI_VECTOR_ARRAYS = {
+    'int32_t': ('IntArray', 'jintArray', 'jint', 'Int'),
+    'uint8_t': ('ByteArray', 'jbyteArray', 'jbyte', 'Byte'),
+    'double': ('DoubleArray', 'jdoubleArray', 'jdouble', 'Double'),
+}
+
+
+def jni_class_name(config: GeneratorConfig) -> str:
+    """Mangled Kotlin module class in the `Java_<class>_<method>` JNI symbols."""
+    return f"{config.package_name.replace('.', '_')}_{config.module_name}Module"
+
+
+def jni_dispatch_table(generator: CodeGenerator) -> Optional[DispatchTable]:
+    """Shape table shared by the Kotlin module and the JNI bridge, if table dispatch is on."""
+    if not uses_table_dispatch(generator.config, generator.functions):
+        return None
+    return DispatchTable(generator.functions, generator.handle_types, JNI_PARAM_KINDS, JNI_RETURN_KINDS)
+
+
 class AndroidKotlinGenerator(CodeGenerator):
     """Generates Android Kotlin module code."""
 
-    def __init__(self, functions: List[NimFunction], config: GeneratorConfig):
-        super().__init__(functions, config)
+    def __init__(self, functions: List[NimFunction], config: GeneratorConfig,
+                 event_channels: Optional[List[str]] = None,
+                 handle_types: Optional[List[NimHandleType]] = None,
+                 constants: Optional[List[NimConstant]] = None,
+                 scratch: bool = False):
+        super().__init__(functions, config, event_channels, handle_types, constants, scratch)
+        self.dispatch = jni_dispatch_table(self)
 
-    def generate(self) -> str:
+    def emit(self, code: Emitter) -> None:
         """Generate Android Kotlin module."""
-        code = self._generate_kotlin_header()
-        code += self._generate_native_declarations()
-        code += self._generate_kotlin_methods()
+        code += self._generate_kotlin_header()
+        self._emit_native_declarations(code)
+        self._emit_kotlin_methods(code)
+        if self.has_events:
+            code += self._generate_kotlin_event_methods()
         code += "}"
-        return code
 
     def _generate_kotlin_header(self) -> str:
         """Generate the Kotlin module header with TurboModule support."""
         header = self._generate_header("Kotlin module for Nim bridge")
+        imports = []
+        if self.has_events:
+            imports += ["com.facebook.react.bridge.Arguments", "com.facebook.react.bridge.Callback",
+                        "com.facebook.react.bridge.WritableArray", "java.lang.ref.WeakReference"]
+        if any(func.async_variant for func in self.functions):
+            imports += ["com.facebook.react.bridge.Promise", "java.util.concurrent.ExecutorService",
+                        "java.util.concurrent.Executors"]
+        if vector_functions(self.functions):
+            imports += ["com.facebook.react.bridge.Arguments", "com.facebook.react.bridge.ReadableArray",
+                        "com.facebook.react.bridge.WritableArray"]
+        if self.handle_types:
+            imports += ["com.facebook.react.bridge.Arguments", "com.facebook.react.bridge.ReadableMap",
+                        "com.facebook.react.bridge.WritableMap", "java.util.concurrent.ConcurrentHashMap",
+                        "java.util.concurrent.atomic.AtomicInteger"]
+        if mapped_functions(self.functions):
+            imports += ["com.facebook.react.bridge.Arguments", "com.facebook.react.bridge.ReadableMap",
+                        "com.facebook.react.bridge.WritableArray", "com.facebook.react.bridge.WritableMap",
+                        "java.nio.ByteBuffer", "java.util.concurrent.ConcurrentHashMap",
+                        "java.util.concurrent.atomic.AtomicInteger"]
+        event_imports = "".join(f"import {name}\n" for name in sorted(set(imports)))
         return f"""{header}package {self.config.package_name}
 
-import com.facebook.react.bridge.ReactApplicationContext
+{event_imports}import com.facebook.react.bridge.ReactApplicationContext
 import com.facebook.react.module.annotations.ReactModule
 import {self.config.package_name}.Native{self.config.module_name}Spec
 
@@ -50,90 +121,400 @@ class {self.config.module_name}Module(reactContext: ReactApplicationContext) : N
 
 """
 
-    def _generate_native_declarations(self) -> str:
+    def _emit_native_declarations(self, code: Emitter) -> None:
         """Generate native method declarations."""
-        declarations = ""
         for func in self.functions:
+            if self.dispatch and self.dispatch.slot(func):
+                continue
             ret_type = self._get_kotlin_native_return_type(func.return_type)
             params_str = self._build_kotlin_native_params(func)
-            declarations += f"        @JvmStatic\n"
-            declarations += f"        private external fun native{func.name[0].upper() + func.name[1:]}({params_str}): {ret_type}\n"
-        declarations += "    }\n    \n    override fun getName(): String = NAME\n\n"
-        return declarations
+            code += f"        @JvmStatic\n"
+            code += f"        private external fun native{func.name[0].upper() + func.name[1:]}({params_str}): {ret_type}\n"
+        for func in vector_functions(self.functions):
+            params_str = ", ".join(f"{name}: {JNI_VECTOR_ARRAYS[VECTOR_PARAM_TYPES[ptype][1]][0]}"
+                                   for name, ptype in func.params)
+            ret_type = JNI_VECTOR_ARRAYS[VECTOR_RETURN_TYPES[func.return_type][1]][0]
+            code += f"        @JvmStatic\n"
+            code += f"        private external fun {self._vector_native_name(func)}({params_str}): {ret_type}\n"
+        for release in mapped_releases(self.functions):
+            code += f"        @JvmStatic\n"
+            code += f"        private external fun {self._native_name(release)}(buffer: ByteBuffer)\n"
+        if self.dispatch and self.dispatch.shapes:
+            code += "\n        // Table dispatch: one native entry point per signature shape, exports selected by slot\n"
+            for shape in self.dispatch.shapes:
+                rep = shape_function(shape, f"nativeCall{shape}", JNI_KIND_RETURN_TYPES, JNI_KIND_PARAM_TYPES)
+                params_str = ", ".join(p for p in ["slot: Int", self._build_kotlin_native_params(rep)] if p)
+                code += f"        @JvmStatic\n"
+                code += f"        private external fun nativeCall{shape}({params_str}): {self._get_kotlin_native_return_type(rep.return_type)}\n"
+        if self.has_events:
+            code += f"""
+        @Volatile
+        private var activeContext: WeakReference<ReactApplicationContext>? = null
+
+        // Called from native code (any thread) when the event ring becomes non-empty
+        @JvmStatic
+        fun onNativeEventsPending() {{
+            activeContext?.get()?.emitDeviceEvent("{self.config.module_name}EventsPending", null)
+        }}
+
+        @JvmStatic
+        private external fun nativeDrainEvents(max: Int): Array<String>
+        @JvmStatic
+        private external fun nativeEventsListenerAttached()
+"""
+        if records_sync_budget(self.config):
+            code += """
+        @JvmStatic
+        private external fun nativeRecordSyncCall(function: Int, durationUs: Long, argBytes: Int)
+        @JvmStatic
+        private external fun nativeSyncBudgetReport(): String
+"""
+        if records_memory(self.config):
+            code += """
+        @JvmStatic
+        private external fun nativeMemoryStats(): String
+"""
+        code += "    }\n    \n"
+        if self.has_events:
+            code += "    init {\n        activeContext = WeakReference(reactContext)\n    }\n\n"
+        code += "    override fun getName(): String = NAME\n\n"
+        if any(func.async_variant for func in self.functions):
+            code += """    // Async variants run in call order on one background thread
+    private val asyncExecutor: ExecutorService = Executors.newSingleThreadExecutor { runnable ->
+        Thread(runnable, "${NAME}Async")
+    }
+
+"""
+        if self.handle_types:
+            code += self._generate_kotlin_handle_registry()
+        if mapped_functions(self.functions):
+            code += self._generate_kotlin_mapped_registry()
+        code += self._generate_kotlin_invalidate()
+
+    def _generate_kotlin_invalidate(self) -> str:
+        """Generate module teardown for async executors and live handles."""
+        body = ""
+        if any(func.async_variant for func in self.functions):
+            body += "        asyncExecutor.shutdown()\n"
+        if self.handle_types:
+            body += """        // Finalizer for handles JS never released: drop them with the module
+        for (id in handles.keys.toList()) {
+            handles.remove(id)?.let { it.release(it.ptr) }
+        }
+"""
+        if mapped_functions(self.functions):
+            body += """        for (id in mappedBlobs.keys.toList()) {
+            mappedBlobs.remove(id)?.let { it.release?.invoke(it.buffer) }
+        }
+"""
+        if not body:
+            return ""
+        return f"""    override fun invalidate() {{
+        super.invalidate()
+{body}    }}
+
+"""
+
+    def _generate_kotlin_handle_registry(self) -> str:
+        """Generate the table mapping JS-visible handle ids to native Nim pointers."""
+        return """    // Live Nim objects by id; JS only sees the id since tagged native pointers
+    // do not survive a round trip through a JS number
+    private class NimHandle(val type: String, val ptr: Long, val release: (Long) -> Unit)
+
+    private val handles = ConcurrentHashMap<Int, NimHandle>()
+    private val nextHandleId = AtomicInteger(1)
+
+    private fun wrapHandle(type: String, ptr: Long, release: (Long) -> Unit): WritableMap {
+        require(ptr != 0L) { "$type constructor returned nil" }
+        val id = nextHandleId.getAndIncrement()
+        handles[id] = NimHandle(type, ptr, release)
+        val map = Arguments.createMap()
+        map.putInt("__nimHandle", id)
+        map.putString("type", type)
+        return map
+    }
+
+    private fun unwrapHandle(map: ReadableMap, type: String): Long {
+        val handle = if (map.hasKey("__nimHandle")) handles[map.getInt("__nimHandle")] else null
+        require(handle != null && handle.type == type) { "$type has been released" }
+        return handle.ptr
+    }
+
+    private fun releaseHandle(map: ReadableMap) {
+        if (!map.hasKey("__nimHandle")) return
+        handles.remove(map.getInt("__nimHandle"))?.let { it.release(it.ptr) }
+    }
+
+"""
+
+    def _generate_kotlin_mapped_registry(self) -> str:
+        """Generate the table of @mapped blobs: direct ByteBuffers over Nim memory, by id."""
+        return """    // Mapped blobs by id. Kotlin TurboModules cannot return ArrayBuffers, so the
+    // bytes stay in native memory and JS reads ranges through readMappedBlob
+    private class MappedBlob(val buffer: ByteBuffer, val release: ((ByteBuffer) -> Unit)?)
+
+    private val mappedBlobs = ConcurrentHashMap<Int, MappedBlob>()
+    private val nextMappedId = AtomicInteger(1)
+
+    private fun wrapMapped(buffer: ByteBuffer?, release: ((ByteBuffer) -> Unit)?): WritableMap {
+        // A null result is an empty blob with nothing to release
+        val blob = if (buffer != null) MappedBlob(buffer, release) else MappedBlob(ByteBuffer.allocateDirect(0), null)
+        val id = nextMappedId.getAndIncrement()
+        mappedBlobs[id] = blob
+        val map = Arguments.createMap()
+        map.putInt("__nimMapped", id)
+        map.putDouble("byteLength", blob.buffer.capacity().toDouble())
+        return map
+    }
+
+    // Read-only view of a live blob, for native code handed the JS object; valid until it is released
+    fun mappedBuffer(blob: ReadableMap): ByteBuffer? {
+        if (!blob.hasKey("__nimMapped")) return null
+        return mappedBlobs[blob.getInt("__nimMapped")]?.buffer?.asReadOnlyBuffer()
+    }
+
+"""
+
+    def _generate_kotlin_event_methods(self) -> str:
+        """Generate event channel overrides."""
+        return f"""
+    override fun drainEvents(max: Double): WritableArray {{
+        val items = nativeDrainEvents(max.toInt())
+        val result = Arguments.createArray()
+        for (item in items) {{
+            result.pushString(item)
+        }}
+        return result
+    }}
 
-    def _generate_kotlin_methods(self) -> str:
+    override fun setEventsPendingListener(listener: Callback) {{
+        // Java callbacks are single-shot, so wake-ups arrive as "{self.config.module_name}EventsPending" device events
+        nativeEventsListenerAttached()
+    }}
+"""
+
+    def _emit_kotlin_methods(self, code: Emitter) -> None:
         """Generate Kotlin TurboModule override methods."""
-        methods = ""
         for func in self.functions:
-            js_name = func.js_name or func.name
-            params_str = self._build_kotlin_method_params(func)
-            ret_type = self._get_kotlin_return_type(func.return_type)
+            code += self._generate_kotlin_method(func)
+        if records_sync_budget(self.config):
+            code += f"""
+    private fun recordSyncCall(function: Int, start: Long, argBytes: Int) {{
+        nativeRecordSyncCall(function, (System.nanoTime() - start) / 1000, argBytes)
+    }}
 
-            methods += f"\n    override fun {js_name}({params_str}): {ret_type} {{\n"
-            methods += f"        return try {{\n"
-            methods += self._generate_kotlin_method_call(func)
-            methods += self._generate_kotlin_error_handling(func)
-            methods += f"    }}\n"
-        return methods
+    override fun getSyncBudgetReport(): String {{
+        val report = nativeSyncBudgetReport()
+        try {{
+            java.io.File(reactApplicationContext.cacheDir, "{REPORT_FILE}").writeText(report)
+        }} catch (e: Exception) {{
+            android.util.Log.w(NAME, "Failed to persist sync budget report: ${{e.message}}")
+        }}
+        return report
+    }}
+"""
+        if mapped_functions(self.functions):
+            code += """
+    override fun readMappedBlob(blob: ReadableMap, offset: Double, length: Double): WritableArray {
+        val buffer = requireNotNull(mappedBuffer(blob)) { "Mapped blob has been released" }
+        val start = offset.toLong().coerceIn(0L, buffer.capacity().toLong()).toInt()
+        val end = (start + length.toLong().coerceAtLeast(0L)).coerceAtMost(buffer.capacity().toLong()).toInt()
+        val array = Arguments.createArray()
+        for (i in start until end) {
+            array.pushInt(buffer.get(i).toInt() and 0xff)
+        }
+        return array
+    }
+
+    override fun releaseMappedBlob(blob: ReadableMap) {
+        if (!blob.hasKey("__nimMapped")) return
+        mappedBlobs.remove(blob.getInt("__nimMapped"))?.let { it.release?.invoke(it.buffer) }
+    }
+"""
+        if records_memory(self.config):
+            code += """
+    override fun getNativeMemoryStats(): String = nativeMemoryStats()
+"""
+
+    @fragment
+    def _generate_kotlin_method(self, func: NimFunction) -> str:
+        """Generate the TurboModule override of one export, plus its async and vector variants."""
+        js_name = func.js_name or func.name
+        params_str = self._build_kotlin_method_params(func)
+        ret_type = self._get_kotlin_return_type(func.return_type)
+
+        code = f"\n    override fun {js_name}({params_str}): {ret_type} {{\n"
+        if records_sync_budget(self.config):
+            arg_bytes = " + ".join(f"{name}.length" if ptype in ['cstring', 'string'] else "8"
+                                   for name, ptype in func.params) or "0"
+            code += "        val syncStart = System.nanoTime()\n"
+            code += "        val result = try {\n"
+            code += self._generate_kotlin_method_call(func)
+            code += self._generate_kotlin_error_handling(func)
+            code += f"        recordSyncCall({self.function_index(func)}, syncStart, {arg_bytes})\n"
+            code += "        return result\n"
+        else:
+            code += f"        return try {{\n"
+            code += self._generate_kotlin_method_call(func)
+            code += self._generate_kotlin_error_handling(func)
+        code += f"    }}\n"
+        if func.async_variant:
+            code += self._generate_kotlin_async_method(func)
+        if func.vector_variant:
+            code += self._generate_kotlin_vector_method(func)
+        return code
+
+    def _generate_kotlin_async_method(self, func: NimFunction) -> str:
+        """Generate the Promise variant running the native call on the async executor."""
+        js_name = func.js_name or func.name
+        params_str = ", ".join(p for p in [self._build_kotlin_method_params(func), "promise: Promise"] if p)
+        call = self._generate_kotlin_method_call(func).strip()
+        return f"""
+    override fun {js_name}Async({params_str}) {{
+        asyncExecutor.execute {{
+            try {{
+                promise.resolve({call})
+            }} catch (e: Exception) {{
+                promise.reject("NIM_ERROR", e.message, e)
+            }}
+        }}
+    }}
+"""
+
+    def _generate_kotlin_vector_method(self, func: NimFunction) -> str:
+        """Generate the array-in/array-out companion, one native call for the whole batch."""
+        name = vector_name(func)
+        first = func.params[0][0]
+        body = ""
+        for param, _ in func.params[1:]:
+            body += f'            require({param}.size() == {first}.size()) {{ "{name}: arrays differ in length" }}\n'
+        args = []
+        for param, ptype in func.params:
+            array_type = JNI_VECTOR_ARRAYS[VECTOR_PARAM_TYPES[ptype][1]][0]
+            element = "toInt().toByte()" if array_type == "ByteArray" else "toInt()"
+            args.append(f"{array_type}({param}.size()) {{ {param}.getDouble(it).{element} }}")
+        body += f"            val result = {self._vector_native_name(func)}({', '.join(args)})\n"
+        push = "pushDouble(value)" if func.return_type == 'int64' else "pushInt(value.toInt())"
+        params_str = ", ".join(f"{param}: ReadableArray" for param, _ in func.params)
+        return f"""
+    override fun {name}({params_str}): WritableArray {{
+        return try {{
+{body}            val array = Arguments.createArray()
+            for (value in result) {{
+                array.{push}
+            }}
+            array
+        }} catch (e: Exception) {{
+            Arguments.createArray()
+        }}
+    }}
+"""
+
+    @staticmethod
+    def _native_name(name: str) -> str:
+        return f"native{name[0].upper() + name[1:]}"
+
+    @staticmethod
+    def _vector_native_name(func: NimFunction) -> str:
+        return f"native{func.name[0].upper() + func.name[1:]}Many"
 
     def _get_kotlin_return_type(self, nim_type: str) -> str:
         """Get Kotlin return type for TurboModule spec."""
-        if nim_type in ['cstring', 'string']:
+        if nim_type in self.handle_types or nim_type == 'mapped':
+            return "WritableMap"
+        elif nim_type == 'void':
+            return "Unit"
+        elif nim_type in ['cstring', 'string']:
             return "String"
         elif nim_type == 'bool':
             return "Boolean"
         else:
             return "Double"
 
-    @staticmethod
-    def _get_kotlin_native_return_type(nim_type: str) -> str:
+    def _get_kotlin_native_return_type(self, nim_type: str) -> str:
         """Get the native return type for Kotlin."""
         if nim_type in ['cstring', 'string']:
             return "String"
-        elif nim_type == 'int64':
+        elif nim_type == 'int64' or nim_type in self.handle_types:
             return "Long"
+        elif nim_type == 'mapped':
+            return "ByteBuffer?"
+        elif nim_type == 'void':
+            return "Unit"
         return "Int"
 
-    @staticmethod
-    def _build_kotlin_native_params(func: NimFunction) -> str:
+    def _build_kotlin_native_params(self, func: NimFunction) -> str:
         """Build parameter string for native Kotlin method."""
         params = []
         for name, ptype in func.params:
-            if ptype in ['cint', 'int']:
+            if ptype == 'callback':
+                continue
+            if ptype in self.handle_types:
+                params.append(f"{name}: Long")
+            elif ptype in ['cint', 'int']:
                 params.append(f"{name}: Int")
             elif ptype in ['cstring', 'string']:
                 params.append(f"{name}: String")
             else:
                 params.append(f"{name}: Int")
+        if func.callbacks:
+            params.append(f"{CALL_ID_PARAM}: Int")
         return ', '.join(params)
 
-    @staticmethod
-    def _build_kotlin_method_params(func: NimFunction) -> str:
+    def _build_kotlin_method_params(self, func: NimFunction) -> str:
         """Build parameter string for Kotlin React method."""
         params = []
         for name, ptype in func.params:
-            if ptype in ['cint', 'int']:
+            if ptype in self.handle_types:
+                params.append(f"{name}: ReadableMap")
+            elif ptype in ['cint', 'int']:
                 params.append(f"{name}: Double")
             elif ptype in ['cstring', 'string']:
                 params.append(f"{name}: String")
+            elif ptype == 'callback':
+                params.append(f"{name}: Callback")
             else:
                 params.append(f"{name}: Double")
+        if func.callbacks:
+            params.append(f"{CALL_ID_PARAM}: Double")
         return ', '.join(params)
 
     def _generate_kotlin_method_call(self, func: NimFunction) -> str:
         """Generate the native method call."""
+        if self.is_release(func):
+            return f"            releaseHandle({func.params[0][0]})\n"
+
         args = []
         for name, ptype in func.params:
-            if ptype in ['cint', 'int']:
+            if ptype == 'callback':
+                # Delivered natively through the event ring
+                continue
+            if ptype in self.handle_types:
+                args.append(f'unwrapHandle({name}, "{ptype}")')
+            elif ptype in ['cint', 'int']:
                 args.append(f"{name}.toInt()")
             else:
                 args.append(name)
-        args_str = ', '.join(args)
-
+        if func.callbacks:
+            args.append(f"{CALL_ID_PARAM}.toInt()")
         method_name = f"native{func.name[0].upper() + func.name[1:]}"
+        slot = self.dispatch.slot(func) if self.dispatch else None
+        if slot:
+            method_name = f"nativeCall{slot[0]}"
+            args.insert(0, str(slot[1]))
+        args_str = ', '.join(args)
 
         # Generate return based on return type
-        if func.return_type == 'bool':
+        if func.return_type in self.handle_types:
+            release = self.handle_types[func.return_type].release
+            native_release = f"native{release[0].upper() + release[1:]}"
+            return f'            wrapHandle("{func.return_type}", {method_name}({args_str})) {{ {native_release}(it) }}\n'
+        elif func.return_type == 'mapped':
+            release = mapped_release(func)
+            if release:
+                return f"            wrapMapped({method_name}({args_str})) {{ {self._native_name(release)}(it) }}\n"
+            return f"            wrapMapped({method_name}({args_str}), null)\n"
+        elif func.return_type == 'bool':
             return f"            {method_name}({args_str}) != 0\n"
         elif func.return_type in ['cstring', 'string']:
             return f"            {method_name}({args_str})\n"
@@ -143,7 +524,11 @@ class {self.config.module_name}Module(reactContext: ReactApplicationContext) : N
     def _generate_kotlin_error_handling(self, func: NimFunction) -> str:
         """Generate error handling for Kotlin method."""
         error_code = "        } catch (e: Exception) {\n"
-        if func.return_type == 'bool':
+        if func.return_type in self.handle_types or func.return_type == 'mapped':
+            error_code += "            Arguments.createMap()\n"
+        elif func.return_type == 'void':
+            error_code += "            Unit\n"
+        elif func.return_type == 'bool':
             error_code += "            false\n"
         elif func.return_type in ['cstring', 'string']:
             error_code += '            "Error: ${e.message}"\n'
@@ -201,37 +586,78 @@ class {self.config.module_name}Package : TurboReactPackage() {{
 class AndroidJNIGenerator(CodeGenerator):
     """Generates Android JNI C++ bridge code."""
 
-    def __init__(self, functions: List[NimFunction], config: GeneratorConfig):
-        super().__init__(functions, config)
+    def __init__(self, functions: List[NimFunction], config: GeneratorConfig,
+                 event_channels: Optional[List[str]] = None,
+                 handle_types: Optional[List[NimHandleType]] = None,
+                 constants: Optional[List[NimConstant]] = None,
+                 scratch: bool = False):
+        super().__init__(functions, config, event_channels, handle_types, constants, scratch)
+        self.dispatch = jni_dispatch_table(self)
 
-    def generate(self) -> str:
+    def emit(self, code: Emitter) -> None:
         """Generate Android JNI C++ bridge."""
-        code = self._generate_jni_header()
+        self._emit_jni_header(code)
         code += self._generate_jni_initialization()
-        code += self._generate_jni_methods()
+        self._emit_jni_methods(code)
+
+    def generate_shard(self, index: int) -> str:
+        """Generate an extra translation unit holding the JNI methods of one shard."""
+        funcs = [func for func in self.functions if shard_index(self, func, self.dispatch) == index]
+        code = CodeGenerator._generate_header(f"JNI C++ bridge shard {index} of {shard_count(self.config)}")
+        code += "#include <jni.h>\n#include <string>\n"
+        if records_memory(self.config):
+            code += f"\n#include \"{self.config.module_name}Memory.h\"\n"
+        code += "\n// Import the Nim functions\nextern \"C\" {\n"
+        for func in funcs:
+            code += f"    {self._get_jni_function_return_type(func.return_type)} {func.name}({self._build_jni_function_params(func)});\n"
+        code += "    void freeString(const char* s);\n}\n\n"
+        if precomputed_functions(funcs):
+            code += f"#include \"{self.config.module_name}Precomputed.h\"\n\n"
+        code += "// Defined in the main bridge translation unit\nvoid initializeNim();\n\n"
+        for func in funcs:
+            code += self._generate_jni_method(func)
         return code
 
-    def _generate_jni_header(self) -> str:
+    def _emit_jni_header(self, code: Emitter) -> None:
         """Generate JNI header and function declarations."""
-        code = CodeGenerator._generate_header("JNI C++ bridge for Android")
-        code += "#include <jni.h>\n#include <string>\n\n"
+        code += CodeGenerator._generate_header("JNI C++ bridge for Android")
+        code += "#include <jni.h>\n#include <string>\n"
+        if self.needs_scratch:
+            code += "#include <memory>\n"
+        if mapped_functions(self.functions):
+            code += "#include <cstdint>\n"
+        if vector_functions(self.functions):
+            code += "#include <algorithm>\n#include <atomic>\n#include <condition_variable>\n#include <functional>\n#include <mutex>\n#include <thread>\n"
+            if not self.has_events:
+                code += "#include <vector>\n"
+        if self.has_events:
+            code += f"#include <vector>\n\n#include \"{self.config.module_name}Events.h\"\n"
+        if records_sync_budget(self.config):
+            code += f"#include \"{self.config.module_name}Budget.h\"\n"
+        if records_memory(self.config):
+            code += f"#include \"{self.config.module_name}Memory.h\"\n"
+        code += "\n"
         code += "// Import the Nim functions\nextern \"C\" {\n"
+        code += callback_typedefs(self.functions, self.type_mapper, string_type="const char*")
 
         for func in self.functions:
             params_str = self._build_jni_function_params(func)
             ret_type = self._get_jni_function_return_type(func.return_type)
             code += f"    {ret_type} {func.name}({params_str});\n"
-
-        return code
+        for release in mapped_releases(self.functions):
+            code += f"    void {release}(void* data);\n"
 
     def _generate_jni_initialization(self) -> str:
         """Generate JNI initialization code."""
-        return """    void mobileNimInit();
+        code = """    void mobileNimInit();
     void mobileNimShutdown();
     void freeString(const char* s);
 }
 
-// Initialize Nim when the library loads
+"""
+        if precomputed_functions(self.functions):
+            code += f"#include \"{self.config.module_name}Precomputed.h\"\n\n"
+        code += """// Initialize Nim when the library loads
 static bool nimInitialized = false;
 
 void initializeNim() {
@@ -242,18 +668,258 @@ void initializeNim() {
 }
 
 """
+        if self.needs_scratch:
+            code += scratch_buffer_definitions(self.config)
+        if records_memory(self.config):
+            code += memory_hook_definitions()
+        if vector_functions(self.functions):
+            code += parallel_for_definition("android").lstrip("\n") + "\n"
+            for func in vector_functions(self.functions):
+                code += vector_kernel(self.config, func)
+        if self.has_events:
+            code += self._generate_jni_event_support()
+        return code
+
+    def _generate_jni_event_support(self) -> str:
+        """Generate the event ring, JS wake-up path and callback trampolines."""
+        module_class = f"{self.config.package_name.replace('.', '/')}/{self.config.module_name}Module"
+        code = event_ring_definitions(self)
+        code += f"""static JavaVM* gJavaVM = nullptr;
+static jclass gModuleClass = nullptr;
+static jmethodID gOnEventsPending = nullptr;
+
+extern "C" JNIEXPORT jint JNICALL JNI_OnLoad(JavaVM* vm, void* reserved) {{
+    gJavaVM = vm;
+    JNIEnv* env = nullptr;
+    if (vm->GetEnv(reinterpret_cast<void**>(&env), JNI_VERSION_1_6) != JNI_OK) {{
+        return JNI_ERR;
+    }}
+    jclass moduleClass = env->FindClass("{module_class}");
+    if (moduleClass) {{
+        gModuleClass = static_cast<jclass>(env->NewGlobalRef(moduleClass));
+        gOnEventsPending = env->GetStaticMethodID(moduleClass, "onNativeEventsPending", "()V");
+        env->DeleteLocalRef(moduleClass);
+    }}
+    if (env->ExceptionCheck()) {{
+        env->ExceptionClear();
+    }}
+    return JNI_VERSION_1_6;
+}}
 
-    def _generate_jni_methods(self) -> str:
+// Producers may run on any thread; attach just long enough to post the wake-up
+static void nimBridgeNotifyEventsPending() {{
+    if (!gJavaVM || !gModuleClass || !gOnEventsPending) {{
+        gNimBridgeEvents.releaseWakeup();
+        return;
+    }}
+    JNIEnv* env = nullptr;
+    bool attached = false;
+    if (gJavaVM->GetEnv(reinterpret_cast<void**>(&env), JNI_VERSION_1_6) == JNI_EDETACHED) {{
+        if (gJavaVM->AttachCurrentThread(&env, nullptr) != JNI_OK) {{
+            gNimBridgeEvents.releaseWakeup();
+            return;
+        }}
+        attached = true;
+    }}
+    env->CallStaticVoidMethod(gModuleClass, gOnEventsPending);
+    if (env->ExceptionCheck()) {{
+        env->ExceptionClear();
+    }}
+    if (attached) {{
+        gJavaVM->DetachCurrentThread();
+    }}
+}}
+
+"""
+        channels = self.all_event_channels()
+        if any(func.callbacks for func in self.functions):
+            code += """// Id of the JS call in progress on this thread. Nim callbacks carry no context
+// pointer, so trampolines put it first in their payloads and JS routes each
+// delivery to its own call. Invocations outside a call are dropped.
+static thread_local jint gNimBridgeCallId = 0;
+
+struct NimBridgeCallbackCall {
+    explicit NimBridgeCallbackCall(jint callId) : previous(gNimBridgeCallId) { gNimBridgeCallId = callId; }
+    ~NimBridgeCallbackCall() { gNimBridgeCallId = previous; }
+    jint previous;
+};
+
+"""
+        for func in self.functions:
+            for param_name in func.callbacks:
+                c_params = callback_c_params(func, param_name, self.type_mapper, string_type="const char*")
+                params_str = ", ".join(f"{ctype} {name}" for ctype, name in c_params) or "void"
+                channel_index = channels.index(func.callback_channel(param_name))
+                code += f"static void {callback_trampoline_name(func, param_name)}({params_str}) {{\n"
+                code += "    if (!gNimBridgeCallId) {\n"
+                code += "        gNimBridgeEvents.countDropped();\n"
+                code += "        return;\n"
+                code += "    }\n"
+                code += json_payload_builder(func, param_name, call_id="gNimBridgeCallId")
+                code += f"    nimBridgePushEvent({channel_index}, std::move(payload));  // {func.callback_channel(param_name)}\n"
+                code += "}\n\n"
+        return code
+
+    def _emit_jni_methods(self, code: Emitter) -> None:
         """Generate all JNI method implementations."""
-        methods = ""
         for func in self.functions:
-            methods += self._generate_jni_method(func)
-        return methods
+            if (self.dispatch and self.dispatch.slot(func)) or shard_index(self, func, self.dispatch):
+                continue
+            code += self._generate_jni_method(func)
+        for func in vector_functions(self.functions):
+            code += self._generate_jni_vector_method(func)
+        if self.dispatch and self.dispatch.shapes:
+            code += self._generate_jni_dispatch_methods()
+        if mapped_releases(self.functions):
+            code += self._generate_jni_mapped_release_methods()
+        if self.has_events:
+            code += self._generate_jni_event_methods()
+        if records_sync_budget(self.config):
+            code += self._generate_jni_budget_methods()
+        if records_memory(self.config):
+            code += self._generate_jni_memory_methods()
+
+    def _generate_jni_dispatch_methods(self) -> str:
+        """Generate per-shape Nim function tables and one JNI entry point per shape."""
+        class_name = jni_class_name(self.config)
+        code = "// Table dispatch: exports grouped by signature shape, one JNI entry point per shape\n"
+        for shape, funcs in self.dispatch.shapes.items():
+            rep = shape_function(shape, f"kExports{shape}[slot]", JNI_KIND_RETURN_TYPES, JNI_KIND_PARAM_TYPES)
+            c_params = ", ".join(ptype.rsplit(" ", 1)[0] for ptype in self._build_jni_function_params(rep).split(", ")
+                                 if ptype) or "void"
+            code += f"using NimShape{shape} = {self._get_jni_function_return_type(rep.return_type)} (*)({c_params});\n"
+            code += f"static const NimShape{shape} kExports{shape}[] = {{\n"
+            for func in funcs:
+                code += f"    {callee(func)},  // {func.js_name or func.name}\n"
+            code += "};\n"
+            export_index = None
+            if records_memory(self.config):
+                export_index = f"kExportIds{shape}[slot]"
+                ids = ", ".join(str(self.function_index(func)) for func in funcs)
+                code += f"static const size_t kExportIds{shape}[] = {{{ids}}};\n"
+            code += "\n"
+
+            jni_params = self._build_jni_method_params(rep).replace("jclass clazz", "jclass clazz, jint slot")
+            code += f'extern "C" JNIEXPORT {self._get_jni_return_type(rep.return_type)} JNICALL\n'
+            code += f"Java_{class_name}_nativeCall{shape}({jni_params}) {{\n"
+            code += "    initializeNim();\n"
+            code += self._generate_jni_method_body(rep, export_index=export_index)
+            code += "}\n\n"
+        return code
+
+    @fragment
+    def _generate_jni_vector_method(self, func: NimFunction) -> str:
+        """Generate the JNI entry point of a vectorized companion.
+
+        Results are written straight into the returned Java array.
+        """
+        class_name = jni_class_name(self.config)
+        out_type = VECTOR_RETURN_TYPES[func.return_type][1]
+        _, out_array, out_element, out_stem = JNI_VECTOR_ARRAYS[out_type]
+        params = ["JNIEnv *env", "jclass clazz"]
+        params += [f"{JNI_VECTOR_ARRAYS[VECTOR_PARAM_TYPES[ptype][1]][1]} {name}" for name, ptype in func.params]
+        first = func.params[0][0]
+
+        body = f"    jsize count = env->GetArrayLength({first});\n"
+        args = []
+        for name, ptype in func.params:
+            element = VECTOR_PARAM_TYPES[ptype][1]
+            _, _, jni_element, stem = JNI_VECTOR_ARRAYS[element]
+            body += f"    {jni_element}* {name}Values = env->Get{stem}ArrayElements({name}, nullptr);\n"
+            args.append(f"reinterpret_cast<const {element}*>({name}Values)")
+        body += f"    {out_array} output = env->New{out_stem}Array(count);\n"
+        body += f"    {out_element}* out = env->Get{out_stem}ArrayElements(output, nullptr);\n"
+        body += f"    {vector_kernel_name(func)}({', '.join(args)}, reinterpret_cast<{out_type}*>(out), static_cast<size_t>(count));\n"
+        body += f"    env->Release{out_stem}ArrayElements(output, out, 0);\n"
+        for name, ptype in func.params:
+            stem = JNI_VECTOR_ARRAYS[VECTOR_PARAM_TYPES[ptype][1]][3]
+            body += f"    env->Release{stem}ArrayElements({name}, {name}Values, JNI_ABORT);\n"
+        body += "    return output;\n"
+        return f"""extern "C" JNIEXPORT {out_array} JNICALL
+Java_{class_name}_{AndroidKotlinGenerator._vector_native_name(func)}({', '.join(params)}) {{
+    initializeNim();
+{body}}}
 
+"""
+
+    def _generate_jni_mapped_release_methods(self) -> str:
+        """Generate the JNI entry points handing released blobs back to their Nim release hooks."""
+        class_name = jni_class_name(self.config)
+        code = ""
+        for release in mapped_releases(self.functions):
+            code += f"""extern "C" JNIEXPORT void JNICALL
+Java_{class_name}_{AndroidKotlinGenerator._native_name(release)}(JNIEnv *env, jclass clazz, jobject buffer) {{
+    void* data = env->GetDirectBufferAddress(buffer);
+    if (data) {release}(data);
+}}
+
+"""
+        return code
+
+    def _generate_jni_memory_methods(self) -> str:
+        """Generate the JNI entry point of getNativeMemoryStats."""
+        class_name = jni_class_name(self.config)
+        return f"""extern "C" JNIEXPORT jstring JNICALL
+Java_{class_name}_nativeMemoryStats(JNIEnv *env, jclass clazz) {{
+    return env->NewStringUTF(nimbridge::MemoryTelemetry::instance().reportJson().c_str());
+}}
+
+"""
+
+    def _generate_jni_budget_methods(self) -> str:
+        """Generate JNI entry points for the sync call recorder."""
+        class_name = jni_class_name(self.config)
+        return f"""extern "C" JNIEXPORT void JNICALL
+Java_{class_name}_nativeRecordSyncCall(JNIEnv *env, jclass clazz, jint function, jlong durationUs, jint argBytes) {{
+    nimbridge::SyncBudgetRecorder::instance().record(static_cast<size_t>(function), static_cast<uint64_t>(durationUs),
+                                                     static_cast<size_t>(argBytes));
+}}
+
+extern "C" JNIEXPORT jstring JNICALL
+Java_{class_name}_nativeSyncBudgetReport(JNIEnv *env, jclass clazz) {{
+    return env->NewStringUTF(nimbridge::SyncBudgetRecorder::instance().reportJson().c_str());
+}}
+
+"""
+
+    def _generate_jni_event_methods(self) -> str:
+        """Generate JNI entry points for draining the event ring."""
+        class_name = jni_class_name(self.config)
+        return f"""extern "C" JNIEXPORT jobjectArray JNICALL
+Java_{class_name}_nativeDrainEvents(JNIEnv *env, jclass clazz, jint max) {{
+    size_t limit = max > 0 ? static_cast<size_t>(max) : 1;
+    std::vector<nimbridge::Event> batch;
+    batch.reserve(limit);
+    gNimBridgeEvents.drain(batch, limit);
+
+    // Flat [channel, payload, channel, payload, ...]
+    jclass stringClass = env->FindClass("java/lang/String");
+    jobjectArray result = env->NewObjectArray(static_cast<jsize>(batch.size() * 2), stringClass, nullptr);
+    for (size_t i = 0; i < batch.size(); i++) {{
+        jstring channel = env->NewStringUTF(nimbridge::kEventChannels[batch[i].channel]);
+        jstring payload = env->NewStringUTF(batch[i].payload.c_str());
+        env->SetObjectArrayElement(result, static_cast<jsize>(i * 2), channel);
+        env->SetObjectArrayElement(result, static_cast<jsize>(i * 2 + 1), payload);
+        env->DeleteLocalRef(channel);
+        env->DeleteLocalRef(payload);
+    }}
+    env->DeleteLocalRef(stringClass);
+    return result;
+}}
+
+extern "C" JNIEXPORT void JNICALL
+Java_{class_name}_nativeEventsListenerAttached(JNIEnv *env, jclass clazz) {{
+    if (!gNimBridgeEvents.empty() && gNimBridgeEvents.claimWakeup()) {{
+        nimBridgeNotifyEventsPending();
+    }}
+}}
+
+"""
+
+    @fragment
     def _generate_jni_method(self, func: NimFunction) -> str:
         """Generate a single JNI method."""
-        package_path = self.config.package_name.replace('.', '_')
-        class_name = f"{package_path}_{self.config.module_name}Module"
+        class_name = jni_class_name(self.config)
         method_name = f"native{func.name[0].upper() + func.name[1:]}"
 
         jni_params = self._build_jni_method_params(func)
@@ -267,49 +933,71 @@ void initializeNim() {
 
         return method_code
 
-    @staticmethod
-    def _build_jni_function_params(func: NimFunction) -> str:
+    def _build_jni_function_params(self, func: NimFunction) -> str:
         """Build parameter string for function declaration."""
         params = []
         for name, ptype in func.params:
-            if ptype in ['cstring', 'string']:
+            if ptype in self.handle_types:
+                params.append(f"void* {name}")
+            elif ptype in ['cstring', 'string']:
                 params.append(f"const char* {name}")
+            elif ptype == 'callback':
+                params.append(f"{callback_typedef_name(func, name)} {name}")
             else:
                 params.append(f"int {name}")
+        if func.return_type == 'mapped':
+            params.append("size_t* byteLength")
         return ', '.join(params)
 
-    @staticmethod
-    def _get_jni_function_return_type(nim_type: str) -> str:
+    def _get_jni_function_return_type(self, nim_type: str) -> str:
         """Get C function return type."""
-        if nim_type in ['cstring', 'string']:
+        if nim_type in self.handle_types or nim_type == 'mapped':
+            return "void*"
+        elif nim_type == 'void':
+            return "void"
+        elif nim_type in ['cstring', 'string']:
             return "const char*"
         elif nim_type == 'int64':
             return "long long"
         return "int"
 
-    @staticmethod
-    def _build_jni_method_params(func: NimFunction) -> str:
+    def _build_jni_method_params(self, func: NimFunction) -> str:
         """Build parameter string for JNI method."""
         jni_params = ['JNIEnv *env', 'jclass clazz']
         for name, ptype in func.params:
-            if ptype in ['cstring', 'string']:
+            if ptype == 'callback':
+                continue
+            if ptype in self.handle_types:
+                jni_params.append(f"jlong {name}")
+            elif ptype in ['cstring', 'string']:
                 jni_params.append(f"jstring {name}")
             else:
                 jni_params.append(f"jint {name}")
+        if func.callbacks:
+            jni_params.append(f"jint {CALL_ID_PARAM}")
         return ', '.join(jni_params)
 
-    @staticmethod
-    def _get_jni_return_type(nim_type: str) -> str:
+    def _get_jni_return_type(self, nim_type: str) -> str:
         """Get JNI return type."""
         if nim_type in ['cstring', 'string']:
             return "jstring"
-        elif nim_type == 'int64':
+        elif nim_type == 'int64' or nim_type in self.handle_types:
             return "jlong"
+        elif nim_type == 'mapped':
+            return "jobject"
+        elif nim_type == 'void':
+            return "void"
         return "jint"
 
-    def _generate_jni_method_body(self, func: NimFunction) -> str:
-        """Generate the body of a JNI method."""
-        body = ""
+    def _generate_jni_method_body(self, func: NimFunction, export_index: Optional[str] = None) -> str:
+        """Generate the body of a JNI method.
+
+        `export_index` replaces the function's index in the memory records
+        inside shared trampolines.
+        """
+        body = memory_scope(self, func, index=export_index)
+        if func.callbacks:
+            body += f"    NimBridgeCallbackCall callbackCall({CALL_ID_PARAM});\n"
 
         # Handle string parameter conversion
         for name, ptype in func.params:
@@ -321,13 +1009,17 @@ void initializeNim() {
         for name, ptype in func.params:
             if ptype in ['cstring', 'string']:
                 actual_params.append(f"{name}Str")
+            elif ptype == 'callback':
+                actual_params.append(callback_trampoline_name(func, name))
+            elif ptype in self.handle_types:
+                actual_params.append(f"reinterpret_cast<void*>({name})")
             else:
                 actual_params.append(name)
         actual_params_str = ', '.join(actual_params)
 
         # Generate call and return based on type
         if func.return_type in ['cstring', 'string']:
-            body += f"    const char* result = {func.name}({actual_params_str});\n"
+            body += f"    const char* result = {callee(func)}({actual_params_str});\n"
             body += f"    jstring javaString = env->NewStringUTF(result);\n"
             if func.memory_type == 'allocated':
                 body += f"    if (result) freeString(result);\n"
@@ -336,15 +1028,44 @@ void initializeNim() {
                 if ptype in ['cstring', 'string']:
                     body += f"    env->ReleaseStringUTFChars({name}, {name}Str);\n"
             body += f"    return javaString;\n"
+        elif func.return_type in self.handle_types:
+            body += f"    void* result = {callee(func)}({actual_params_str});\n"
+            for name, ptype in func.params:
+                if ptype in ['cstring', 'string']:
+                    body += f"    env->ReleaseStringUTFChars({name}, {name}Str);\n"
+            body += "    return reinterpret_cast<jlong>(result);\n"
+        elif func.return_type == 'mapped':
+            release = mapped_release(func)
+            body += "    size_t byteLength = 0;\n"
+            body += f"    void* result = {callee(func)}({', '.join(actual_params + ['&byteLength'])});\n"
+            for name, ptype in func.params:
+                if ptype in ['cstring', 'string']:
+                    body += f"    env->ReleaseStringUTFChars({name}, {name}Str);\n"
+            body += "    if (!result) return nullptr;\n"
+            body += "    // Java buffers are indexed by int\n"
+            body += "    if (byteLength > static_cast<size_t>(INT32_MAX)) {\n"
+            if release:
+                body += f"        {release}(result);\n"
+            body += "        jclass error = env->FindClass(\"java/lang/IllegalArgumentException\");\n"
+            body += f"        env->ThrowNew(error, \"{func.js_name or func.name}: mapped blob exceeds 2 GiB\");\n"
+            body += "        return nullptr;\n"
+            body += "    }\n"
+            body += "    // Wraps the Nim memory in place; released through the Kotlin registry\n"
+            body += "    return env->NewDirectByteBuffer(result, static_cast<jlong>(byteLength));\n"
+        elif func.return_type == 'void':
+            body += f"    {callee(func)}({actual_params_str});\n"
+            for name, ptype in func.params:
+                if ptype in ['cstring', 'string']:
+                    body += f"    env->ReleaseStringUTFChars({name}, {name}Str);\n"
         elif func.return_type == 'int64':
-            body += f"    long long result = {func.name}({actual_params_str});\n"
+            body += f"    long long result = {callee(func)}({actual_params_str});\n"
             # Release string parameters before return
             for name, ptype in func.params:
                 if ptype in ['cstring', 'string']:
                     body += f"    env->ReleaseStringUTFChars({name}, {name}Str);\n"
             body += "    return (jlong)result;\n"
         else:
-            body += f"    int result = {func.name}({actual_params_str});\n"
+            body += f"    int result = {callee(func)}({actual_params_str});\n"
             # Release string parameters before return
             for name, ptype in func.params:
                 if ptype in ['cstring', 'string']:
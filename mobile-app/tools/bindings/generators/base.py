@@ -2,23 +2,101 @@
 Base code generator class for all platform-specific generators.
 """
 
-from typing import List
+import json
+from typing import List, Optional
 
-from ..models import NimFunction, TypeMapper
+from .emitter import Emitter
+from .fragments import FragmentCache
+from ..models import NimConstant, NimFunction, NimHandleType, TypeMapper
 from ..config import GeneratorConfig
 
 
 class CodeGenerator:
     """Base class for code generators."""
 
-    def __init__(self, functions: List[NimFunction], config: GeneratorConfig):
+    # FragmentCache for the @fragment renderers, attached by the orchestrator
+    fragments: Optional[FragmentCache] = None
+
+    def __init__(self, functions: List[NimFunction], config: GeneratorConfig,
+                 event_channels: Optional[List[str]] = None,
+                 handle_types: Optional[List[NimHandleType]] = None,
+                 constants: Optional[List[NimConstant]] = None,
+                 scratch: bool = False):
         self.functions = functions
         self.config = config
-        self.type_mapper = TypeMapper(config)
+        # Set when exports that are compiled in but not bridged use the scratch buffer
+        self.scratch = scratch
+        self.event_channels = event_channels or []
+        self.constants = constants or []
+        self.handle_types = {handle.name: handle for handle in handle_types or []}
+        self.type_mapper = TypeMapper(config, self.handle_types)
+
+    @property
+    def has_events(self) -> bool:
+        """Whether the event ring (declared channels or callback delivery) is needed."""
+        return bool(self.event_channels) or any(func.callbacks for func in self.functions)
+
+    @property
+    def needs_scratch(self) -> bool:
+        """Whether the bridge must define `nimBridgeScratch` for the Nim library."""
+        from .memory import uses_scratch
+        return self.scratch or uses_scratch(self.functions)
+
+    def all_event_channels(self) -> List[str]:
+        """Declared channels followed by the per-callback delivery channels."""
+        channels = list(self.event_channels)
+        for func in self.functions:
+            channels.extend(func.callback_channel(name) for name in func.callbacks)
+        return channels
+
+    def is_release(self, func: NimFunction) -> bool:
+        """Whether the function is the @release hook of a handle type."""
+        return any(handle.release == func.name for handle in self.handle_types.values())
+
+    def handle_methods(self, handle: NimHandleType) -> List[NimFunction]:
+        """Exports taking the handle as their first parameter, excluding its release hook."""
+        return [func for func in self.functions
+                if func.params and func.params[0][1] == handle.name and func.name != handle.release]
+
+    def function_index(self, func: NimFunction) -> int:
+        """Position of `func` in `functions`, the export id of the budget and memory recorders."""
+        if getattr(self, '_function_indices', None) is None:
+            self._function_indices = {id(f): i for i, f in enumerate(self.functions)}
+        index = self._function_indices.get(id(func))
+        return self.functions.index(func) if index is None else index
+
+    def fragment_environment(self) -> str:
+        """Digest of the generator state (besides the function) that fragments may depend on."""
+        if getattr(self, '_fragment_environment', None) is None:
+            self._fragment_environment = FragmentCache.key(
+                type(self).__name__, json.dumps(self.config.data, sort_keys=True),
+                sorted(repr(handle) for handle in self.handle_types.values()),
+                self.event_channels, self.has_events, self.constants)
+        return self._fragment_environment
+
+    def fragment_context(self, func: NimFunction) -> tuple:
+        """Per-function inputs of a fragment that are not fields of `func`."""
+        from .budget import records_sync_budget
+        from .memory import records_memory
+        dispatch = getattr(self, 'dispatch', None)
+        slot = dispatch.slot(func) if dispatch else None
+        index = None
+        if records_sync_budget(self.config) or records_memory(self.config):
+            # Only then does the position of the export appear in its code
+            index = self.function_index(func)
+        return slot, index
 
     def generate(self) -> str:
         """Generate code for the target platform."""
-        raise NotImplementedError
+        if type(self).emit is CodeGenerator.emit:
+            raise NotImplementedError
+        code = Emitter()
+        self.emit(code)
+        return code.getvalue()
+
+    def emit(self, code: Emitter) -> None:
+        """Write the generated code into `code`; large generators override this instead of generate()."""
+        code += self.generate()
 
     @staticmethod
     def _generate_header(description: str) -> str:
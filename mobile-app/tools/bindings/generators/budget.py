@@ -0,0 +1,171 @@
+"""
+Frame budget instrumentation shared by the iOS and Android bridges.
+
+When `frame_budget.record` is enabled every sync call is timed, the last
+samples per function are kept for percentile analysis and calls over the
+budget are logged with their argument size.
+"""
+
+from typing import List, Optional
+
+from .base import CodeGenerator
+from ..models import NimFunction
+
+
+DEFAULT_FRAME_BUDGET_MS = 8.0
+SAMPLE_WINDOW = 128
+MAX_VIOLATIONS = 256
+REPORT_FILE = "NimBridgeSyncBudget.json"
+
+
+def frame_budget_ms(config) -> float:
+    return float(config.data.get('frame_budget', {}).get('budget_ms', DEFAULT_FRAME_BUDGET_MS))
+
+
+def records_sync_budget(config) -> bool:
+    return bool(config.data.get('frame_budget', {}).get('record', False))
+
+
+def sync_timer(generator: CodeGenerator, func: NimFunction, arg_bytes: List[str], indent: str = "    ",
+               index: Optional[str] = None) -> str:
+    """RAII timer statement recording the enclosing sync call, if enabled.
+
+    `index` overrides the function's position with a runtime expression, for
+    trampolines shared by several exports.
+    """
+    if not records_sync_budget(generator.config):
+        return ""
+    if index is None:
+        index = generator.function_index(func)
+    return f"{indent}nimbridge::SyncCallTimer syncTimer({index}, {' + '.join(arg_bytes) or '0'});\n"
+
+
+class SyncBudgetHeaderGenerator(CodeGenerator):
+    """Generates the sync call recorder header used by both bridges."""
+
+    def generate(self) -> str:
+        """Generate NimBridgeBudget.h."""
+        code = CodeGenerator._generate_header("sync call frame budget recorder")
+        budget_us = int(frame_budget_ms(self.config) * 1000)
+
+        code += """#pragma once
+
+#include <chrono>
+#include <cstddef>
+#include <cstdint>
+#include <mutex>
+#include <string>
+
+namespace nimbridge {
+
+// JS names of the bridged functions, indexed by the generated call sites
+static const char* const kSyncFunctionNames[] = {
+"""
+        for func in self.functions:
+            code += f'    "{func.js_name or func.name}",\n'
+        code += f"""}};
+static constexpr size_t kSyncFunctionCount = {len(self.functions)};
+static constexpr uint64_t kFrameBudgetUs = {budget_us};
+static constexpr size_t kSampleWindow = {SAMPLE_WINDOW};
+static constexpr size_t kMaxViolations = {MAX_VIOLATIONS};
+
+class SyncBudgetRecorder {{
+public:
+    static SyncBudgetRecorder &instance() {{
+        static SyncBudgetRecorder recorder;
+        return recorder;
+    }}
+
+    void record(size_t function, uint64_t durationUs, size_t argBytes) {{
+        if (function >= kSyncFunctionCount) return;
+        uint32_t duration = durationUs > UINT32_MAX ? UINT32_MAX : static_cast<uint32_t>(durationUs);
+        uint32_t bytes = argBytes > UINT32_MAX ? UINT32_MAX : static_cast<uint32_t>(argBytes);
+
+        std::lock_guard<std::mutex> lock(mutex_);
+        Stats &stats = stats_[function];
+        stats.calls++;
+        stats.samplesUs[stats.next] = duration;
+        stats.next = (stats.next + 1) % kSampleWindow;
+        if (stats.filled < kSampleWindow) stats.filled++;
+        if (bytes > stats.maxArgBytes) stats.maxArgBytes = bytes;
+        if (duration > kFrameBudgetUs) {{
+            stats.violations++;
+            violations_[violationCount_ % kMaxViolations] = {{static_cast<uint32_t>(function), duration, bytes}};
+            violationCount_++;
+        }}
+    }}
+
+    // {{"budgetMs", "functions": {{name: {{calls, violations, maxArgBytes, samplesUs}}}}, "violations": [...]}}
+    std::string reportJson() {{
+        std::lock_guard<std::mutex> lock(mutex_);
+        std::string out = "{{\\"budgetMs\\":" + std::to_string(kFrameBudgetUs / 1000.0) + ",\\"functions\\":{{";
+        bool first = true;
+        for (size_t i = 0; i < kSyncFunctionCount; i++) {{
+            const Stats &stats = stats_[i];
+            if (!stats.calls) continue;
+            if (!first) out += ',';
+            first = false;
+            out += "\\"" + std::string(kSyncFunctionNames[i]) + "\\":{{\\"calls\\":" + std::to_string(stats.calls)
+                + ",\\"violations\\":" + std::to_string(stats.violations)
+                + ",\\"maxArgBytes\\":" + std::to_string(stats.maxArgBytes) + ",\\"samplesUs\\":[";
+            for (size_t s = 0; s < stats.filled; s++) {{
+                if (s) out += ',';
+                out += std::to_string(stats.samplesUs[s]);
+            }}
+            out += "]}}";
+        }}
+        out += "}},\\"violations\\":[";
+        size_t count = violationCount_ < kMaxViolations ? static_cast<size_t>(violationCount_) : kMaxViolations;
+        for (size_t v = 0; v < count; v++) {{
+            const Violation &violation = violations_[(violationCount_ - count + v) % kMaxViolations];
+            if (v) out += ',';
+            out += "{{\\"function\\":\\"" + std::string(kSyncFunctionNames[violation.function])
+                + "\\",\\"durationUs\\":" + std::to_string(violation.durationUs)
+                + ",\\"argBytes\\":" + std::to_string(violation.argBytes) + "}}";
+        }}
+        out += "]}}";
+        return out;
+    }}
+
+private:
+    struct Stats {{
+        uint64_t calls = 0;
+        uint64_t violations = 0;
+        uint32_t maxArgBytes = 0;
+        uint32_t samplesUs[kSampleWindow] = {{}};
+        size_t next = 0;
+        size_t filled = 0;
+    }};
+
+    struct Violation {{
+        uint32_t function;
+        uint32_t durationUs;
+        uint32_t argBytes;
+    }};
+
+    std::mutex mutex_;
+    Stats stats_[kSyncFunctionCount > 0 ? kSyncFunctionCount : 1];
+    Violation violations_[kMaxViolations] = {{}};
+    uint64_t violationCount_ = 0;
+}};
+
+// Records the duration of the enclosing scope as one sync call
+class SyncCallTimer {{
+public:
+    SyncCallTimer(size_t function, size_t argBytes)
+        : function_(function), argBytes_(argBytes), start_(std::chrono::steady_clock::now()) {{}}
+
+    ~SyncCallTimer() {{
+        auto elapsed = std::chrono::duration_cast<std::chrono::microseconds>(std::chrono::steady_clock::now() - start_);
+        SyncBudgetRecorder::instance().record(function_, static_cast<uint64_t>(elapsed.count()), argBytes_);
+    }}
+
+private:
+    size_t function_;
+    size_t argBytes_;
+    std::chrono::steady_clock::time_point start_;
+}};
+
+}} // namespace nimbridge
+"""
+        return code
@@ -2,18 +2,34 @@
 CMake configuration generator for Android NDK build.
 """
 
-from typing import List
+import json
+import shlex
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 from .base import CodeGenerator
+from .emitter import Emitter
+from .pgo import PROFILE_FILE, profile_c_flags, resolve_build_profile, uses_pgo_profile
+from .shards import shard_file_names
 from ..models import NimFunction
 from ..config import GeneratorConfig
 
 
+# Flags from the Nim build manifest that are safe to forward to the NDK
+# toolchain; include paths, outputs and host-specific options are dropped.
+DEFAULT_MANIFEST_FLAG_PREFIXES = [
+    "-D", "-U", "-O", "-std=", "-w", "-fno-strict-aliasing", "-fno-ident",
+    "-fwrapv", "-fno-omit-frame-pointer",
+]
+
+
 class CMakeGenerator(CodeGenerator):
     """Generates CMakeLists.txt for Android NDK build."""
 
-    def __init__(self, functions: List[NimFunction], config: GeneratorConfig):
+    def __init__(self, functions: List[NimFunction], config: GeneratorConfig,
+                 nim_dir: Optional[Path] = None):
         super().__init__(functions, config)
+        self.nim_dir = nim_dir
 
     @staticmethod
     def _generate_cmake_header(description: str) -> str:
@@ -24,11 +40,11 @@ class CMakeGenerator(CodeGenerator):
 
 """
 
-    def generate(self) -> str:
+    def emit(self, code: Emitter) -> None:
         """Generate dynamic CMakeLists.txt based on configuration and function analysis."""
         cmake_config = self.config.data.get('cmake', {})
 
-        code = self._generate_cmake_header("CMakeLists.txt for Android NDK")
+        code += self._generate_cmake_header("CMakeLists.txt for Android NDK")
 
         # Dynamic CMake version and project
         min_version = cmake_config.get('min_version', '3.13')
@@ -48,30 +64,24 @@ set(PACKAGE_NAME "{self.config.library_name}")
             "${CMAKE_SOURCE_DIR}/../../../nim/cache_android"
         ])
 
-        code += "# Auto-discover Nim compiled C files from configured locations\nset(POSSIBLE_CACHE_DIRS\n"
+        manifest = self._load_build_manifest() if cmake_config.get('use_build_manifest', True) else None
+
+        if manifest:
+            code += "# Nim cache locations (compile units come from the Nim build manifest)\nset(POSSIBLE_CACHE_DIRS\n"
+        else:
+            code += "# Auto-discover Nim compiled C files from configured locations\nset(POSSIBLE_CACHE_DIRS\n"
         for path in cache_paths:
             code += f'    "{path}"\n'
         code += ")\n\n"
 
-        # File discovery logic (this part is genuinely dynamic)
-        code += """set(NIM_C_FILES "")
-foreach(CACHE_DIR ${POSSIBLE_CACHE_DIRS})
-    file(GLOB_RECURSE FOUND_FILES "${CACHE_DIR}/*.c")
-    if(FOUND_FILES)
-        list(APPEND NIM_C_FILES ${FOUND_FILES})
-        message(STATUS "Found Nim C files in: ${CACHE_DIR}")
-        break()
-    endif()
-endforeach()
-
-if(NOT NIM_C_FILES)
-    message(FATAL_ERROR "No Nim C files found in any of these locations: ${POSSIBLE_CACHE_DIRS}")
-endif()
-
-"""
+        if manifest:
+            code += self._generate_cache_dir_resolution()
+            code += self._generate_manifest_sources(*manifest)
+        else:
+            code += self._generate_glob_sources()
 
         # Analyze functions to determine required sources
-        cpp_files = ["NimBridge.cpp"]
+        cpp_files = ["NimBridge.cpp"] + shard_file_names(self.config, "cpp")
         if self._has_string_functions():
             code += "# String handling detected - additional memory management may be needed\n"
         if self._has_math_functions():
@@ -92,19 +102,10 @@ add_library(
             ".", "${NIM_CACHE_DIR}", "${NIM_SOURCE_DIR}"
         ])
 
-        code += """# Auto-determine include directories
-set(NIM_CACHE_DIR "")
-foreach(CACHE_DIR ${POSSIBLE_CACHE_DIRS})
-    if(EXISTS "${CACHE_DIR}")
-        set(NIM_CACHE_DIR "${CACHE_DIR}")
-        break()
-    endif()
-endforeach()
-
-# Get the nim source directory (parent of cache directory)
-get_filename_component(NIM_SOURCE_DIR "${NIM_CACHE_DIR}" DIRECTORY)
+        if not manifest:
+            code += self._generate_cache_dir_resolution()
 
-target_include_directories(
+        code += """target_include_directories(
         ${PACKAGE_NAME}
         PRIVATE
 """
@@ -117,7 +118,7 @@ target_include_directories(
         code += self._generate_compile_definitions(defines)
 
         # Dynamic compiler flags
-        compiler_flags = cmake_config.get('compiler_flags', [])
+        compiler_flags = cmake_config.get('compiler_flags', []) + profile_c_flags(resolve_build_profile(self.config))
         if compiler_flags:
             code += f"""# Additional compiler flags
 target_compile_options(${{PACKAGE_NAME}} PRIVATE
@@ -126,6 +127,9 @@ target_compile_options(${{PACKAGE_NAME}} PRIVATE
                 code += f"    {flag}\n"
             code += ")\n\n"
 
+        if uses_pgo_profile(self.config):
+            code += self._generate_pgo_options()
+
         # Dynamic link libraries
         link_libs = cmake_config.get('link_libraries', ['android', 'log', 'm', 'atomic'])
         if self._has_math_functions() and 'm' not in link_libs:
@@ -139,6 +143,168 @@ target_link_libraries(
             code += f"        {lib}\n"
         code += ")\n"
 
+    @staticmethod
+    def _generate_pgo_options() -> str:
+        """Apply the merged PGO profile installed by tools/pgo.py, when present."""
+        return f"""# Profile-guided optimization (tools/pgo.py installs the merged host profile here)
+set(NIM_PGO_PROFILE "${{CMAKE_CURRENT_SOURCE_DIR}}/{PROFILE_FILE}")
+if(EXISTS "${{NIM_PGO_PROFILE}}")
+    message(STATUS "Using PGO profile: ${{NIM_PGO_PROFILE}}")
+    target_compile_options(${{PACKAGE_NAME}} PRIVATE
+        "-fprofile-instr-use=${{NIM_PGO_PROFILE}}"
+        -Wno-profile-instr-unprofiled
+        -Wno-profile-instr-out-of-date
+    )
+endif()
+
+"""
+
+    @staticmethod
+    def _generate_glob_sources() -> str:
+        """Generate recursive glob discovery of Nim C files (no manifest available)."""
+        return """set(NIM_C_FILES "")
+foreach(CACHE_DIR ${POSSIBLE_CACHE_DIRS})
+    # Prefer a per-ABI nimcache (tools/build_native.py) over a shared one
+    if(EXISTS "${CACHE_DIR}/${ANDROID_ABI}")
+        set(CACHE_DIR "${CACHE_DIR}/${ANDROID_ABI}")
+    endif()
+    file(GLOB_RECURSE FOUND_FILES "${CACHE_DIR}/*.c")
+    if(FOUND_FILES)
+        list(APPEND NIM_C_FILES ${FOUND_FILES})
+        message(STATUS "Found Nim C files in: ${CACHE_DIR}")
+        break()
+    endif()
+endforeach()
+
+if(NOT NIM_C_FILES)
+    message(FATAL_ERROR "No Nim C files found in any of these locations: ${POSSIBLE_CACHE_DIRS}")
+endif()
+
+"""
+
+    @staticmethod
+    def _generate_cache_dir_resolution() -> str:
+        """Generate resolution of NIM_CACHE_DIR / NIM_SOURCE_DIR."""
+        return """# Auto-determine include directories
+set(NIM_CACHE_DIR "")
+foreach(CACHE_DIR ${POSSIBLE_CACHE_DIRS})
+    if(EXISTS "${CACHE_DIR}")
+        set(NIM_CACHE_DIR "${CACHE_DIR}")
+        break()
+    endif()
+endforeach()
+
+# Get the nim source directory (parent of cache directory)
+get_filename_component(NIM_SOURCE_DIR "${NIM_CACHE_DIR}" DIRECTORY)
+
+if(EXISTS "${NIM_CACHE_DIR}/${ANDROID_ABI}")
+    set(NIM_CACHE_DIR "${NIM_CACHE_DIR}/${ANDROID_ABI}")
+endif()
+
+"""
+
+    def _find_build_manifest(self) -> Optional[Path]:
+        """Locate the JSON build manifest Nim writes into the Android nimcache."""
+        if self.nim_dir is None:
+            return None
+        build_config = self.config.data.get('build', {})
+        project = Path(build_config.get('nim_source', 'nimbridge.nim')).stem
+        cache_root = self.nim_dir / "cache_android"
+        abis = self.config.data.get('cmake', {}).get('android_abis', [])
+        for cache_dir in [cache_root / abi for abi in abis] + [cache_root]:
+            manifest = cache_dir / f"{project}.json"
+            if manifest.is_file():
+                return manifest
+        return None
+
+    def _load_build_manifest(self) -> Optional[Tuple[List[Tuple[str, List[str]]], Path]]:
+        """Read (source, flags) compile units from the Nim build manifest."""
+        manifest_path = self._find_build_manifest()
+        if manifest_path is None:
+            return None
+
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Warning: ignoring unreadable Nim build manifest {manifest_path}: {e}")
+            return None
+
+        prefixes = self.config.data.get('cmake', {}).get('manifest_flag_prefixes',
+                                                         DEFAULT_MANIFEST_FLAG_PREFIXES)
+        units = []
+        for entry in manifest.get('compile', []):
+            c_file, command = entry[0], entry[1]
+            units.append((c_file, self._portable_flags(command, c_file, prefixes)))
+
+        if not units:
+            return None
+        return units, manifest_path.parent
+
+    @staticmethod
+    def _portable_flags(command: str, c_file: str, prefixes: List[str]) -> List[str]:
+        """Keep only the flags of a Nim compile command that carry over to CMake."""
+        try:
+            args = shlex.split(command)
+        except ValueError:
+            args = command.split()
+
+        flags = []
+        skip_next = False
+        for arg in args[1:]:
+            if skip_next:
+                skip_next = False
+                continue
+            if arg in ("-o", "-I", "-target", "--target"):
+                skip_next = True
+                continue
+            if arg == c_file or arg == "-c":
+                continue
+            if any(arg.startswith(prefix) for prefix in prefixes) and arg not in flags:
+                flags.append(arg)
+        return flags
+
+    def _cmake_source_path(self, c_file: str, cache_dir: Path) -> str:
+        """Map a manifest source path onto the CMake cache/source directory variables."""
+        path = Path(c_file)
+        if not path.is_absolute():
+            path = cache_dir / path
+        path = path.resolve()
+        for base, var in ((cache_dir, "${NIM_CACHE_DIR}"), (self.nim_dir, "${NIM_SOURCE_DIR}")):
+            try:
+                return f"{var}/{path.relative_to(base.resolve()).as_posix()}"
+            except ValueError:
+                continue
+        if (cache_dir / path.name).exists():
+            return f"${{NIM_CACHE_DIR}}/{path.name}"
+        return path.as_posix()
+
+    def _generate_manifest_sources(self, units: List[Tuple[str, List[str]]], cache_dir: Path) -> str:
+        """Generate an explicit source list with per-file flags from the Nim build manifest."""
+        code = "# Exact compile units from the Nim build manifest\nset(NIM_C_FILES\n"
+        groups: Dict[Tuple[str, ...], List[str]] = {}
+        for c_file, flags in units:
+            source = self._cmake_source_path(c_file, cache_dir)
+            code += f'    "{source}"\n'
+            groups.setdefault(tuple(flags), []).append(source)
+        code += ")\n\n"
+
+        code += """foreach(NIM_C_FILE ${NIM_C_FILES})
+    if(NOT EXISTS "${NIM_C_FILE}")
+        message(FATAL_ERROR "Nim compile unit ${NIM_C_FILE} is missing; rebuild Nim and regenerate bindings")
+    endif()
+endforeach()
+
+"""
+
+        for flags, sources in groups.items():
+            if not flags:
+                continue
+            code += "set_source_files_properties(\n"
+            for source in sources:
+                code += f'    "{source}"\n'
+            code += f'    PROPERTIES COMPILE_OPTIONS "{";".join(flags)}"\n)\n\n'
+
         return code
 
     def _generate_compile_definitions(self, defines: dict) -> str:
@@ -0,0 +1,108 @@
+"""
+Table-driven dispatch shared by the iOS and Android bridges.
+
+In table mode exports are grouped by signature shape: every shape gets one
+table of Nim function pointers and one shared trampoline doing the argument
+and result conversions, instead of a hand-expanded body per export.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from ..models import NimFunction
+
+
+DEFAULT_TABLE_THRESHOLD = 64
+DISPATCH_MODES = ('unrolled', 'table', 'auto')
+
+# Parameter and return types the trampolines know how to convert
+TABLE_TYPES = {'cstring', 'string', 'cint', 'int', 'int64', 'bool', 'float'}
+
+
+def dispatch_mode(config) -> str:
+    mode = config.data.get('dispatch', {}).get('mode', 'unrolled')
+    if mode not in DISPATCH_MODES:
+        print(f"Warning: unknown dispatch.mode '{mode}', using 'unrolled'")
+        return 'unrolled'
+    return mode
+
+
+def uses_table_dispatch(config, functions: List[NimFunction]) -> bool:
+    """Whether the bridges dispatch through signature tables.
+
+    `auto` switches to tables once the API reaches `dispatch.table_threshold`
+    exports, where per-export bodies start to dominate the bridge size.
+    """
+    mode = dispatch_mode(config)
+    if mode == 'auto':
+        threshold = int(config.data.get('dispatch', {}).get('table_threshold', DEFAULT_TABLE_THRESHOLD))
+        return len(functions) >= threshold
+    return mode == 'table'
+
+
+def table_eligible(func: NimFunction, handle_types) -> bool:
+    """Exports with callbacks, handles or no result keep their unrolled bodies."""
+    types = [func.return_type] + [ptype for _, ptype in func.params]
+    return not func.callbacks and not any(t in handle_types for t in types) and func.return_type != 'void' \
+        and all(t in TABLE_TYPES for t in types)
+
+
+def return_kind(func: NimFunction, ret_kinds: Dict[str, str]) -> str:
+    """Single-letter kind of a return.
+
+    `ret_kinds` is keyed by Nim type, or by memory mode for string returns;
+    anything unlisted is an `i` (int) or `s` (string copied, not freed).
+    """
+    if func.return_type in ['cstring', 'string']:
+        return ret_kinds.get(func.memory_type, 's')
+    return ret_kinds.get(func.return_type, 'i')
+
+
+def signature_shape(func: NimFunction, param_kinds: Dict[str, str], ret_kinds: Dict[str, str]) -> str:
+    """Shape name such as `Asi`: return kind (upper case) followed by the parameter kinds."""
+    params = "".join(param_kinds.get(ptype, 'i') for _, ptype in func.params) or "v"
+    return return_kind(func, ret_kinds).upper() + params
+
+
+class DispatchTable:
+    """Table-dispatched exports grouped by signature shape, in declaration order."""
+
+    def __init__(self, functions: List[NimFunction], handle_types,
+                 param_kinds: Dict[str, str], ret_kinds: Dict[str, str]):
+        self.shapes: "OrderedDict[str, List[NimFunction]]" = OrderedDict()
+        # Keyed by identity: the bridges look up every export, so a scan of the tables would be quadratic
+        self._slots: Dict[int, Tuple[str, int]] = {}
+        for func in functions:
+            if table_eligible(func, handle_types):
+                shape = signature_shape(func, param_kinds, ret_kinds)
+                funcs = self.shapes.setdefault(shape, [])
+                self._slots[id(func)] = (shape, len(funcs))
+                funcs.append(func)
+
+    def slot(self, func: NimFunction) -> Optional[Tuple[str, int]]:
+        """(shape, index in the shape's table), or None for unrolled exports."""
+        return self._slots.get(id(func))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+
+def shape_function(shape: str, target: str, ret_types: Dict[str, str],
+                   param_types: Dict[str, str]) -> NimFunction:
+    """Representative function of a shape, fed to the unrolled body emitters.
+
+    Parameters are named `p0..pN` and calls go to the `target` expression.
+    """
+    ret = shape[0].lower()
+    params = [] if shape[1:] == "v" else [(f"p{i}", param_types[kind]) for i, kind in enumerate(shape[1:])]
+    memory_type = {'a': 'allocated', 'r': 'scratch'}.get(ret)
+    return NimFunction(name=target, return_type=ret_types[ret], params=params,
+                       memory_type=memory_type, js_name=f"shape{shape}")
+
+
+def format_savings(label: str, unrolled: str, table: str) -> str:
+    """One summary line comparing generated source sizes."""
+    before, after = len(unrolled.encode()), len(table.encode())
+    percent = (before - after) * 100 / before if before else 0.0
+    change = f"{percent:.0f}% smaller" if percent >= 0 else f"{-percent:.0f}% larger"
+    return f"{label}: {before / 1024:.1f} KB -> {after / 1024:.1f} KB ({change})"
@@ -0,0 +1,90 @@
+"""
+Chunked output for the code generators.
+
+Generators write their output piece by piece (`code += chunk`) into an
+Emitter instead of growing one string. Chunks are buffered and, once they
+exceed `spill_bytes`, streamed to a temporary file next to the target, which
+`commit` renames into place. Peak memory then stays bounded by the largest
+chunk rather than by the whole file, and a failed generator never leaves a
+half-written target behind. Targets whose content did not change are left
+untouched, so Metro and the native builds only see files that really
+changed.
+"""
+
+import filecmp
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+DEFAULT_SPILL_BYTES = 1 << 20
+
+
+def spill_bytes(config) -> int:
+    return int(config.data.get('generation', {}).get('spill_bytes', DEFAULT_SPILL_BYTES))
+
+
+class Emitter:
+    """Append-only text sink; in memory unless given a `target` to stream towards."""
+
+    def __init__(self, target: Optional[Path] = None, spill_bytes: int = DEFAULT_SPILL_BYTES):
+        self.target = target
+        self.spill_bytes = spill_bytes
+        self.size = 0
+        self._chunks: List[str] = []
+        self._buffered = 0
+        self._file = None
+        self._temp_path: Optional[Path] = None
+
+    def write(self, chunk: str) -> None:
+        if not chunk:
+            return
+        self._chunks.append(chunk)
+        self._buffered += len(chunk)
+        self.size += len(chunk)
+        if self.target is not None and self._buffered >= self.spill_bytes:
+            self._spill()
+
+    def __iadd__(self, chunk: str) -> 'Emitter':
+        self.write(chunk)
+        return self
+
+    def _spill(self) -> None:
+        if self._file is None:
+            self.target.parent.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(prefix=f".{self.target.name}.", suffix=".tmp", dir=self.target.parent)
+            self._file = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+            self._temp_path = Path(name)
+        self._file.write("".join(self._chunks))
+        self._chunks, self._buffered = [], 0
+
+    def getvalue(self) -> str:
+        """Everything written so far (reads the spilled part back)."""
+        if self._file is None:
+            return "".join(self._chunks)
+        self._file.flush()
+        return self._temp_path.read_text(encoding='utf-8') + "".join(self._chunks)
+
+    def commit(self) -> bool:
+        """Atomically replace the target with the emitted text; False if it was already identical."""
+        self._spill()
+        self._file.close()
+        self._file = None
+        if self.target.exists() and filecmp.cmp(self._temp_path, self.target, shallow=False):
+            self.discard()
+            return False
+        # mkstemp files are private; keep the target's mode, or the usual one for new files
+        mode = self.target.stat().st_mode & 0o777 if self.target.exists() else 0o644
+        os.chmod(self._temp_path, mode)
+        os.replace(self._temp_path, self.target)
+        self._temp_path = None
+        return True
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._temp_path is not None:
+            self._temp_path.unlink(missing_ok=True)
+            self._temp_path = None
+        self._chunks, self._buffered = [], 0
@@ -0,0 +1,280 @@
+"""
+Native event channel generator shared by the iOS and Android bridges.
+
+Nim producers push events into a bounded lock-free ring buffer owned by the
+bridge; JavaScript is woken at most once per batch and drains it in bulk.
+"""
+
+from typing import List, Optional, Tuple
+
+from .base import CodeGenerator
+from ..models import NimFunction
+
+
+DEFAULT_EVENT_CAPACITY = 4096
+
+# Trailing spec parameter of exports taking callbacks. The JS facade numbers
+# every call so Android can route callback deliveries to that call only.
+CALL_ID_PARAM = "callId"
+
+
+def event_ring_capacity(config) -> int:
+    """Configured ring capacity rounded up to a power of two."""
+    requested = int(config.data.get('events', {}).get('capacity', DEFAULT_EVENT_CAPACITY))
+    capacity = 2
+    while capacity < requested:
+        capacity *= 2
+    return capacity
+
+
+def callback_c_params(func: NimFunction, param_name: str, type_mapper,
+                      string_type: Optional[str] = None) -> List[Tuple[str, str]]:
+    """C (type, name) pairs for a callback parameter's arguments."""
+    return [
+        (string_type if string_type and ptype in ['cstring', 'string'] else type_mapper.nim_to_cpp_type(ptype), name)
+        for name, ptype in func.callbacks[param_name]
+    ]
+
+
+def callback_typedef_name(func: NimFunction, param_name: str) -> str:
+    return f"{func.name}_{param_name}_cb"
+
+
+def callback_trampoline_name(func: NimFunction, param_name: str) -> str:
+    return f"{func.name}_{param_name}_trampoline"
+
+
+def callback_typedefs(functions: List[NimFunction], type_mapper, indent: str = "    ",
+                      string_type: Optional[str] = None) -> str:
+    """C typedefs for every callback parameter of the exported functions."""
+    code = ""
+    for func in functions:
+        for param_name in func.callbacks:
+            params = ", ".join(f"{ctype} {name}" for ctype, name in
+                               callback_c_params(func, param_name, type_mapper, string_type)) or "void"
+            code += f"{indent}typedef void (*{callback_typedef_name(func, param_name)})({params});\n"
+    return code
+
+
+def json_payload_builder(func: NimFunction, param_name: str, indent: str = "    ",
+                         call_id: Optional[str] = None) -> str:
+    """C++ statements building a JSON array payload of a callback's arguments.
+
+    `call_id` is an expression prepended to the arguments, for JS to route the
+    payload to the call it belongs to.
+    """
+    code = f'{indent}std::string payload = "[";\n'
+    if call_id:
+        code += f"{indent}payload += std::to_string({call_id});\n"
+    for i, (name, ptype) in enumerate(func.callbacks[param_name]):
+        if i or call_id:
+            code += f"{indent}payload += ',';\n"
+        if ptype in ['cstring', 'string']:
+            code += f"{indent}nimbridge::appendJsonString(payload, {name});\n"
+        elif ptype == 'bool':
+            code += f'{indent}payload += {name} ? "true" : "false";\n'
+        elif ptype == 'float':
+            code += f"{indent}nimbridge::appendJsonNumber(payload, {name});\n"
+        else:
+            code += f"{indent}payload += std::to_string({name});\n"
+    code += f"{indent}payload += ']';\n"
+    return code
+
+
+def event_ring_definitions(generator: CodeGenerator) -> str:
+    """Ring instance and the extern "C" emit entry point Nim producers call.
+
+    Expects the including translation unit to define
+    `static void nimBridgeNotifyEventsPending();`.
+    """
+    capacity = event_ring_capacity(generator.config)
+    return f"""// Event ring shared by Nim producers and the JS drain
+static nimbridge::EventRing<{capacity}> gNimBridgeEvents;
+
+static void nimBridgeNotifyEventsPending();
+
+static void nimBridgePushEvent(uint32_t channel, std::string payload) {{
+    if (gNimBridgeEvents.push(channel, std::move(payload)) && gNimBridgeEvents.claimWakeup()) {{
+        nimBridgeNotifyEventsPending();
+    }}
+}}
+
+extern "C" void nimBridgeEmitEvent(const char* channel, const char* payload) {{
+    int index = nimbridge::findEventChannel(channel);
+    if (index < 0) {{
+        gNimBridgeEvents.countDropped();
+        return;
+    }}
+    nimBridgePushEvent(static_cast<uint32_t>(index), payload ? payload : "");
+}}
+
+"""
+
+
+class EventRingHeaderGenerator(CodeGenerator):
+    """Generates the lock-free event ring header used by both bridges."""
+
+    def generate(self) -> str:
+        """Generate NimBridgeEvents.h."""
+        code = CodeGenerator._generate_header("native event ring for Nim -> JS events")
+        channels = self.all_event_channels()
+
+        code += """#pragma once
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <cstdio>
+#include <cstring>
+#include <string>
+#include <vector>
+
+namespace nimbridge {
+
+// Declared @events channels followed by callback delivery channels ("<jsName>.<param>")
+static const char* const kEventChannels[] = {
+"""
+        for channel in channels:
+            code += f'    "{channel}",\n'
+        code += f"""}};
+static constexpr size_t kEventChannelCount = {len(channels)};
+
+inline int findEventChannel(const char* name) {{
+    if (!name) return -1;
+    for (size_t i = 0; i < kEventChannelCount; i++) {{
+        if (std::strcmp(kEventChannels[i], name) == 0) return static_cast<int>(i);
+    }}
+    return -1;
+}}
+
+struct Event {{
+    uint32_t channel = 0;
+    std::string payload;
+}};
+
+// Bounded multi-producer/single-consumer ring (Vyukov sequence-number queue).
+// Producers never block: when the ring is full the event is dropped and counted.
+template <size_t Capacity>
+class EventRing {{
+    static_assert(Capacity >= 2 && (Capacity & (Capacity - 1)) == 0, "Capacity must be a power of two");
+
+public:
+    EventRing() {{
+        for (size_t i = 0; i < Capacity; i++) {{
+            cells_[i].sequence.store(i, std::memory_order_relaxed);
+        }}
+    }}
+
+    bool push(uint32_t channel, std::string payload) {{
+        size_t pos = tail_.load(std::memory_order_relaxed);
+        for (;;) {{
+            Cell &cell = cells_[pos & (Capacity - 1)];
+            size_t sequence = cell.sequence.load(std::memory_order_acquire);
+            intptr_t diff = static_cast<intptr_t>(sequence) - static_cast<intptr_t>(pos);
+            if (diff == 0) {{
+                if (tail_.compare_exchange_weak(pos, pos + 1, std::memory_order_relaxed)) {{
+                    cell.event.channel = channel;
+                    cell.event.payload = std::move(payload);
+                    cell.sequence.store(pos + 1, std::memory_order_release);
+                    return true;
+                }}
+            }} else if (diff < 0) {{
+                countDropped();
+                return false;
+            }} else {{
+                pos = tail_.load(std::memory_order_relaxed);
+            }}
+        }}
+    }}
+
+    bool pop(Event &out) {{
+        size_t pos = head_.load(std::memory_order_relaxed);
+        for (;;) {{
+            Cell &cell = cells_[pos & (Capacity - 1)];
+            size_t sequence = cell.sequence.load(std::memory_order_acquire);
+            intptr_t diff = static_cast<intptr_t>(sequence) - static_cast<intptr_t>(pos + 1);
+            if (diff == 0) {{
+                if (head_.compare_exchange_weak(pos, pos + 1, std::memory_order_relaxed)) {{
+                    out.channel = cell.event.channel;
+                    out.payload.swap(cell.event.payload);
+                    cell.event.payload.clear();
+                    cell.sequence.store(pos + Capacity, std::memory_order_release);
+                    return true;
+                }}
+            }} else if (diff < 0) {{
+                return false;
+            }} else {{
+                pos = head_.load(std::memory_order_relaxed);
+            }}
+        }}
+    }}
+
+    // Drain up to `limit` events. The wake-up flag is cleared first so that
+    // events pushed while draining schedule a new wake-up.
+    size_t drain(std::vector<Event> &out, size_t limit) {{
+        releaseWakeup();
+        size_t count = 0;
+        Event event;
+        while (count < limit && pop(event)) {{
+            out.push_back(std::move(event));
+            count++;
+        }}
+        return count;
+    }}
+
+    bool empty() const {{
+        return head_.load(std::memory_order_acquire) == tail_.load(std::memory_order_acquire);
+    }}
+
+    // Returns true for exactly one producer until the consumer drains again
+    bool claimWakeup() {{ return !wakeupPending_.exchange(true, std::memory_order_acq_rel); }}
+    void releaseWakeup() {{ wakeupPending_.store(false, std::memory_order_release); }}
+
+    void countDropped() {{ dropped_.fetch_add(1, std::memory_order_relaxed); }}
+    uint64_t dropped() const {{ return dropped_.load(std::memory_order_relaxed); }}
+
+private:
+    struct Cell {{
+        std::atomic<size_t> sequence;
+        Event event;
+    }};
+
+    Cell cells_[Capacity];
+    alignas(64) std::atomic<size_t> tail_{{0}};
+    alignas(64) std::atomic<size_t> head_{{0}};
+    std::atomic<bool> wakeupPending_{{false}};
+    std::atomic<uint64_t> dropped_{{0}};
+}};
+
+inline void appendJsonString(std::string &out, const char* s) {{
+    out += '"';
+    for (const char* p = s ? s : ""; *p; p++) {{
+        unsigned char c = static_cast<unsigned char>(*p);
+        switch (c) {{
+            case '"': out += "\\\\\\""; break;
+            case '\\\\': out += "\\\\\\\\"; break;
+            case '\\n': out += "\\\\n"; break;
+            case '\\r': out += "\\\\r"; break;
+            case '\\t': out += "\\\\t"; break;
+            default:
+                if (c < 0x20) {{
+                    char escaped[7];
+                    std::snprintf(escaped, sizeof(escaped), "\\\\u%04x", c);
+                    out += escaped;
+                }} else {{
+                    out += static_cast<char>(c);
+                }}
+        }}
+    }}
+    out += '"';
+}}
+
+inline void appendJsonNumber(std::string &out, double value) {{
+    char buffer[32];
+    std::snprintf(buffer, sizeof(buffer), "%.17g", value);
+    out += buffer;
+}}
+
+}} // namespace nimbridge
+"""
+        return code
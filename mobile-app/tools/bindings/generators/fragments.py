@@ -0,0 +1,108 @@
+"""
+Per-function fragment cache for incremental re-rendering.
+
+Renderers decorated with `@fragment` (the JSI method, the JNI method, the
+Kotlin override, ...) are looked up under a digest of the NimFunction, the
+other arguments, the generator's environment (config, handle types, event
+channels, constants) and per-function context such as the dispatch slot. The
+digest also covers the source of the generators, so editing a generator
+invalidates everything it rendered. After a one-function edit only that
+function's fragments are rendered again; the others are spliced in from the
+cache stored under `fragment_cache.dir` of the module.
+"""
+
+import functools
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = "build/fragment-cache"
+
+
+def _source_digest() -> str:
+    digest = hashlib.sha256()
+    package = Path(__file__).parent
+    for path in sorted(package.glob("*.py")) + [package.parent / "models.py"]:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+GENERATOR_VERSION = _source_digest()
+
+
+def fragment_cache_enabled(config) -> bool:
+    return config.data.get('fragment_cache', {}).get('enabled', True)
+
+
+def fragment_cache_dir(config, output_dir: Path) -> Path:
+    return output_dir / config.data.get('fragment_cache', {}).get('dir', DEFAULT_CACHE_DIR)
+
+
+class FragmentCache:
+    """Rendered fragments of one generator class, persisted as JSON."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._fragments: Dict[str, str] = {}
+        self._used: Dict[str, str] = {}
+        self._unsaved = False
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == GENERATOR_VERSION:
+                self._fragments = data.get('fragments', {})
+        except (IOError, ValueError):
+            pass
+
+    def begin(self) -> None:
+        """Start a run; a cache kept in memory (watch mode) serves many runs."""
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*parts) -> str:
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        text = self._fragments.get(key)
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._used[key] = text
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        self._used[key] = text
+
+    def save(self, persist: bool = True) -> None:
+        """Keep exactly the fragments used by this run, on disk too unless `persist` is False."""
+        used, self._used = self._used, {}
+        if used == self._fragments and not self._unsaved:
+            return
+        self._fragments = used
+        self._unsaved = not persist
+        if not persist:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({"version": GENERATOR_VERSION, "fragments": used}))
+
+
+def fragment(method):
+    """Cache a `(self, func, ...) -> str` renderer of a CodeGenerator in its `fragments`."""
+    @functools.wraps(method)
+    def wrapper(self, func, *args, **kwargs):
+        cache = self.fragments
+        if cache is None:
+            return method(self, func, *args, **kwargs)
+        key = cache.key(method.__qualname__, self.fragment_environment(), self.fragment_context(func),
+                        func, args, sorted(kwargs.items()))
+        text = cache.get(key)
+        if text is None:
+            text = method(self, func, *args, **kwargs)
+            cache.put(key, text)
+        return text
+    return wrapper
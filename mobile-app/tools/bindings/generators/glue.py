@@ -0,0 +1,196 @@
+"""
+Nim export glue generated from business-logic procs.
+
+Procs annotated `## @bridge` in the `glue.sources` modules get an
+`{.exportc.}` wrapper `<prefix><Name>` in the generated `glue.module` file of
+the Nim directory, which the parser then picks up like any other export.
+Each type crosses the C boundary the cheapest way the bridges allow:
+
+    int       cint in, int64 out
+    bool      cint in, cint out (marked `@boolean`)
+    string    cstring in, out through the per-thread scratch buffer
+    seq[int]  out as a JSON array formatted straight into the scratch buffer
+    objects and other seqs  JSON text (json_serialization) both ways
+
+Other annotations of the business proc (e.g. `@vectorize`) carry over.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from .base import CodeGenerator
+from ..models import NimFunction
+
+
+DEFAULT_GLUE_MODULE = "nimbridge_glue.nim"
+DEFAULT_GLUE_PREFIX = "mobile"
+
+# Chosen by the glue itself rather than copied from the business proc
+GLUE_OWNED_ANNOTATIONS = ('bridge', 'boolean', 'literal', 'allocated', 'scratch')
+JSON_ELEMENT_TYPES = ('int', 'bool', 'string', 'float')
+
+
+def glue_sources(config) -> List[str]:
+    return list(config.data.get('glue', {}).get('sources', []))
+
+
+def glue_module(config) -> str:
+    return config.data.get('glue', {}).get('module', DEFAULT_GLUE_MODULE)
+
+
+def glue_prefix(config) -> str:
+    prefix = config.data.get('glue', {}).get('prefix', DEFAULT_GLUE_PREFIX)
+    if not prefix:
+        raise ValueError("glue.prefix must not be empty: wrappers would shadow the procs they call")
+    return prefix
+
+
+def glue_export_name(config, func: NimFunction) -> str:
+    return f"{glue_prefix(config)}{func.name[0].upper()}{func.name[1:]}"
+
+
+def is_json_type(nim_type: str, object_types: Set[str]) -> bool:
+    """Objects declared in the glue sources, and seqs of them or of plain types."""
+    if nim_type.startswith('seq[') and nim_type.endswith(']'):
+        element = nim_type[4:-1]
+        return element in JSON_ELEMENT_TYPES or is_json_type(element, object_types)
+    return nim_type in object_types
+
+
+def unsupported_glue_types(func: NimFunction, object_types: Set[str]) -> List[str]:
+    """Types of a @bridge proc the glue cannot marshal."""
+    unsupported = []
+    for ptype in [ptype for _, ptype in func.params] + [func.return_type]:
+        if ptype not in ('int', 'bool', 'string') and not is_json_type(ptype, object_types) \
+                and ptype not in unsupported:
+            unsupported.append(ptype)
+    return unsupported
+
+
+class NimGlueGenerator(CodeGenerator):
+    """Generates the Nim module of `{.exportc.}` wrappers around @bridge business procs."""
+
+    def __init__(self, functions: List[NimFunction], config, sources: Iterable[Path],
+                 object_types: Set[str], nim_dir: Path):
+        super().__init__(functions, config)
+        self.sources = list(sources)
+        self.object_types = set(object_types)
+        self.nim_dir = nim_dir
+
+    def _param(self, name: str, ptype: str) -> Tuple[str, str]:
+        """(wrapper parameter type, argument expression passed to the business proc)."""
+        if ptype == 'int':
+            return 'cint', f"{name}.int"
+        if ptype == 'bool':
+            return 'cint', f"{name} != 0"
+        if ptype == 'string':
+            return 'cstring', f"${name}"
+        return 'cstring', f"Json.decode(${name}, {ptype})"
+
+    def _result(self, return_type: str, call: str) -> Tuple[str, str, Optional[str]]:
+        """(wrapper return type, returned expression, memory annotation)."""
+        if return_type == 'int':
+            return 'int64', f"int64({call})", None
+        if return_type == 'bool':
+            return 'cint', f"cint({call})", 'boolean'
+        if return_type == 'string':
+            return 'cstring', f"glueScratch({call})", 'scratch'
+        if return_type == 'seq[int]':
+            return 'cstring', f"glueScratchInts({call})", 'scratch'
+        return 'cstring', f"glueScratch(Json.encode({call}))", 'scratch'
+
+    def _uses_json(self) -> bool:
+        """Whether any value goes through JSON; seq[int] results are formatted by hand."""
+        return any((func.return_type != 'seq[int]' and is_json_type(func.return_type, self.object_types))
+                   or any(is_json_type(ptype, self.object_types) for _, ptype in func.params)
+                   for func in self.functions)
+
+    def _import_path(self, source: Path) -> str:
+        relative = Path(os.path.relpath(source.resolve(), self.nim_dir.resolve())).as_posix()
+        return relative[:-len('.nim')] if relative.endswith('.nim') else relative
+
+    def generate(self) -> str:
+        code = "# Auto-generated Nim export glue for the @bridge procs of\n"
+        for source in self.sources:
+            code += f"#   {self._import_path(source)}.nim\n"
+        code += "# DO NOT EDIT MANUALLY - Generated by tools/generate_bindings.py\n"
+        code += "# This file will be overwritten when bindings are regenerated\n"
+        if self._uses_json():
+            code += "import json_serialization\n"
+        for source in self.sources:
+            code += f'import "{self._import_path(source)}"\n'
+
+        returns = {func.return_type for func in self.functions}
+        if returns - {'int', 'bool'}:
+            code += self._generate_scratch_helpers('seq[int]' in returns)
+
+        for func in self.functions:
+            code += self._generate_wrapper(func)
+        return code
+
+    def _generate_scratch_helpers(self, ints: bool) -> str:
+        code = """
+proc nimBridgeScratch(size: csize_t): cstring {.importc.}
+
+proc glueScratch(s: string): cstring =
+  ## Copies into the bridge's per-thread scratch buffer. The result is only
+  ## valid until the next @scratch return on the same thread.
+  result = nimBridgeScratch(csize_t(s.len + 1))
+  copyMem(result, s.cstring, s.len + 1)
+"""
+        if ints:
+            code += """
+proc glueDigits(value: int): int =
+  var magnitude = if value < 0: uint64(not value) + 1 else: uint64(value)
+  result = if value < 0: 2 else: 1
+  while magnitude >= 10:
+    magnitude = magnitude div 10
+    inc result
+
+proc glueScratchInts(values: openArray[int]): cstring =
+  ## Formats `values` as a JSON array directly into the scratch buffer,
+  ## without building an intermediate Nim string.
+  var size = 2 + max(values.len - 1, 0)
+  for value in values:
+    size += glueDigits(value)
+  result = nimBridgeScratch(csize_t(size + 1))
+  let buffer = cast[ptr UncheckedArray[char]](result)
+  var pos = 0
+  buffer[pos] = '['
+  inc pos
+  for i, value in values:
+    if i > 0:
+      buffer[pos] = ','
+      inc pos
+    let last = pos + glueDigits(value) - 1
+    var magnitude = if value < 0: uint64(not value) + 1 else: uint64(value)
+    for digit in countdown(last, pos):
+      buffer[digit] = char(ord('0') + int(magnitude mod 10))
+      magnitude = magnitude div 10
+    if value < 0:
+      buffer[pos] = '-'
+    pos = last + 1
+  buffer[pos] = ']'
+  buffer[pos + 1] = '\\0'
+"""
+        return code
+
+    def _generate_wrapper(self, func: NimFunction) -> str:
+        params, args = [], []
+        for name, ptype in func.params:
+            wrapper_type, arg = self._param(name, ptype)
+            params.append(f"{name}: {wrapper_type}")
+            args.append(arg)
+        return_type, value, memory = self._result(func.return_type, f"{func.name}({', '.join(args)})")
+
+        annotations = [memory] if memory else []
+        for name, arg in func.annotations.items():
+            if name not in GLUE_OWNED_ANNOTATIONS:
+                annotations.append(f"{name}({arg})" if arg else name)
+
+        code = f"\nproc {glue_export_name(self.config, func)}*({', '.join(params)}): {return_type} {{.exportc.}} =\n"
+        for annotation in annotations:
+            code += f"  ## @{annotation}\n"
+        code += f"  return {value}\n"
+        return code
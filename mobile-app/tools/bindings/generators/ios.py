@@ -3,15 +3,41 @@ iOS platform generators for Nim bridge with TurboModule/JSI support.
 """
 
 from .base import CodeGenerator
+from .emitter import Emitter
+from .fragments import fragment
+from .events import (
+    CALL_ID_PARAM, callback_c_params, callback_typedef_name, callback_trampoline_name,
+    callback_typedefs, event_ring_definitions,
+)
+from .budget import REPORT_FILE, records_sync_budget, sync_timer
+from .dispatch import DispatchTable, shape_function, uses_table_dispatch
+from .memory import (
+    memory_hook_definitions, memory_scope, records_memory, scratch_buffer_definitions,
+)
+from .mapped import mapped_blob_definitions, mapped_functions, mapped_release_pointer, mapped_releases
+from .shards import shard_count, shard_index
+from .precompute import callee, precomputed_functions
+from .vectorize import (
+    VECTOR_PARAM_TYPES, VECTOR_RETURN_TYPES, jsi_vector_definitions, parallel_for_definition, vector_functions,
+    vector_kernel, vector_kernel_name, vector_name,
+)
 from ..models import NimFunction
 
 
+# Signature-shape kinds of the JSI trampolines (see dispatch.py)
+JSI_PARAM_KINDS = {"cstring": "s", "string": "s", "bool": "b", "int64": "l", "float": "d"}
+JSI_RETURN_KINDS = {"allocated": "a", "scratch": "r", "bool": "b", "int64": "l", "float": "d"}
+JSI_KIND_PARAM_TYPES = {"s": "cstring", "b": "bool", "l": "int64", "d": "float", "i": "cint"}
+JSI_KIND_RETURN_TYPES = {"s": "cstring", "a": "cstring", "r": "cstring", "b": "bool", "l": "int64",
+                         "d": "float", "i": "cint"}
+
+
 class CppWrapperGenerator(CodeGenerator):
     """Generates C++ wrapper code for Nim functions."""
 
-    def generate(self) -> str:
+    def emit(self, code: Emitter) -> None:
         """Generate C++ wrapper code."""
-        code = CodeGenerator._generate_header("C++ wrapper for Nim functions")
+        code += CodeGenerator._generate_header("C++ wrapper for Nim functions")
         code += """#include <string>
 #include <cstring>
 
@@ -26,30 +52,50 @@ extern "C" {
     // Generated function declarations
 """
 
+        typedefs = callback_typedefs(self.functions, self.type_mapper)
+        if typedefs:
+            code += "    // Callback parameter types\n" + typedefs + "\n"
+
         # Add function declarations
         for func in self.functions:
             ret_type = self.type_mapper.nim_to_cpp_type(func.return_type)
             params_str = ", ".join(
                 [
-                    f"{self.type_mapper.nim_to_cpp_type(ptype)} {name}"
+                    f"{callback_typedef_name(func, name) if ptype == 'callback' else self.type_mapper.nim_to_cpp_type(ptype)} {name}"
                     for name, ptype in func.params
                 ]
+                + (["size_t* byteLength"] if func.return_type == "mapped" else [])
             )
             code += f"    {ret_type} {func.name}({params_str});\n"
 
+        releases = mapped_releases(self.functions)
+        if releases:
+            code += "    \n    // Release hooks of @mapped blobs\n"
+            for release in releases:
+                code += f"    void {release}(void* data);\n"
+
         code += "    \n    // Memory management\n"
         code += "    void freeString(NCSTRING s);\n"
+        if self.has_events:
+            code += "\n    // Event channel (implemented by the bridge, called from Nim)\n"
+            code += "    void nimBridgeEmitEvent(const char* channel, const char* payload);\n"
+        if self.needs_scratch:
+            code += "\n    // Scratch buffer for @scratch returns (implemented by the bridge, called from Nim)\n"
+            code += "    char* nimBridgeScratch(size_t size);\n"
+        if records_memory(self.config):
+            code += "\n    // Allocation telemetry (hooks implemented by the bridge, heap stats by Nim)\n"
+            code += "    void nimBridgeTrackAlloc(void* ptr, size_t size);\n"
+            code += "    void nimBridgeTrackFree(void* ptr);\n"
+            code += "    void nimBridgeHeapStats(long long* stats);\n"
         code += "}\n"
 
-        return code
-
 
 class ObjcHeaderGenerator(CodeGenerator):
     """Generates Objective-C header file with TurboModule/JSI support."""
 
-    def generate(self) -> str:
+    def emit(self, code: Emitter) -> None:
         """Generate Objective-C header file for New Architecture."""
-        code = CodeGenerator._generate_header("Objective-C++ bridge header")
+        code += CodeGenerator._generate_header("Objective-C++ bridge header")
 
         code += """#import <React/RCTBridgeModule.h>
 #include "NimBridgeSpecJSI.h"
@@ -57,14 +103,20 @@ class ObjcHeaderGenerator(CodeGenerator):
 class NimBridgeImpl : public facebook::react::NativeNimBridgeCxxSpec<NimBridgeImpl> {
 public:
     NimBridgeImpl(std::shared_ptr<facebook::react::CallInvoker> jsInvoker);
-
 """
+        if self.has_events:
+            code += "    ~NimBridgeImpl() override;\n"
+        if vector_functions(self.functions):
+            code += "    // Routes the Many companions around the spec's jsi::Array conversion\n"
+            code += "    facebook::jsi::Value create(facebook::jsi::Runtime &rt, const facebook::jsi::PropNameID &name) override;\n"
+        code += "\n"
 
         # Group functions for comments
         core_funcs = []
         math_funcs = []
         data_funcs = []
         version_funcs = []
+        other_funcs = []
 
         for func in self.functions:
             js_name = func.js_name or func.name
@@ -76,36 +128,61 @@ public:
                 data_funcs.append(func)
             elif js_name in ["getVersion"]:
                 version_funcs.append(func)
+            else:
+                other_funcs.append(func)
 
-        def generate_declarations(funcs, comment=None):
-            result = ""
+        def emit_declarations(funcs, comment=None):
             if comment:
-                result += f"    // {comment}\n"
+                code.write(f"    // {comment}\n")
             for func in funcs:
                 js_name = func.js_name or func.name
                 jsi_ret_type = self._get_jsi_return_type(func.return_type)
                 jsi_params = self._build_jsi_params(func)
-                result += f"    {jsi_ret_type} {js_name}(facebook::jsi::Runtime &rt{', ' + jsi_params if jsi_params else ''});\n"
-            return result
-
-        code += generate_declarations(core_funcs, "Core API")
+                code.write(f"    {jsi_ret_type} {js_name}(facebook::jsi::Runtime &rt{', ' + jsi_params if jsi_params else ''});\n")
+                if func.async_variant:
+                    code.write(f"    facebook::jsi::Value {js_name}Async(facebook::jsi::Runtime &rt{', ' + jsi_params if jsi_params else ''});\n")
+                if func.vector_variant:
+                    vector_params = ", ".join(f"facebook::jsi::Array {name}" for name, _ in func.params)
+                    code.write(f"    facebook::jsi::Array {vector_name(func)}(facebook::jsi::Runtime &rt, {vector_params});\n")
+
+        emit_declarations(core_funcs, "Core API")
         if math_funcs:
             code += "\n"
-            code += generate_declarations(math_funcs, "Math operations")
+            emit_declarations(math_funcs, "Math operations")
         if data_funcs:
             code += "\n"
-            code += generate_declarations(data_funcs, "Data operations")
+            emit_declarations(data_funcs, "Data operations")
         if version_funcs:
             code += "\n"
-            code += generate_declarations(version_funcs, "Version info")
+            emit_declarations(version_funcs, "Version info")
+        if other_funcs:
+            code += "\n"
+            emit_declarations(other_funcs, "Other exports")
+        if self.has_events:
+            code += "\n    // Event channel\n"
+            code += "    facebook::jsi::Array drainEvents(facebook::jsi::Runtime &rt, double max);\n"
+            code += "    void setEventsPendingListener(facebook::jsi::Runtime &rt, facebook::jsi::Function listener);\n"
+        if mapped_functions(self.functions):
+            code += "\n    // Mapped blobs\n"
+            code += "    facebook::jsi::Array readMappedBlob(facebook::jsi::Runtime &rt, facebook::jsi::Object blob, double offset, double length);\n"
+            code += "    void releaseMappedBlob(facebook::jsi::Runtime &rt, facebook::jsi::Object blob);\n"
+        if records_sync_budget(self.config):
+            code += "\n    // Frame budget report\n"
+            code += "    facebook::jsi::String getSyncBudgetReport(facebook::jsi::Runtime &rt);\n"
+        if records_memory(self.config):
+            code += "\n    // Native allocation telemetry\n"
+            code += "    facebook::jsi::String getNativeMemoryStats(facebook::jsi::Runtime &rt);\n"
 
         code += """};\n\n"""
         code += f"""@interface {self.config.module_name} : NSObject <RCTBridgeModule, RCTTurboModule>\n\n@end\n"""
-        return code
 
     def _get_jsi_return_type(self, nim_type: str) -> str:
         """Get JSI return type for a Nim type."""
-        if nim_type in ["cstring", "string"]:
+        if nim_type in self.handle_types or nim_type == "mapped":
+            return "facebook::jsi::Object"
+        elif nim_type == "void":
+            return "void"
+        elif nim_type in ["cstring", "string"]:
             return "facebook::jsi::String"
         elif nim_type == "bool":
             return "bool"
@@ -120,37 +197,120 @@ public:
         for name, ptype in func.params:
             if ptype in ["cstring", "string"]:
                 params.append(f"facebook::jsi::String {name}")
+            elif ptype == "callback":
+                params.append(f"facebook::jsi::Function {name}")
+            elif ptype in self.handle_types:
+                params.append(f"facebook::jsi::Object {name}")
             elif ptype == "bool":
                 params.append(f"bool {name}")
             else:
                 params.append(f"double {name}")
+        if func.callbacks:
+            params.append(f"double {CALL_ID_PARAM}")
         return ", ".join(params)
 
 
 class ObjcBridgeGenerator(CodeGenerator):
     """Generates Objective-C++ bridge code with TurboModule/JSI support."""
 
-    def generate(self) -> str:
+    dispatch = None
+
+    def _prepare_dispatch(self) -> None:
+        self.dispatch = None
+        if uses_table_dispatch(self.config, self.functions):
+            self.dispatch = DispatchTable(self.functions, self.handle_types, JSI_PARAM_KINDS, JSI_RETURN_KINDS)
+
+    def emit(self, code: Emitter) -> None:
         """Generate Objective-C++ bridge code for New Architecture."""
-        code = CodeGenerator._generate_header("Objective-C++ bridge")
+        self._prepare_dispatch()
+        code += CodeGenerator._generate_header("Objective-C++ bridge")
         code += f"""#import "{self.config.module_name}.h"
 #include "{self.config.library_name}.h"
 #import <ReactCommon/RCTTurboModule.h>
+"""
+        if precomputed_functions(self.functions):
+            code += f'#include "{self.config.module_name}Precomputed.h"\n'
+        if self.has_events:
+            code += f"""#include "{self.config.module_name}Events.h"
 
+#include <mutex>
+"""
+            code += self._generate_event_support()
+        if records_sync_budget(self.config):
+            code += f'#include "{self.config.module_name}Budget.h"\n'
+        if records_memory(self.config):
+            code += f'#include "{self.config.module_name}Memory.h"\n\n'
+            code += memory_hook_definitions()
+        if any(func.async_variant for func in self.functions):
+            code += self._generate_async_support()
+        if self.needs_scratch:
+            code += "\n#include <memory>\n\n"
+            code += scratch_buffer_definitions(self.config)
+        if self.handle_types:
+            code += """
+#include <atomic>
+#include <memory>
+#include <vector>
+"""
+            for handle in self.handle_types.values():
+                code += self._generate_host_object(handle)
+        if mapped_functions(self.functions):
+            code += mapped_blob_definitions()
+        if self.dispatch and self.dispatch.shapes:
+            code += self._generate_dispatch_tables()
+        if vector_functions(self.functions):
+            code += "\n#include <algorithm>\n#include <functional>\n#include <vector>\n"
+            code += parallel_for_definition("ios") + "\n"
+            for func in vector_functions(self.functions):
+                code += vector_kernel(self.config, func)
+            code += jsi_vector_definitions() + "\n"
+            for func in vector_functions(self.functions):
+                code += self._generate_vector_host_function(func)
+
+        # Event delivery keeps its own reference to the JS invoker
+        invoker_arg = "jsInvoker" if self.has_events else "std::move(jsInvoker)"
+        code += f"""
 {self.config.module_name}Impl::{self.config.module_name}Impl(std::shared_ptr<facebook::react::CallInvoker> jsInvoker)
-    : Native{self.config.module_name}CxxSpec(std::move(jsInvoker)) {{
-    // Initialize Nim runtime
+    : Native{self.config.module_name}CxxSpec({invoker_arg}) {{
+"""
+        if self.has_events:
+            code += "    setJsInvoker(std::move(jsInvoker));\n"
+        code += """    // Initialize Nim runtime
     NimMain();
     mobileNimInit();
+}
+
+"""
+        if self.has_events:
+            code += f"""{self.config.module_name}Impl::~{self.config.module_name}Impl() {{
+    // The listener must not outlive the runtime it belongs to
+    resetJsInvoker(jsInvoker_);
 }}
 
 """
 
-        # Generate JSI method implementations
+        # Generate JSI method implementations; sharded exports live in NimBridgeShard<N>.mm
         for i, func in enumerate(self.functions):
-            code += self._generate_jsi_method(
-                func, is_last=(i == len(self.functions) - 1)
-            )
+            if not shard_index(self, func, self.dispatch):
+                code += self._generate_jsi_method(
+                    func, is_last=(i == len(self.functions) - 1)
+                )
+            if func.async_variant:
+                code += self._generate_async_method(func)
+            if func.vector_variant:
+                code += self._generate_vector_method(func)
+        if vector_functions(self.functions):
+            code += self._generate_vector_create()
+
+        if mapped_functions(self.functions):
+            code += self._generate_mapped_blob_methods()
+        if records_sync_budget(self.config):
+            code += self._generate_budget_report_method()
+        if records_memory(self.config):
+            code += self._generate_memory_stats_method()
+
+        if self.has_events:
+            code += self._generate_event_methods()
 
         code += (
             """
@@ -180,8 +340,28 @@ RCT_EXPORT_MODULE()
 @end
 """
         )
+
+    def generate_shard(self, index: int) -> str:
+        """Generate an extra translation unit holding the JSI methods of one shard."""
+        self._prepare_dispatch()
+        code = CodeGenerator._generate_header(
+            f"Objective-C++ bridge shard {index} of {shard_count(self.config)}")
+        code += f"""#import "{self.config.module_name}.h"
+#include "{self.config.library_name}.h"
+"""
+        if precomputed_functions(self.functions):
+            code += f'#include "{self.config.module_name}Precomputed.h"\n'
+        if records_sync_budget(self.config):
+            code += f'#include "{self.config.module_name}Budget.h"\n'
+        if records_memory(self.config):
+            code += f'#include "{self.config.module_name}Memory.h"\n'
+        code += "\n"
+        for func in self.functions:
+            if shard_index(self, func, self.dispatch) == index:
+                code += self._generate_jsi_method(func)
         return code
 
+    @fragment
     def _generate_jsi_method(self, func: NimFunction, is_last: bool = False) -> str:
         """Generate JSI method implementation for New Architecture."""
         js_name = func.js_name or func.name
@@ -194,53 +374,607 @@ RCT_EXPORT_MODULE()
         method_code += ") {\n"
 
         # Generate method body
-        method_code += self._generate_jsi_method_body(func, js_name)
+        slot = self.dispatch.slot(func) if self.dispatch else None
+        if slot:
+            shape, index = slot
+            args = "".join(f", {name}" for name, _ in func.params)
+            method_code += f"    return nimCall{shape}(rt, {index}{args});\n"
+        else:
+            method_code += self._generate_jsi_method_body(func, js_name)
         # Last method gets one blank line, others get two
         method_code += "}\n\n" if not is_last else "}\n\n"
 
         return method_code
 
-    def _generate_jsi_method_body(self, func: NimFunction, js_name: str) -> str:
-        """Generate the body of a JSI method."""
+    def _generate_jsi_method_body(self, func: NimFunction, js_name: str, receiver: str = None,
+                                  export_index: str = None) -> str:
+        """Generate the body of a JSI method.
+
+        `receiver` is an expression yielding the handle of the first parameter
+        when the body runs inside a handle's host function. `export_index`
+        replaces the function's index in the budget and memory records inside
+        shared trampolines.
+        """
         body = ""
 
+        if self.is_release(func):
+            name, ptype = func.params[0]
+            body += f"    {name}.asHostObject<{ptype}HostObject>(rt)->release();\n"
+            return body
+
         # Convert JSI parameters to C types and build arguments
         args = []
-        for name, ptype in func.params:
-            if ptype in ["cstring", "string"]:
+        for i, (name, ptype) in enumerate(func.params):
+            if ptype in self.handle_types:
+                source = receiver if receiver and i == 0 else f"{ptype}HostObject::unwrap(rt, {name})"
+                body += f"    void* {name}Handle = {source};\n"
+                args.append(f"{name}Handle")
+            elif ptype in ["cstring", "string"]:
                 body += f"    std::string {name}Str = {name}.utf8(rt);\n"
                 args.append(f"const_cast<NCSTRING>({name}Str.c_str())")
+            elif ptype == "callback":
+                binding = self._callback_binding_name(func, name)
+                body += f"    JsCallbackBinding {name}Binding({binding}, std::move({name}));\n"
+                args.append(callback_trampoline_name(func, name))
             elif ptype in ["cint", "int", "int64"]:
                 args.append(f"static_cast<int>({name})")
             else:
                 args.append(name)
 
+        arg_bytes = [f"{name}Str.size()" if ptype in ["cstring", "string"] else "8" for name, ptype in func.params]
+        body += sync_timer(self, func, arg_bytes, index=export_index)
+        body += memory_scope(self, func, index=export_index)
+
         args_str = ", ".join(args)
 
         # Generate return statement based on return type
         # Use :: prefix only when Nim name == JS name to avoid ambiguity
-        prefix = "::" if func.name == js_name else ""
-
-        if func.return_type in ["cstring", "string"]:
-            body += f"    NCSTRING result = {prefix}{func.name}({args_str});\n"
+        target = callee(func)
+        prefix = "::" if target == js_name else ""
+
+        if func.return_type in self.handle_types:
+            body += f"    void* result = {prefix}{target}({args_str});\n"
+            body += f'    if (!result) throw facebook::jsi::JSError(rt, "{js_name} returned nil");\n'
+            body += f"    return {func.return_type}HostObject::wrap(rt, result);\n"
+        elif func.return_type == "mapped":
+            body += "    size_t byteLength = 0;\n"
+            body += f"    void* result = {prefix}{target}({', '.join(args + ['&byteLength'])});\n"
+            body += "    // Wrapped in place: JS reads the Nim memory through an external ArrayBuffer\n"
+            body += f"    return NimMappedBlob::wrap(rt, result, byteLength, {mapped_release_pointer(func)});\n"
+        elif func.return_type in ["cstring", "string"] and func.memory_type == "scratch":
+            body += f"    NCSTRING result = {prefix}{target}({args_str});\n"
+            body += "    // Points into the per-thread scratch buffer; copied straight into the JS string\n"
+            body += "    if (!result) return facebook::jsi::String::createFromAscii(rt, \"\");\n"
+            body += "    return facebook::jsi::String::createFromUtf8(rt, reinterpret_cast<const uint8_t*>(result), std::strlen(result));\n"
+        elif func.return_type in ["cstring", "string"]:
+            body += f"    NCSTRING result = {prefix}{target}({args_str});\n"
             body += f'    std::string str = result ? std::string(result) : "";\n'
             if func.memory_type == "allocated":
                 body += f"    if (result) freeString(result);\n"
             body += f"    return facebook::jsi::String::createFromUtf8(rt, str);\n"
         elif func.return_type == "bool":
-            body += f"    return {prefix}{func.name}({args_str}) != 0;\n"
+            body += f"    return {prefix}{target}({args_str}) != 0;\n"
         elif func.return_type == "int64":
             body += (
-                f"    return static_cast<double>({prefix}{func.name}({args_str}));\n"
+                f"    return static_cast<double>({prefix}{target}({args_str}));\n"
             )
         else:
-            body += f"    return {prefix}{func.name}({args_str});\n"
+            body += f"    return {prefix}{target}({args_str});\n"
 
         return body
 
+    def _generate_host_object(self, handle) -> str:
+        """Generate the jsi::HostObject owning one Nim reference of a handle type."""
+        cls = f"{handle.name}HostObject"
+        methods = self.handle_methods(handle)
+        code = f"""
+// {handle.name} handle: holds one Nim reference until released or garbage collected
+class {cls} : public facebook::jsi::HostObject, public std::enable_shared_from_this<{cls}> {{
+public:
+    explicit {cls}(void* handle) : handle_(handle) {{}}
+    ~{cls}() override {{ release(); }}
+
+    static facebook::jsi::Object wrap(facebook::jsi::Runtime &rt, void* handle) {{
+        return facebook::jsi::Object::createFromHostObject(rt, std::make_shared<{cls}>(handle));
+    }}
+
+    static void* unwrap(facebook::jsi::Runtime &rt, const facebook::jsi::Object &object) {{
+        return object.asHostObject<{cls}>(rt)->checkedHandle(rt);
+    }}
+
+    void* checkedHandle(facebook::jsi::Runtime &rt) const {{
+        void* handle = handle_.load();
+        if (!handle) throw facebook::jsi::JSError(rt, "{handle.name} has been released");
+        return handle;
+    }}
+
+    void release() {{
+        void* handle = handle_.exchange(nullptr);
+        if (handle) ::{handle.release}(handle);
+    }}
+
+    facebook::jsi::Value get(facebook::jsi::Runtime &rt, const facebook::jsi::PropNameID &name) override;
+    std::vector<facebook::jsi::PropNameID> getPropertyNames(facebook::jsi::Runtime &rt) override;
+
+private:
+    std::atomic<void*> handle_;
+}};
+
+facebook::jsi::Value {cls}::get(facebook::jsi::Runtime &rt, const facebook::jsi::PropNameID &name) {{
+    auto host = shared_from_this();
+    std::string prop = name.utf8(rt);
+"""
+        for func in methods:
+            js_name = func.js_name or func.name
+            method = handle.method_name(func)
+            argc = len(func.params) - 1
+            code += f"""    if (prop == "{method}") {{
+        return facebook::jsi::Function::createFromHostFunction(rt, name, {argc},
+            [host](facebook::jsi::Runtime &rt, const facebook::jsi::Value &, const facebook::jsi::Value *args, size_t count) -> facebook::jsi::Value {{
+"""
+            inner = ""
+            if argc:
+                inner += f'    if (count < {argc}) throw facebook::jsi::JSError(rt, "{handle.name}.{method} expects {argc} argument(s)");\n'
+            for i, (name, ptype) in enumerate(func.params[1:]):
+                inner += f"    {self._jsi_arg_conversion(name, ptype, f'args[{i}]')}\n"
+            inner += self._generate_jsi_method_body(func, js_name, receiver="host->checkedHandle(rt)")
+            code += "".join(f"            {line}\n" if line.strip() else "\n"
+                            for line in inner.rstrip("\n").split("\n"))
+            code += "            });\n    }\n"
+
+        names = ", ".join(f'"{handle.method_name(func)}"' for func in methods)
+        code += f"""    if (prop == "release") {{
+        return facebook::jsi::Function::createFromHostFunction(rt, name, 0,
+            [host](facebook::jsi::Runtime &, const facebook::jsi::Value &, const facebook::jsi::Value *, size_t) -> facebook::jsi::Value {{
+                host->release();
+                return facebook::jsi::Value::undefined();
+            }});
+    }}
+    return facebook::jsi::Value::undefined();
+}}
+
+std::vector<facebook::jsi::PropNameID> {cls}::getPropertyNames(facebook::jsi::Runtime &rt) {{
+    return facebook::jsi::PropNameID::names(rt, {names + ', ' if names else ''}"release");
+}}
+"""
+        return code
+
+    def _generate_dispatch_tables(self) -> str:
+        """Generate per-shape Nim function tables and their shared trampolines."""
+        code = "\n// Table dispatch: exports grouped by signature shape, one trampoline per shape\n"
+        for shape, funcs in self.dispatch.shapes.items():
+            rep = shape_function(shape, f"kExports{shape}[slot]", JSI_KIND_RETURN_TYPES, JSI_KIND_PARAM_TYPES)
+            c_params = ", ".join(self.type_mapper.nim_to_cpp_type(ptype) for _, ptype in rep.params) or "void"
+            code += f"using NimShape{shape} = {self.type_mapper.nim_to_cpp_type(rep.return_type)} (*)({c_params});\n"
+            code += f"static const NimShape{shape} kExports{shape}[] = {{\n"
+            for func in funcs:
+                code += f"    &::{callee(func)},  // {func.js_name or func.name}\n"
+            code += "};\n"
+            export_index = None
+            if records_sync_budget(self.config) or records_memory(self.config):
+                export_index = f"kExportIds{shape}[slot]"
+                ids = ", ".join(str(self.function_index(func)) for func in funcs)
+                code += f"static const size_t kExportIds{shape}[] = {{{ids}}};\n"
+
+            params = []
+            for name, ptype in rep.params:
+                if ptype in ["cstring", "string"]:
+                    params.append(f"const facebook::jsi::String &{name}")
+                elif ptype == "bool":
+                    params.append(f"bool {name}")
+                else:
+                    params.append(f"double {name}")
+            params_str = "".join(f", {param}" for param in params)
+            code += f"\nstatic {self._get_jsi_return_type(rep.return_type)} nimCall{shape}(facebook::jsi::Runtime &rt, size_t slot{params_str}) {{\n"
+            code += self._generate_jsi_method_body(rep, rep.js_name, export_index=export_index)
+            code += "}\n\n"
+        return code
+
+    def _generate_async_support(self) -> str:
+        """Generate the serial background queue and promise helper for async variants."""
+        return """
+#include <functional>
+#include <memory>
+#include <string>
+
+namespace {
+
+// Async variants run in call order on one background queue
+dispatch_queue_t nimBridgeAsyncQueue() {
+    static dispatch_queue_t queue = dispatch_queue_create("com.nimbridge.async", DISPATCH_QUEUE_SERIAL);
+    return queue;
+}
+
+// resolve/reject of a pending promise. Created and deleted on the JS thread; the
+// background block only carries the pointer, so no JSI value is ever released
+// off the JS thread (if the invoker drops the settling callback, they leak).
+struct NimBridgePromiseSettlers {
+    facebook::jsi::Function resolve;
+    facebook::jsi::Function reject;
+};
+
+void nimBridgeReject(facebook::jsi::Runtime &rt, const facebook::jsi::Function &reject, const std::string &message) {
+    auto error = rt.global().getPropertyAsFunction(rt, "Error");
+    reject.call(rt, error.callAsConstructor(rt, facebook::jsi::String::createFromUtf8(rt, message)));
+}
+
+// Runs `work` off the JS thread and settles a JS promise with `toJs(result)` on it;
+// exceptions from either reject the promise
+template <typename T>
+facebook::jsi::Value nimBridgePromise(facebook::jsi::Runtime &rt, std::shared_ptr<facebook::react::CallInvoker> invoker,
+                                      std::function<T()> work,
+                                      std::function<facebook::jsi::Value(facebook::jsi::Runtime &, const T &)> toJs) {
+    auto promise = rt.global().getPropertyAsFunction(rt, "Promise");
+    return promise.callAsConstructor(rt, facebook::jsi::Function::createFromHostFunction(
+        rt, facebook::jsi::PropNameID::forAscii(rt, "executor"), 2,
+        [invoker, work, toJs](facebook::jsi::Runtime &rt, const facebook::jsi::Value &, const facebook::jsi::Value *args, size_t) -> facebook::jsi::Value {
+            NimBridgePromiseSettlers *settlers = new NimBridgePromiseSettlers{
+                args[0].asObject(rt).asFunction(rt), args[1].asObject(rt).asFunction(rt)};
+            dispatch_async(nimBridgeAsyncQueue(), ^{
+                T result{};
+                std::string error;
+                bool failed = false;
+                try {
+                    result = work();
+                } catch (const std::exception &e) {
+                    failed = true;
+                    error = e.what();
+                } catch (...) {
+                    failed = true;
+                    error = "Nim call failed";
+                }
+                invoker->invokeAsync([settlers, toJs, result, error, failed](facebook::jsi::Runtime &rt) {
+                    std::unique_ptr<NimBridgePromiseSettlers> owned(settlers);
+                    if (failed) {
+                        nimBridgeReject(rt, owned->reject, error);
+                        return;
+                    }
+                    try {
+                        owned->resolve.call(rt, toJs(rt, result));
+                    } catch (const std::exception &e) {
+                        nimBridgeReject(rt, owned->reject, e.what());
+                    }
+                });
+            });
+            return facebook::jsi::Value::undefined();
+        }));
+}
+
+} // namespace
+"""
+
+    @fragment
+    def _generate_async_method(self, func: NimFunction) -> str:
+        """Generate the Promise-returning variant of a slow sync function."""
+        js_name = func.js_name or func.name
+        params_str = self._build_jsi_params(func)
+
+        # Arguments are converted on the JS thread and captured by value
+        body = ""
+        captures = []
+        args = []
+        for name, ptype in func.params:
+            if ptype in ["cstring", "string"]:
+                body += f"    std::string {name}Str = {name}.utf8(rt);\n"
+                captures.append(f"{name}Str")
+                args.append(f"const_cast<NCSTRING>({name}Str.c_str())")
+            elif ptype in ["cint", "int", "int64"]:
+                captures.append(name)
+                args.append(f"static_cast<int>({name})")
+            else:
+                captures.append(name)
+                args.append(name)
+        call = f"::{callee(func)}({', '.join(args)})"
+
+        if func.return_type in ["cstring", "string"]:
+            value_type = "std::string"
+            work = f"""            NCSTRING result = {call};
+            std::string value = result ? std::string(result) : "";
+"""
+            if func.memory_type == "allocated":
+                work += "            if (result) freeString(result);\n"
+            work += "            return value;\n"
+            to_js = "facebook::jsi::String::createFromUtf8(rt, value)"
+        elif func.return_type == "bool":
+            value_type = "bool"
+            work = f"            return {call} != 0;\n"
+            to_js = "facebook::jsi::Value(value)"
+        else:
+            value_type = "double"
+            work = f"            return static_cast<double>({call});\n"
+            to_js = "facebook::jsi::Value(value)"
+
+        return f"""facebook::jsi::Value {self.config.module_name}Impl::{js_name}Async(facebook::jsi::Runtime &rt{', ' + params_str if params_str else ''}) {{
+{body}    return nimBridgePromise<{value_type}>(rt, jsInvoker_,
+        [{', '.join(captures)}]() -> {value_type} {{
+{memory_scope(self, func, indent="            ")}{work}        }},
+        [](facebook::jsi::Runtime &rt, const {value_type} &value) -> facebook::jsi::Value {{
+            return {to_js};
+        }});
+}}
+
+"""
+
+    @fragment
+    def _generate_vector_host_function(self, func: NimFunction) -> str:
+        """Generate the typed-array-in/ArrayBuffer-out companion JS actually calls."""
+        name = vector_name(func)
+        out_type = VECTOR_RETURN_TYPES[func.return_type][1]
+        arrays = f"{len(func.params)} arrays" if len(func.params) > 1 else "an array"
+        body = f"    if (count < {len(func.params)}) throw facebook::jsi::JSError(rt, \"{name}: expected {arrays}\");\n"
+        for i, (param, ptype) in enumerate(func.params):
+            typed_array, element = VECTOR_PARAM_TYPES[ptype]
+            body += f"    auto {param} = NimVectorColumn<{element}>::read(rt, args[{i}], \"{typed_array}\", \"{name}\");\n"
+        first = func.params[0][0]
+        for param, _ in func.params[1:]:
+            body += f"    if ({param}.count != {first}.count) throw facebook::jsi::JSError(rt, \"{name}: arrays differ in length\");\n"
+        args = "".join(f"{param}.data(), " for param, _ in func.params)
+        body += f"    auto result = std::make_shared<NimVectorBuffer<{out_type}>>({first}.count);\n"
+        body += f"    {vector_kernel_name(func)}({args}result->values(), {first}.count);\n"
+        body += "    return facebook::jsi::ArrayBuffer(rt, std::move(result));\n"
+        return f"""static facebook::jsi::Value {vector_kernel_name(func)}Jsi(facebook::jsi::Runtime &rt, const facebook::jsi::Value &, const facebook::jsi::Value *args, size_t count) {{
+{body}}}
+
+"""
+
+    def _generate_vector_create(self) -> str:
+        """Generate the `create` override that installs the typed-array companions."""
+        module = self.config.module_name
+        code = f"""facebook::jsi::Value {module}Impl::create(facebook::jsi::Runtime &rt, const facebook::jsi::PropNameID &name) {{
+    // The codegen delegate converts array arguments with asArray(), which
+    // rejects typed arrays, so these are installed as plain host functions
+    std::string method = name.utf8(rt);
+"""
+        for func in vector_functions(self.functions):
+            code += f'    if (method == "{vector_name(func)}") {{\n'
+            code += f"        return facebook::jsi::Function::createFromHostFunction(rt, name, {len(func.params)}, {vector_kernel_name(func)}Jsi);\n"
+            code += "    }\n"
+        code += f"""    return facebook::react::Native{module}CxxSpec<{module}Impl>::create(rt, name);
+}}
+
+"""
+        return code
+
+    @fragment
+    def _generate_vector_method(self, func: NimFunction) -> str:
+        """Generate the spec's array-in/array-out companion; `create` routes JS calls to the typed-array one."""
+        name = vector_name(func)
+        params_str = ", ".join(f"facebook::jsi::Array {param}" for param, _ in func.params)
+        first = func.params[0][0]
+        body = f"    size_t count = {first}.size(rt);\n"
+        for param, _ in func.params[1:]:
+            body += f"    if ({param}.size(rt) != count) throw facebook::jsi::JSError(rt, \"{name}: arrays differ in length\");\n"
+        for param, ptype in func.params:
+            element = VECTOR_PARAM_TYPES[ptype][1]
+            body += f"    std::vector<{element}> {param}Values(count);\n"
+            body += "    for (size_t i = 0; i < count; i++) {\n"
+            body += f"        {param}Values[i] = static_cast<{element}>({param}.getValueAtIndex(rt, i).asNumber());\n"
+            body += "    }\n"
+        args = "".join(f"{param}Values.data(), " for param, _ in func.params)
+        body += f"    std::vector<{VECTOR_RETURN_TYPES[func.return_type][1]}> result(count);\n"
+        body += f"    {vector_kernel_name(func)}({args}result.data(), count);\n"
+        body += "    auto array = facebook::jsi::Array(rt, count);\n"
+        body += "    for (size_t i = 0; i < count; i++) {\n"
+        body += "        array.setValueAtIndex(rt, i, facebook::jsi::Value(static_cast<double>(result[i])));\n"
+        body += "    }\n"
+        body += "    return array;\n"
+        return f"""facebook::jsi::Array {self.config.module_name}Impl::{name}(facebook::jsi::Runtime &rt, {params_str}) {{
+{body}}}
+
+"""
+
+    def _generate_mapped_blob_methods(self) -> str:
+        """Generate readMappedBlob and releaseMappedBlob."""
+        module = self.config.module_name
+        return f"""facebook::jsi::Array {module}Impl::readMappedBlob(facebook::jsi::Runtime &rt, facebook::jsi::Object blob, double offset, double length) {{
+    return NimMappedBlob::unwrap(rt, blob)->read(rt, offset, length);
+}}
+
+void {module}Impl::releaseMappedBlob(facebook::jsi::Runtime &rt, facebook::jsi::Object blob) {{
+    NimMappedBlob::unwrap(rt, blob)->release();
+}}
+
+"""
+
+    def _generate_memory_stats_method(self) -> str:
+        """Generate getNativeMemoryStats."""
+        return f"""facebook::jsi::String {self.config.module_name}Impl::getNativeMemoryStats(facebook::jsi::Runtime &rt) {{
+    return facebook::jsi::String::createFromUtf8(rt, nimbridge::MemoryTelemetry::instance().reportJson());
+}}
+
+"""
+
+    def _generate_budget_report_method(self) -> str:
+        """Generate getSyncBudgetReport, which also persists the report to Caches."""
+        return f"""facebook::jsi::String {self.config.module_name}Impl::getSyncBudgetReport(facebook::jsi::Runtime &rt) {{
+    std::string report = nimbridge::SyncBudgetRecorder::instance().reportJson();
+    NSString *caches = NSSearchPathForDirectoriesInDomains(NSCachesDirectory, NSUserDomainMask, YES).firstObject;
+    if (caches) {{
+        [[NSString stringWithUTF8String:report.c_str()] writeToFile:[caches stringByAppendingPathComponent:@"{REPORT_FILE}"]
+                                                          atomically:YES
+                                                            encoding:NSUTF8StringEncoding
+                                                               error:nil];
+    }}
+    return facebook::jsi::String::createFromUtf8(rt, report);
+}}
+
+"""
+
+    def _jsi_arg_conversion(self, name: str, ptype: str, value: str) -> str:
+        """Declaration converting a host function argument to its JSI parameter type."""
+        if ptype in ["cstring", "string"]:
+            return f"facebook::jsi::String {name} = {value}.asString(rt);"
+        elif ptype == "callback":
+            return f"facebook::jsi::Function {name} = {value}.asObject(rt).asFunction(rt);"
+        elif ptype in self.handle_types:
+            return f"facebook::jsi::Object {name} = {value}.asObject(rt);"
+        elif ptype == "bool":
+            return f"bool {name} = {value}.asBool();"
+        return f"double {name} = {value}.asNumber();"
+
+    @staticmethod
+    def _callback_binding_name(func: NimFunction, param_name: str) -> str:
+        return f"g{func.name[0].upper() + func.name[1:]}{param_name[0].upper() + param_name[1:]}Callback"
+
+    def _generate_event_support(self) -> str:
+        """Generate JS invoker/listener holders, callback trampolines and the event ring."""
+        code = """
+namespace {
+
+// Holder for a JS function; calls are always scheduled on the JS thread
+class JsFunctionSlot {
+public:
+    void set(std::shared_ptr<facebook::jsi::Function> fn) {
+        std::lock_guard<std::mutex> lock(mutex_);
+        fn_ = std::move(fn);
+    }
+    std::shared_ptr<facebook::jsi::Function> get() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        return fn_;
+    }
+private:
+    std::mutex mutex_;
+    std::shared_ptr<facebook::jsi::Function> fn_;
+};
+
+// JS callback of the call in progress on this thread. Nim callbacks carry no
+// context pointer, so each call publishes its function through a thread-local
+// binding and the trampoline reads it from there. The binding goes away when
+// the call returns, and nested calls restore the outer one. Invocations from
+// other threads, or after the call has returned, are dropped.
+class JsCallbackBinding {
+public:
+    JsCallbackBinding(JsCallbackBinding *&current, facebook::jsi::Function fn)
+        : current_(current), previous_(current), fn_(std::make_shared<facebook::jsi::Function>(std::move(fn))) {
+        current_ = this;
+    }
+    ~JsCallbackBinding() { current_ = previous_; }
+    JsCallbackBinding(const JsCallbackBinding &) = delete;
+    JsCallbackBinding &operator=(const JsCallbackBinding &) = delete;
+
+    std::shared_ptr<facebook::jsi::Function> function() const { return fn_; }
+
+private:
+    JsCallbackBinding *&current_;
+    JsCallbackBinding *previous_;
+    std::shared_ptr<facebook::jsi::Function> fn_;
+};
+
+std::mutex gJsInvokerMutex;
+std::shared_ptr<facebook::react::CallInvoker> gJsInvoker;
+JsFunctionSlot gEventsPendingListener;
+
+void setJsInvoker(std::shared_ptr<facebook::react::CallInvoker> invoker) {
+    std::lock_guard<std::mutex> lock(gJsInvokerMutex);
+    gJsInvoker = std::move(invoker);
+}
+
+// Drops the invoker and the pending listener of a torn-down module, unless a
+// newer module instance has already installed its own
+void resetJsInvoker(const std::shared_ptr<facebook::react::CallInvoker> &invoker) {
+    std::lock_guard<std::mutex> lock(gJsInvokerMutex);
+    if (gJsInvoker != invoker) return;
+    gJsInvoker.reset();
+    gEventsPendingListener.set(nullptr);
+}
+
+std::shared_ptr<facebook::react::CallInvoker> jsInvoker() {
+    std::lock_guard<std::mutex> lock(gJsInvokerMutex);
+    return gJsInvoker;
+}
+
+"""
+        for func in self.functions:
+            for param_name in func.callbacks:
+                code += self._generate_callback_trampoline(func, param_name)
+
+        code += "} // namespace\n\n"
+        code += event_ring_definitions(self)
+        code += """static void nimBridgeNotifyEventsPending() {
+    auto invoker = jsInvoker();
+    auto listener = gEventsPendingListener.get();
+    if (!invoker || !listener) {
+        // Nobody to wake yet; the next listener registration drains
+        gNimBridgeEvents.releaseWakeup();
+        return;
+    }
+    invoker->invokeAsync([listener](facebook::jsi::Runtime &rt) {
+        listener->call(rt);
+    });
+}
+"""
+        return code
+
+    def _generate_callback_trampoline(self, func: NimFunction, param_name: str) -> str:
+        """Generate the C trampoline Nim calls, forwarding to the held JS function."""
+        binding = self._callback_binding_name(func, param_name)
+        c_params = callback_c_params(func, param_name, self.type_mapper)
+        params_str = ", ".join(f"{ctype} {name}" for ctype, name in c_params) or "void"
+
+        captures = []
+        values = []
+        body = ""
+        for (_, name), (_, ptype) in zip(c_params, func.callbacks[param_name]):
+            if ptype in ["cstring", "string"]:
+                body += f'    std::string {name}Copy = {name} ? std::string({name}) : "";\n'
+                captures.append(f"{name}Copy")
+                values.append(f"facebook::jsi::String::createFromUtf8(rt, {name}Copy)")
+            elif ptype == "bool":
+                captures.append(name)
+                values.append(f"facebook::jsi::Value({name} != 0)")
+            else:
+                captures.append(name)
+                values.append(f"facebook::jsi::Value(static_cast<double>({name}))")
+
+        call_args = "".join(f", {value}" for value in values)
+        capture_str = ", ".join(["callback"] + captures)
+        return f"""thread_local JsCallbackBinding *{binding} = nullptr;
+
+void {callback_trampoline_name(func, param_name)}({params_str}) {{
+    auto invoker = jsInvoker();
+    if (!{binding} || !invoker) return;
+    auto callback = {binding}->function();
+{body}    invoker->invokeAsync([{capture_str}](facebook::jsi::Runtime &rt) {{
+        callback->call(rt{call_args});
+    }});
+}}
+
+"""
+
+    def _generate_event_methods(self) -> str:
+        """Generate drainEvents / setEventsPendingListener JSI methods."""
+        module = self.config.module_name
+        return f"""facebook::jsi::Array {module}Impl::drainEvents(facebook::jsi::Runtime &rt, double max) {{
+    size_t limit = max >= 1 ? static_cast<size_t>(max) : 1;
+    std::vector<nimbridge::Event> batch;
+    batch.reserve(limit);
+    gNimBridgeEvents.drain(batch, limit);
+
+    // Flat [channel, payload, channel, payload, ...] to avoid per-event objects
+    auto result = facebook::jsi::Array(rt, batch.size() * 2);
+    for (size_t i = 0; i < batch.size(); i++) {{
+        result.setValueAtIndex(rt, i * 2, facebook::jsi::String::createFromAscii(rt, nimbridge::kEventChannels[batch[i].channel]));
+        result.setValueAtIndex(rt, i * 2 + 1, facebook::jsi::String::createFromUtf8(rt, batch[i].payload));
+    }}
+    return result;
+}}
+
+void {module}Impl::setEventsPendingListener(facebook::jsi::Runtime &rt, facebook::jsi::Function listener) {{
+    gEventsPendingListener.set(std::make_shared<facebook::jsi::Function>(std::move(listener)));
+    if (!gNimBridgeEvents.empty() && gNimBridgeEvents.claimWakeup()) {{
+        nimBridgeNotifyEventsPending();
+    }}
+}}
+
+"""
+
     def _get_jsi_return_type(self, nim_type: str) -> str:
         """Get JSI return type."""
-        if nim_type in ["cstring", "string"]:
+        if nim_type in self.handle_types or nim_type == "mapped":
+            return "facebook::jsi::Object"
+        elif nim_type == "void":
+            return "void"
+        elif nim_type in ["cstring", "string"]:
             return "facebook::jsi::String"
         elif nim_type == "bool":
             return "bool"
@@ -253,9 +987,15 @@ RCT_EXPORT_MODULE()
         for name, ptype in func.params:
             if ptype in ["cstring", "string"]:
                 params.append(f"facebook::jsi::String {name}")
+            elif ptype == "callback":
+                params.append(f"facebook::jsi::Function {name}")
+            elif ptype in self.handle_types:
+                params.append(f"facebook::jsi::Object {name}")
             elif ptype == "bool":
                 params.append(f"bool {name}")
             else:
                 params.append(f"double {name}")
+        if func.callbacks:
+            params.append(f"double {CALL_ID_PARAM}")
         return ", ".join(params)
 
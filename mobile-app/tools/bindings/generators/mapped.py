@@ -0,0 +1,138 @@
+"""
+Memory-mapped blob exports.
+
+A proc annotated `## @mapped` returns a pointer to read-only bytes (static
+data or a memory-mapped file) and writes their count to a trailing
+`ptr csize_t` parameter that JS never sees. The bytes are not copied into the
+JS heap. On iOS they back an external `jsi::ArrayBuffer`. On Android they are
+wrapped in a direct ByteBuffer, which the Kotlin module keeps by id.
+`## @mapped(releaseProc)` names a `## @release` proc taking the pointer. It
+runs once the blob is released or collected. Without one, the data must
+outlive the app.
+"""
+
+from typing import List, Optional
+
+from ..models import NimFunction
+
+
+LENGTH_PARAM_TYPE = 'ptr csize_t'
+MAPPED_PARAM_TYPES = {'cstring', 'string', 'cint', 'int', 'int64', 'bool', 'float'}
+
+
+def mapped_eligible(func: NimFunction) -> bool:
+    """A pointer result plus a trailing length out-parameter, after string, number or bool parameters."""
+    return func.return_type == 'pointer' and bool(func.params) and func.params[-1][1] == LENGTH_PARAM_TYPE \
+        and not func.callbacks and all(ptype in MAPPED_PARAM_TYPES for _, ptype in func.params[:-1])
+
+
+def is_blob_release(func: NimFunction) -> bool:
+    """Whether the function has the shape of a blob release hook: `@release`, one pointer, no result."""
+    return 'release' in func.annotations and func.return_type == 'void' \
+        and [ptype for _, ptype in func.params] == ['pointer']
+
+
+def mapped_release(func: NimFunction) -> Optional[str]:
+    return func.annotations.get('mapped') or None
+
+
+def mapped_functions(functions: List[NimFunction]) -> List[NimFunction]:
+    return [func for func in functions if func.return_type == 'mapped']
+
+
+def mapped_releases(functions: List[NimFunction]) -> List[str]:
+    """Release procs named by the mapped exports, once each, in declaration order."""
+    names = []
+    for func in mapped_functions(functions):
+        release = mapped_release(func)
+        if release and release not in names:
+            names.append(release)
+    return names
+
+
+def mapped_release_pointer(func: NimFunction) -> str:
+    """C++ expression of a blob's release hook, `nullptr` for static data."""
+    release = mapped_release(func)
+    return f"&::{release}" if release else "nullptr"
+
+
+def mapped_blob_definitions() -> str:
+    """`NimMappedBuffer` (the bytes behind the ArrayBuffers) and the `NimMappedBlob` host object."""
+    return """
+#include <algorithm>
+#include <memory>
+#include <string>
+#include <vector>
+
+// @mapped blobs: Nim memory handed to JS as external ArrayBuffers, never copied.
+// Every ArrayBuffer shares the buffer, so the release hook runs once the blob
+// and all ArrayBuffers over it are gone.
+class NimMappedBuffer : public facebook::jsi::MutableBuffer {
+public:
+    NimMappedBuffer(void* data, size_t size, void (*release)(void*))
+        : data_(data), size_(data ? size : 0), release_(release) {}
+    ~NimMappedBuffer() override {
+        if (data_ && release_) release_(data_);
+    }
+
+    size_t size() const override { return size_; }
+    uint8_t* data() override {
+        static uint8_t empty = 0;
+        return data_ ? static_cast<uint8_t*>(data_) : &empty;
+    }
+
+private:
+    void* data_;
+    size_t size_;
+    void (*release_)(void*);
+};
+
+class NimMappedBlob : public facebook::jsi::HostObject {
+public:
+    explicit NimMappedBlob(std::shared_ptr<NimMappedBuffer> buffer)
+        : size_(buffer->size()), buffer_(std::move(buffer)) {}
+
+    static facebook::jsi::Object wrap(facebook::jsi::Runtime &rt, void* data, size_t size, void (*release)(void*)) {
+        auto buffer = std::make_shared<NimMappedBuffer>(data, size, release);
+        return facebook::jsi::Object::createFromHostObject(rt, std::make_shared<NimMappedBlob>(std::move(buffer)));
+    }
+
+    static std::shared_ptr<NimMappedBlob> unwrap(facebook::jsi::Runtime &rt, const facebook::jsi::Object &object) {
+        return object.asHostObject<NimMappedBlob>(rt);
+    }
+
+    // Copies a byte range into a JS array; clamped to the blob
+    facebook::jsi::Array read(facebook::jsi::Runtime &rt, double offset, double length) {
+        if (!buffer_) throw facebook::jsi::JSError(rt, "Mapped blob has been released");
+        size_t start = offset > 0 ? std::min(static_cast<size_t>(offset), size_) : 0;
+        size_t count = length > 0 ? std::min(static_cast<size_t>(length), size_ - start) : 0;
+        const uint8_t* bytes = buffer_->data() + start;
+        auto array = facebook::jsi::Array(rt, count);
+        for (size_t i = 0; i < count; i++) {
+            array.setValueAtIndex(rt, i, facebook::jsi::Value(static_cast<double>(bytes[i])));
+        }
+        return array;
+    }
+
+    // ArrayBuffers handed out earlier stay valid; they hold their own reference
+    void release() { buffer_.reset(); }
+
+    facebook::jsi::Value get(facebook::jsi::Runtime &rt, const facebook::jsi::PropNameID &name) override {
+        std::string prop = name.utf8(rt);
+        if (prop == "byteLength") return facebook::jsi::Value(static_cast<double>(size_));
+        if (prop == "buffer") {
+            if (!buffer_) return facebook::jsi::Value::null();
+            return facebook::jsi::ArrayBuffer(rt, buffer_);
+        }
+        return facebook::jsi::Value::undefined();
+    }
+
+    std::vector<facebook::jsi::PropNameID> getPropertyNames(facebook::jsi::Runtime &rt) override {
+        return facebook::jsi::PropNameID::names(rt, "byteLength", "buffer");
+    }
+
+private:
+    size_t size_;
+    std::shared_ptr<NimMappedBuffer> buffer_;
+};
+"""
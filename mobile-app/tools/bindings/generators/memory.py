@@ -0,0 +1,233 @@
+"""
+Memory conventions shared by the iOS and Android bridges.
+
+`@scratch` string returns are written by Nim into a per-thread buffer owned
+by the bridge and copied out immediately, replacing the alloc0/freeString
+pair `@allocated` returns pay on every call.
+
+With `memory.telemetry` enabled (and Nim built with `-d:nimBridgeTelemetry`)
+every `allocCString`/`freeString` is reported to the bridge, which attributes
+it to the export running on that thread and keeps live, freed and peak bytes
+per export next to the Nim heap totals.
+"""
+
+from typing import List, Optional
+
+from .base import CodeGenerator
+from ..models import NimFunction
+
+
+DEFAULT_SCRATCH_CAPACITY = 256
+TELEMETRY_DEFINE = "nimBridgeTelemetry"
+
+
+def uses_scratch(functions: List[NimFunction]) -> bool:
+    """Whether any export returns through the scratch buffer."""
+    return any(func.memory_type == 'scratch' for func in functions)
+
+
+def scratch_initial_capacity(config) -> int:
+    """Configured initial scratch buffer size in bytes."""
+    return max(16, int(config.data.get('memory', {}).get('scratch_capacity', DEFAULT_SCRATCH_CAPACITY)))
+
+
+def scratch_buffer_definitions(config) -> str:
+    """extern "C" scratch allocator Nim calls for `@scratch` returns."""
+    return f"""// Per-thread scratch buffer backing @scratch string returns. Nim writes the
+// result here and the bridge copies it out before the next call on the thread;
+// the buffer only grows (geometrically), so steady-state calls do not allocate.
+extern "C" char* nimBridgeScratch(size_t size) {{
+    static thread_local std::unique_ptr<char[]> buffer;
+    static thread_local size_t capacity = 0;
+    if (size > capacity) {{
+        size_t grown = capacity ? capacity : {scratch_initial_capacity(config)};
+        while (grown < size) {{
+            grown *= 2;
+        }}
+        buffer.reset(new char[grown]);
+        capacity = grown;
+    }}
+    return buffer.get();
+}}
+
+"""
+
+
+def records_memory(config) -> bool:
+    return bool(config.data.get('memory', {}).get('telemetry', False))
+
+
+def memory_scope(generator: CodeGenerator, func: NimFunction, indent: str = "    ",
+                 index: Optional[str] = None) -> str:
+    """Statement attributing Nim allocations of the enclosing call to `func`, if enabled.
+
+    `index` overrides the function's position with a runtime expression, for
+    trampolines shared by several exports.
+    """
+    if not records_memory(generator.config):
+        return ""
+    if index is None:
+        index = generator.function_index(func)
+    return f"{indent}nimbridge::MemoryScope memoryScope({index});\n"
+
+
+def memory_hook_definitions() -> str:
+    """extern "C" hooks Nim's allocCString/freeString report to."""
+    return """// Called from Nim's allocCString/freeString when built with -d:nimBridgeTelemetry
+extern "C" void nimBridgeTrackAlloc(void* ptr, size_t size) {
+    nimbridge::MemoryTelemetry::instance().trackAlloc(ptr, size);
+}
+
+extern "C" void nimBridgeTrackFree(void* ptr) {
+    nimbridge::MemoryTelemetry::instance().trackFree(ptr);
+}
+
+"""
+
+
+class MemoryTelemetryHeaderGenerator(CodeGenerator):
+    """Generates the allocation tracker header used by both bridges."""
+
+    def generate(self) -> str:
+        """Generate NimBridgeMemory.h."""
+        code = CodeGenerator._generate_header("native allocation telemetry")
+        code += """#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+
+// Nim heap usage of the calling thread: occupied, free and total bytes
+extern "C" void nimBridgeHeapStats(long long* stats);
+
+namespace nimbridge {
+
+// JS names of the bridged functions, indexed by the generated call sites
+static const char* const kMemoryFunctionNames[] = {
+"""
+        for func in self.functions:
+            code += f'    "{func.js_name or func.name}",\n'
+        code += f"""}};
+static constexpr size_t kMemoryFunctionCount = {len(self.functions)};
+// Allocations made outside any bridged call (async work, Nim internals)
+static constexpr size_t kUnattributed = kMemoryFunctionCount;
+
+class MemoryTelemetry {{
+public:
+    static MemoryTelemetry &instance() {{
+        static MemoryTelemetry telemetry;
+        return telemetry;
+    }}
+
+    // Export running on this thread, set by MemoryScope around each bridged call
+    static size_t &currentFunction() {{
+        static thread_local size_t current = kUnattributed;
+        return current;
+    }}
+
+    void trackAlloc(const void* ptr, size_t size) {{
+        if (!ptr) return;
+        size_t function = currentFunction();
+        std::lock_guard<std::mutex> lock(mutex_);
+        live_[ptr] = {{function, size}};
+        Stats &stats = stats_[function];
+        stats.allocs++;
+        stats.bytesAllocated += size;
+        stats.liveBytes += size;
+        if (stats.liveBytes > stats.peakBytes) stats.peakBytes = stats.liveBytes;
+        liveBytes_ += size;
+        if (liveBytes_ > peakBytes_) peakBytes_ = liveBytes_;
+    }}
+
+    void trackFree(const void* ptr) {{
+        if (!ptr) return;
+        std::lock_guard<std::mutex> lock(mutex_);
+        auto it = live_.find(ptr);
+        if (it == live_.end()) {{
+            untrackedFrees_++;
+            return;
+        }}
+        Stats &stats = stats_[it->second.function];
+        stats.frees++;
+        stats.bytesFreed += it->second.size;
+        stats.liveBytes -= it->second.size;
+        liveBytes_ -= it->second.size;
+        live_.erase(it);
+    }}
+
+    // {{"liveAllocations", "liveBytes", "peakBytes", "untrackedFrees", "nimHeap": {{...}},
+    //   "functions": {{name: {{allocs, frees, bytesAllocated, bytesFreed, liveAllocations, liveBytes, peakBytes}}}}}}
+    std::string reportJson() {{
+        long long heap[3] = {{0, 0, 0}};
+        nimBridgeHeapStats(heap);
+
+        std::lock_guard<std::mutex> lock(mutex_);
+        std::string out = "{{\\"liveAllocations\\":" + std::to_string(live_.size())
+            + ",\\"liveBytes\\":" + std::to_string(liveBytes_)
+            + ",\\"peakBytes\\":" + std::to_string(peakBytes_)
+            + ",\\"untrackedFrees\\":" + std::to_string(untrackedFrees_)
+            + ",\\"nimHeap\\":{{\\"occupiedBytes\\":" + std::to_string(heap[0])
+            + ",\\"freeBytes\\":" + std::to_string(heap[1])
+            + ",\\"totalBytes\\":" + std::to_string(heap[2]) + "}},\\"functions\\":{{";
+        bool first = true;
+        for (size_t i = 0; i <= kMemoryFunctionCount; i++) {{
+            const Stats &stats = stats_[i];
+            if (!stats.allocs) continue;
+            if (!first) out += ',';
+            first = false;
+            std::string name = i < kMemoryFunctionCount ? kMemoryFunctionNames[i] : "(unattributed)";
+            out += "\\"" + name + "\\":{{\\"allocs\\":" + std::to_string(stats.allocs)
+                + ",\\"frees\\":" + std::to_string(stats.frees)
+                + ",\\"bytesAllocated\\":" + std::to_string(stats.bytesAllocated)
+                + ",\\"bytesFreed\\":" + std::to_string(stats.bytesFreed)
+                + ",\\"liveAllocations\\":" + std::to_string(stats.allocs - stats.frees)
+                + ",\\"liveBytes\\":" + std::to_string(stats.liveBytes)
+                + ",\\"peakBytes\\":" + std::to_string(stats.peakBytes) + "}}";
+        }}
+        out += "}}}}";
+        return out;
+    }}
+
+private:
+    struct Stats {{
+        uint64_t allocs = 0;
+        uint64_t frees = 0;
+        uint64_t bytesAllocated = 0;
+        uint64_t bytesFreed = 0;
+        uint64_t liveBytes = 0;
+        uint64_t peakBytes = 0;
+    }};
+
+    struct Allocation {{
+        size_t function;
+        size_t size;
+    }};
+
+    std::mutex mutex_;
+    std::unordered_map<const void*, Allocation> live_;
+    Stats stats_[kMemoryFunctionCount + 1];
+    uint64_t liveBytes_ = 0;
+    uint64_t peakBytes_ = 0;
+    uint64_t untrackedFrees_ = 0;
+}};
+
+// Attributes Nim allocations made in the enclosing scope to one export
+class MemoryScope {{
+public:
+    explicit MemoryScope(size_t function) : previous_(MemoryTelemetry::currentFunction()) {{
+        MemoryTelemetry::currentFunction() = function;
+    }}
+
+    ~MemoryScope() {{
+        MemoryTelemetry::currentFunction() = previous_;
+    }}
+
+private:
+    size_t previous_;
+}};
+
+}} // namespace nimbridge
+"""
+        return code
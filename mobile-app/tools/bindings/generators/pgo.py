@@ -0,0 +1,230 @@
+"""
+Build profiles and profile-guided optimization support for the Nim core.
+
+Build profiles select the Nim define (`-d:release`, `-d:danger`), memory
+manager and optimization level, plus extra C flags for the native builds.
+The PGO training driver is a host program calling the exported Nim procs
+through the same C declarations as the bridges, running the workloads of a
+scenario file under `-fprofile-instr-generate`.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .base import CodeGenerator
+from .mapped import mapped_release
+from .memory import TELEMETRY_DEFINE, records_memory, scratch_buffer_definitions
+from ..models import NimConstant, NimFunction, NimHandleType
+from ..config import GeneratorConfig
+
+
+# `danger` drops runtime checks; `arc` skips ORC's cycle collector for acyclic data
+DEFAULT_BUILD_PROFILES = {
+    "debug": {"define": "debug", "mm": "orc", "opt": "none", "c_flags": ["-O0", "-g"]},
+    "release": {"define": "release", "mm": "orc", "opt": "speed"},
+    "danger": {"define": "danger", "mm": "arc", "opt": "speed", "c_flags": ["-O3"]},
+}
+
+NIM_MEMORY_MANAGERS = ("orc", "arc", "refc", "markAndSweep", "boehm", "go", "none")
+
+PROFILE_FILE = "nimbridge.profdata"
+DEFAULT_PGO_DIR = "nim/pgo"
+DEFAULT_REPEAT = 1000
+
+
+def resolve_build_profile(config, name: Optional[str] = None) -> Optional[dict]:
+    """The selected build profile (`build.profile`), if any.
+
+    Profiles under `build.profiles` extend the defaults of the same name.
+    """
+    build_config = config.data.get('build', {})
+    name = name or build_config.get('profile')
+    if not name:
+        return None
+    profiles = {key: dict(value) for key, value in DEFAULT_BUILD_PROFILES.items()}
+    for key, value in build_config.get('profiles', {}).items():
+        profiles.setdefault(key, {}).update(value)
+    if name not in profiles:
+        raise ValueError(f"Unknown build profile '{name}' (available: {', '.join(sorted(profiles))})")
+    profile = dict(profiles[name], name=name)
+    if profile.get('mm') and profile['mm'] not in NIM_MEMORY_MANAGERS:
+        raise ValueError(f"Build profile '{name}': unknown Nim memory manager '{profile['mm']}'")
+    return profile
+
+
+def profile_nim_flags(config, profile: Optional[dict]) -> List[str]:
+    """Nim flags of a build profile; without one, the plain `build.nim_flags`.
+
+    Memory telemetry adds the define compiling in Nim's allocation hooks.
+    """
+    telemetry = [f"-d:{TELEMETRY_DEFINE}"] if records_memory(config) else []
+    if profile is None:
+        return list(config.data.get('build', {}).get('nim_flags', ['-d:release'])) + telemetry
+    flags = []
+    if profile.get('define'):
+        flags.append(f"-d:{profile['define']}")
+    if profile.get('mm'):
+        flags.append(f"--mm:{profile['mm']}")
+    if profile.get('opt'):
+        flags.append(f"--opt:{profile['opt']}")
+    return flags + list(profile.get('nim_flags', [])) + telemetry
+
+
+def profile_c_flags(profile: Optional[dict]) -> List[str]:
+    return list(profile.get('c_flags', [])) if profile else []
+
+
+def uses_pgo_profile(config) -> bool:
+    """Whether native builds pick up a merged profile when one exists."""
+    return 'pgo' in config.data and config.data['pgo'].get('use_profile', True)
+
+
+def pgo_dir(config, base_dir: Path) -> Path:
+    return base_dir / config.data.get('pgo', {}).get('output_dir', DEFAULT_PGO_DIR)
+
+
+def pgo_use_flags(config, base_dir: Path) -> List[str]:
+    """clang flags applying the merged profile, or nothing before the first training run.
+
+    The profile comes from a host build, so functions whose code differs on
+    the target are skipped rather than reported.
+    """
+    profile = pgo_dir(config, base_dir) / PROFILE_FILE
+    if not uses_pgo_profile(config) or not profile.is_file():
+        return []
+    return [f"-fprofile-instr-use={profile}", "-Wno-profile-instr-unprofiled", "-Wno-profile-instr-out-of-date"]
+
+
+def profdata_command(config) -> List[str]:
+    tool = config.data.get('pgo', {}).get('profdata')
+    if tool:
+        return [tool] if isinstance(tool, str) else list(tool)
+    return ["xcrun", "llvm-profdata"] if sys.platform == "darwin" else ["llvm-profdata"]
+
+
+class PgoDriverGenerator(CodeGenerator):
+    """Generates the host training driver running the workloads of a scenario file."""
+
+    def __init__(self, functions: List[NimFunction], config: GeneratorConfig, scenarios: List[dict],
+                 event_channels: Optional[List[str]] = None,
+                 handle_types: Optional[List[NimHandleType]] = None,
+                 constants: Optional[List[NimConstant]] = None,
+                 scratch: bool = False):
+        super().__init__(functions, config, event_channels, handle_types, constants, scratch)
+        self.scenarios = scenarios
+
+    def generate(self) -> str:
+        """Generate pgo_driver.cpp."""
+        code = CodeGenerator._generate_header("PGO training driver")
+        code += f"""#include <chrono>
+#include <cstdio>
+#include <cstring>
+#include <memory>
+
+#include "{self.config.library_name}.h"
+
+"""
+        if self.needs_scratch:
+            code += scratch_buffer_definitions(self.config)
+        if self.has_events:
+            code += "// Events have no listener on the host; producers still run their full path\n"
+            code += 'extern "C" void nimBridgeEmitEvent(const char* channel, const char* payload) {}\n\n'
+        if records_memory(self.config):
+            code += "// Allocation telemetry is not trained; Nim's hooks are no-ops here\n"
+            code += 'extern "C" void nimBridgeTrackAlloc(void* ptr, size_t size) {}\n'
+            code += 'extern "C" void nimBridgeTrackFree(void* ptr) {}\n\n'
+
+        code += "// Keeps results observable so calls are not optimized away\nstatic volatile long long gSink = 0;\n\n"
+        for index, scenario in enumerate(self.scenarios):
+            code += f"// {scenario['name']}\nstatic void scenario{index}() {{\n"
+            for call in scenario.get('calls', []):
+                code += self._generate_call(scenario['name'], call)
+            code += "}\n\n"
+
+        code += "struct Scenario {\n    const char* name;\n    void (*run)();\n};\n\n"
+        code += "static const Scenario kScenarios[] = {\n"
+        for index, scenario in enumerate(self.scenarios):
+            code += f"    {{{json.dumps(scenario['name'])}, scenario{index}}},\n"
+        code += "};\n\n"
+
+        code += """// Runs the scenarios named on the command line (all by default) and prints
+// "<name> <milliseconds>" per scenario
+int main(int argc, char** argv) {
+    NimMain();
+    mobileNimInit();
+    for (const Scenario &scenario : kScenarios) {
+        bool selected = argc < 2;
+        for (int i = 1; i < argc; i++) {
+            selected = selected || std::strcmp(argv[i], scenario.name) == 0;
+        }
+        if (!selected) continue;
+        auto start = std::chrono::steady_clock::now();
+        scenario.run();
+        std::chrono::duration<double, std::milli> elapsed = std::chrono::steady_clock::now() - start;
+        std::printf("%s %.3f\\n", scenario.name, elapsed.count());
+    }
+    mobileNimShutdown();
+    return 0;
+}
+"""
+        return code
+
+    def _generate_call(self, scenario: str, call: dict) -> str:
+        """Loop calling one export `repeat` times with literal arguments."""
+        name = call.get('function')
+        func = next((f for f in self.functions if name in (f.name, f.js_name)), None)
+        if func is None:
+            raise ValueError(f"Scenario '{scenario}': unknown function '{name}'")
+        args = call.get('args', [])
+        if len(args) != len(func.params):
+            raise ValueError(f"Scenario '{scenario}': {name} takes {len(func.params)} arguments, got {len(args)}")
+        literals = []
+        for (param, ptype), value in zip(func.params, args):
+            if ptype == 'callback' or ptype in self.handle_types:
+                raise ValueError(f"Scenario '{scenario}': {name}({param}) cannot be driven from a scenario file")
+            literals.append(self._c_literal(ptype, value))
+
+        call_expr = f"{func.name}({', '.join(literals)})"
+        code = f"    for (long i = 0; i < {int(call.get('repeat', DEFAULT_REPEAT))}; i++) {{\n"
+        if func.return_type in ['cstring', 'string']:
+            code += f"        NCSTRING result = {call_expr};\n"
+            code += "        if (result) gSink = gSink + result[0];\n"
+            if func.memory_type == 'allocated':
+                code += "        if (result) freeString(result);\n"
+        elif func.return_type == 'mapped':
+            code += "        size_t byteLength = 0;\n"
+            code += f"        void* result = {func.name}({', '.join(literals + ['&byteLength'])});\n"
+            code += "        if (result && byteLength) gSink = gSink + static_cast<const unsigned char*>(result)[0];\n"
+            if mapped_release(func):
+                code += f"        if (result) {mapped_release(func)}(result);\n"
+        elif func.return_type == 'void':
+            code += f"        {call_expr};\n"
+        else:
+            code += f"        gSink = gSink + static_cast<long long>({call_expr});\n"
+        code += "    }\n"
+        return code
+
+    @staticmethod
+    def _c_literal(ptype: str, value) -> str:
+        if ptype in ['cstring', 'string']:
+            return f"const_cast<NCSTRING>({json.dumps(str(value))})"
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        return repr(value)
+
+
+def load_scenarios(path: Path) -> List[dict]:
+    """Scenario file: {"scenarios": [{"name": ..., "calls": [{"function", "args", "repeat"}]}]}."""
+    data = json.loads(path.read_text())
+    scenarios = data.get('scenarios', []) if isinstance(data, dict) else data
+    names: Dict[str, int] = {}
+    for scenario in scenarios:
+        if not scenario.get('name'):
+            raise ValueError(f"{path}: every scenario needs a name")
+        names[scenario['name']] = names.get(scenario['name'], 0) + 1
+    duplicates = [name for name, count in names.items() if count > 1]
+    if duplicates:
+        raise ValueError(f"{path}: duplicate scenario names {duplicates}")
+    return scenarios
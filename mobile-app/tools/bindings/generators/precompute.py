@@ -0,0 +1,158 @@
+"""
+Generation-time lookup tables for `@precompute` exports.
+
+An export taking one integer and returning an integer or bool can be
+annotated `## @precompute(lo..hi)` (or `lo..<hi`). `tools/precompute.py`
+builds the Nim core for the host, evaluates the proc over the range and
+writes the results to the tables file together with a digest of the Nim
+sources. The bridges then call `nimPrecomputed<Name>`, which answers from a
+static table inside the range and falls back to the Nim call outside it.
+Tables computed from other sources than the current ones are ignored.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .base import CodeGenerator
+from .memory import scratch_buffer_definitions
+from ..models import NimFunction
+
+
+DEFAULT_TABLES_FILE = "tools/precomputed_tables.json"
+DEFAULT_PRECOMPUTE_DIR = "nim/precompute"
+DEFAULT_MAX_ENTRIES = 4096
+
+PRECOMPUTE_PARAM_TYPES = ('cint', 'int')
+PRECOMPUTE_RETURN_TYPES = ('cint', 'int', 'int64', 'bool')
+RANGE = re.compile(r'^\s*(-?\d+)\s*\.\.(<)?\s*(-?\d+)\s*$')
+
+
+def precompute_range(func: NimFunction) -> Optional[Tuple[int, int]]:
+    """Inclusive (lo, hi) of a `@precompute(lo..hi)` export, or None without the annotation."""
+    if 'precompute' not in func.annotations:
+        return None
+    match = RANGE.match(func.annotations['precompute'])
+    if not match:
+        raise ValueError(f"{func.name}: @precompute expects a range such as 0..92, "
+                         f"got '{func.annotations['precompute']}'")
+    lo, hi = int(match.group(1)), int(match.group(3)) - (1 if match.group(2) else 0)
+    if hi < lo:
+        raise ValueError(f"{func.name}: @precompute range {lo}..{hi} is empty")
+    return lo, hi
+
+
+def precompute_eligible(func: NimFunction) -> bool:
+    return len(func.params) == 1 and func.params[0][1] in PRECOMPUTE_PARAM_TYPES \
+        and func.return_type in PRECOMPUTE_RETURN_TYPES and not func.callbacks
+
+
+def max_entries(config) -> int:
+    return int(config.data.get('precompute', {}).get('max_entries', DEFAULT_MAX_ENTRIES))
+
+
+def tables_path(config, base_dir: Path) -> Path:
+    return base_dir / config.data.get('precompute', {}).get('tables', DEFAULT_TABLES_FILE)
+
+
+def precompute_dir(config, base_dir: Path) -> Path:
+    return base_dir / config.data.get('precompute', {}).get('output_dir', DEFAULT_PRECOMPUTE_DIR)
+
+
+def sources_digest(paths: Iterable[Path]) -> str:
+    """Digest of the Nim sources the tables were computed from."""
+    digest = hashlib.sha256()
+    for path in sorted(set(paths)):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_tables(path: Path) -> Dict:
+    """{"digest": ..., "tables": {nimName: {"lo": .., "hi": .., "values": [..]}}}, empty when absent."""
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text())
+
+
+def precomputed_functions(functions: List[NimFunction]) -> List[NimFunction]:
+    return [func for func in functions if func.precomputed is not None]
+
+
+def precomputed_name(func: NimFunction) -> str:
+    return f"nimPrecomputed{func.name[0].upper()}{func.name[1:]}"
+
+
+def callee(func: NimFunction) -> str:
+    """Function the bridges call for an export: its lookup-table front when it has one."""
+    return precomputed_name(func) if func.precomputed is not None else func.name
+
+
+class PrecomputedTablesHeaderGenerator(CodeGenerator):
+    """Generates NimBridgePrecomputed.h, shared by the bridge translation units."""
+
+    def generate(self) -> str:
+        code = CodeGenerator._generate_header("lookup tables of @precompute exports")
+        code += "#pragma once\n\n"
+        code += "// Results evaluated at generation time by tools/precompute.py; arguments\n"
+        code += "// outside a table's range fall through to the Nim call. Include after the\n"
+        code += "// declarations of the Nim functions.\n\n"
+        for func in precomputed_functions(self.functions):
+            code += self._generate_table(func)
+        return code
+
+    @staticmethod
+    def _generate_table(func: NimFunction) -> str:
+        lo, values = func.precomputed
+        result_type = f"decltype(::{func.name}(0))"
+        table = f"kPrecomputed{func.name[0].upper()}{func.name[1:]}"
+        suffix = "LL" if func.return_type == 'int64' else ""
+        rows = []
+        for start in range(0, len(values), 8):
+            rows.append("    " + ", ".join(f"{int(value)}{suffix}" for value in values[start:start + 8]) + ",")
+        return f"""// {func.js_name or func.name}: {lo}..{lo + len(values) - 1}
+static const {result_type} {table}[{len(values)}] = {{
+{chr(10).join(rows)}
+}};
+
+static inline {result_type} {precomputed_name(func)}(int n) {{
+    unsigned long long offset = static_cast<unsigned long long>(static_cast<long long>(n) - ({lo}LL));
+    if (offset < {len(values)}ULL) return {table}[offset];
+    return ::{func.name}(n);
+}}
+
+"""
+
+
+class PrecomputeDriverGenerator(CodeGenerator):
+    """Generates the host program printing the tables of the @precompute exports as JSON."""
+
+    def generate(self) -> str:
+        code = CodeGenerator._generate_header("@precompute evaluation driver")
+        code += f"""#include <cstdio>
+#include <memory>
+
+#include "{self.config.library_name}.h"
+
+"""
+        # Symbols the Nim core may import from the bridge; nothing listens on the host
+        code += scratch_buffer_definitions(self.config)
+        code += 'extern "C" void nimBridgeEmitEvent(const char* channel, const char* payload) {}\n'
+        code += 'extern "C" void nimBridgeTrackAlloc(void* ptr, size_t size) {}\n'
+        code += 'extern "C" void nimBridgeTrackFree(void* ptr) {}\n\n'
+
+        code += "// Prints {\"<nimName>\": {\"lo\": .., \"hi\": .., \"values\": [..]}, ...}\n"
+        code += "int main() {\n    NimMain();\n    mobileNimInit();\n    std::printf(\"{\");\n"
+        targets = [func for func in self.functions if precompute_range(func) and precompute_eligible(func)]
+        for index, func in enumerate(targets):
+            lo, hi = precompute_range(func)
+            separator = ", " if index else ""
+            code += f'    std::printf("{separator}\\"{func.name}\\": {{\\"lo\\": {lo}, \\"hi\\": {hi}, \\"values\\": [");\n'
+            code += f"    for (long long n = {lo}; n <= {hi}; n++) {{\n"
+            code += f'        std::printf(n == {lo} ? "%lld" : ", %lld", static_cast<long long>({func.name}(static_cast<int>(n))));\n'
+            code += "    }\n"
+            code += '    std::printf("]}");\n'
+        code += '    std::printf("}\\n");\n    mobileNimShutdown();\n    return 0;\n}\n'
+        return code
@@ -0,0 +1,63 @@
+"""
+Sharding of the generated bridge sources into several translation units.
+
+With `sharding.shards` set to N > 1, exports are spread over N translation
+units per bridge by a stable hash of their Nim name: shard 0 is the bridge's
+own file, shards 1..N-1 are written next to it. Native builds compile the
+shards in parallel and an edited export only rebuilds its own shard.
+"""
+
+import zlib
+from pathlib import Path
+from typing import List
+
+from .base import CodeGenerator
+from ..models import NimFunction
+
+
+def shard_count(config) -> int:
+    return max(1, int(config.data.get('sharding', {}).get('shards', 1)))
+
+
+def shard_file_name(config, index: int, extension: str) -> str:
+    return f"{config.module_name}Shard{index}.{extension}"
+
+
+def shard_file_names(config, extension: str) -> List[str]:
+    """Extra translation units of a bridge, in build order."""
+    return [shard_file_name(config, index, extension) for index in range(1, shard_count(config))]
+
+
+def shard_index(generator: CodeGenerator, func: NimFunction, dispatch=None) -> int:
+    """Translation unit of an export.
+
+    Exports relying on state private to the bridge's main file (callback
+    slots, handle host objects, mapped blob classes, dispatch trampolines)
+    always stay in shard 0.
+    """
+    count = shard_count(generator.config)
+    types = [func.return_type] + [ptype for _, ptype in func.params]
+    if count == 1 or func.callbacks or func.return_type == 'mapped' \
+            or any(t in generator.handle_types for t in types) \
+            or (dispatch and dispatch.slot(func)):
+        return 0
+    # crc32 rather than hash(): shard membership must not change between runs
+    return zlib.crc32(func.name.encode()) % count
+
+
+def stale_shard_files(directory: Path, config, extension: str) -> List[Path]:
+    """Shard files left over from a run with more shards."""
+    current = set(shard_file_names(config, extension))
+    return [path for path in sorted(directory.glob(f"{config.module_name}Shard*.{extension}"))
+            if path.name not in current]
+
+
+class BridgeShardGenerator:
+    """Generates one extra translation unit of a bridge generator."""
+
+    def __init__(self, bridge: CodeGenerator, index: int):
+        self.bridge = bridge
+        self.index = index
+
+    def generate(self) -> str:
+        return self.bridge.generate_shard(self.index)
@@ -2,15 +2,25 @@
 TypeScript interface generator for Nim bridge.
 """
 
+import json
+import math
+
 from .base import CodeGenerator
+from .emitter import Emitter
+from .budget import records_sync_budget
+from .events import CALL_ID_PARAM
+from .mapped import mapped_functions
+from .memory import records_memory
+from .vectorize import VECTOR_PARAM_TYPES, VECTOR_RETURN_TYPES, vector_functions, vector_name
+from ..models import NimFunction
 
 
 class TypeScriptInterfaceGenerator(CodeGenerator):
     """Generates TypeScript TurboModule spec definitions."""
 
-    def generate(self) -> str:
+    def emit(self, code: Emitter) -> None:
         """Generate TypeScript TurboModule spec."""
-        code = "import type { TurboModule } from 'react-native';\n"
+        code += "import type { TurboModule } from 'react-native';\n"
         code += "import { TurboModuleRegistry } from 'react-native';\n\n"
         code += "export interface Spec extends TurboModule {\n"
 
@@ -19,6 +29,7 @@ class TypeScriptInterfaceGenerator(CodeGenerator):
         math_funcs = []
         data_funcs = []
         version_funcs = []
+        other_funcs = []
 
         for func in self.functions:
             js_name = func.js_name or func.name
@@ -30,30 +41,454 @@ class TypeScriptInterfaceGenerator(CodeGenerator):
                 data_funcs.append(func)
             elif js_name in ['getVersion']:
                 version_funcs.append(func)
+            else:
+                other_funcs.append(func)
 
-        def generate_functions(funcs, comment=None):
-            result = ""
+        def emit_functions(funcs, comment=None):
             if comment:
-                result += f"  // {comment}\n"
+                code.write(f"  // {comment}\n")
             for func in funcs:
                 js_name = func.js_name or func.name
                 ret_type = self.type_mapper.nim_to_ts_type(func.return_type)
-                params_str = ', '.join([f"{name}: {self.type_mapper.nim_to_ts_type(ptype)}"
-                                       for name, ptype in func.params])
-                result += f"  readonly {js_name}: ({params_str}) => {ret_type};\n"
-            return result
+                params_str = ', '.join([f"{name}: {self._ts_param_type(func, name, ptype)}"
+                                       for name, ptype in func.params]
+                                      + ([f"{CALL_ID_PARAM}: number"] if func.callbacks else []))
+                code.write(f"  readonly {js_name}: ({params_str}) => {ret_type};\n")
+                if func.async_variant:
+                    code.write(f"  readonly {js_name}Async: ({params_str}) => Promise<{ret_type}>;\n")
+                if func.vector_variant:
+                    # Typed arrays are not a codegen type; NimCore exposes the typed signature
+                    vector_params = ', '.join(f"{name}: ReadonlyArray<number>" for name, _ in func.params)
+                    code.write(f"  readonly {vector_name(func)}: ({vector_params}) => Array<number>;\n")
 
-        code += generate_functions(core_funcs, "Core API")
+        emit_functions(core_funcs, "Core API")
         if math_funcs:
             code += "\n"
-            code += generate_functions(math_funcs, "Math operations")
+            emit_functions(math_funcs, "Math operations")
         if data_funcs:
             code += "\n"
-            code += generate_functions(data_funcs, "Data operations")
+            emit_functions(data_funcs, "Data operations")
         if version_funcs:
             code += "\n"
-            code += generate_functions(version_funcs, "Version info")
+            emit_functions(version_funcs, "Version info")
+        if other_funcs:
+            code += "\n"
+            emit_functions(other_funcs, "Other exports")
+        if mapped_functions(self.functions):
+            code += "\n  // Mapped blobs: byte ranges copied out where no ArrayBuffer is exposed (Android)\n"
+            code += "  readonly readMappedBlob: (blob: Object, offset: number, length: number) => Array<number>;\n"
+            code += "  readonly releaseMappedBlob: (blob: Object) => void;\n"
+        if self.has_events:
+            code += "\n  // Event channel: flat [channel, payload, ...] batches\n"
+            code += "  readonly drainEvents: (max: number) => Array<string>;\n"
+            code += "  readonly setEventsPendingListener: (listener: () => void) => void;\n"
+        if records_sync_budget(self.config):
+            code += "\n  // Sync calls over the frame budget (JSON, also written to the app cache directory)\n"
+            code += "  readonly getSyncBudgetReport: () => string;\n"
+        if records_memory(self.config):
+            code += "\n  // Native allocation telemetry (JSON): live/peak bytes per export and Nim heap totals\n"
+            code += "  readonly getNativeMemoryStats: () => string;\n"
 
         code += "}\n\n"
         code += f"export default TurboModuleRegistry.getEnforcing<Spec>('{self.config.module_name}');"
-        return code
\ No newline at end of file
+
+    def _ts_param_type(self, func: NimFunction, name: str, ptype: str) -> str:
+        """TypeScript type of a parameter, expanding callback signatures."""
+        if ptype == 'callback':
+            args = ', '.join(f"{arg}: {self.type_mapper.nim_to_ts_type(arg_type)}"
+                             for arg, arg_type in func.callbacks[name])
+            return f"({args}) => void"
+        return self.type_mapper.nim_to_ts_type(ptype)
+
+
+class TypeScriptModuleGenerator(TypeScriptInterfaceGenerator):
+    """Generates the JS-facing module wrapping the TurboModule spec."""
+
+    def emit(self, code: Emitter) -> None:
+        """Generate the TypeScript module re-exported by src/index.ts."""
+        module = self.config.module_name
+        code += CodeGenerator._generate_header(f"TypeScript module for {module}")
+
+        vector_funcs = vector_functions(self.functions)
+        mapped_funcs = mapped_functions(self.functions)
+        if not self.has_events and not self.handle_types and not self.constants and not vector_funcs \
+                and not mapped_funcs:
+            code += f"import Native{module} from './Native{module}';\n"
+            code += f"import type {{ Spec }} from './Native{module}';\n\n"
+            code += f"export const NimCore: Spec = Native{module};\n"
+            return
+
+        if self.has_events:
+            code += "import { DeviceEventEmitter, Platform } from 'react-native';\n"
+        elif self.handle_types or vector_funcs:
+            code += "import { Platform } from 'react-native';\n"
+        code += f"""import Native{module} from './Native{module}';
+import type {{ Spec }} from './Native{module}';
+
+"""
+        if self.constants:
+            code += self._generate_constants()
+        if self.has_events:
+            code += self._generate_events()
+        for handle in self.handle_types.values():
+            code += self._generate_handle(handle)
+        if mapped_funcs:
+            code += self._generate_mapped_blob()
+        if vector_funcs:
+            code += """// iOS companions read typed arrays in place and return an ArrayBuffer;
+// on Android they cross the TurboModule boundary as plain number arrays
+function numberArray(values: ArrayLike<number>): ReadonlyArray<number> {
+  return Array.isArray(values) ? values : Array.from(values);
+}
+
+"""
+
+        wrapped = [func for func in self.functions
+                   if func.callbacks or self._uses_handles(func) or func.return_type == 'mapped']
+        folded = [const for const in self.constants if const.folded_proc]
+        if not wrapped and not folded and not vector_funcs:
+            code += f"export const NimCore: Spec = Native{module};\n"
+            return
+
+        core_type = "Spec"
+        # Wrapped exports are redeclared: typed handles, callbacks without the call id
+        if wrapped or folded or vector_funcs:
+            core_type = "NimCoreModule"
+            base = "Spec"
+            omitted = [func.js_name or func.name for func in wrapped] + [vector_name(func) for func in vector_funcs]
+            if omitted:
+                omitted_str = " | ".join(f"'{name}'" for name in omitted)
+                base = f"Omit<Spec, {omitted_str}>"
+            code += "// Spec with typed handles and vectorized companions, plus the folded constants\n"
+            code += f"export type NimCoreModule = {base} & {{\n"
+            for func in wrapped:
+                code += f"  readonly {func.js_name or func.name}: ({self._facade_params(func)}) => {self._facade_type(func.return_type)};\n"
+            for func in vector_funcs:
+                code += f"  readonly {vector_name(func)}: ({self._vector_params(func)}) => {VECTOR_RETURN_TYPES[func.return_type][0]};\n"
+            for const in folded:
+                code += f"  readonly {const.name}: () => {self._constant_type(const.value)};\n"
+            code += "};\n\n"
+
+        code += f"const wrappers: Partial<{core_type}> = {{\n"
+        for const in folded:
+            code += f"  {const.name}(): {self._constant_type(const.value)} {{\n"
+            code += f"    return NimConstants.{const.name};\n"
+            code += "  },\n"
+        for func in wrapped:
+            js_name = func.js_name or func.name
+            args = []
+            for name, ptype in func.params:
+                args.append(f"nativeRef({name})" if ptype in self.handle_types else name)
+            ret_type = self._facade_type(func.return_type)
+            code += f"  {js_name}({self._facade_params(func)}): {ret_type} {{\n"
+            if func.callbacks:
+                args.append(CALL_ID_PARAM)
+                callbacks = ", ".join(f"'{func.callback_channel(name)}': {name}" for name in func.callbacks)
+                code += f"    const {CALL_ID_PARAM} = beginCallbacks({{ {callbacks} }});\n"
+            call = f"Native{module}.{js_name}({', '.join(args)})"
+            if func.return_type in self.handle_types:
+                call = f"wrap{func.return_type}({call})"
+            elif func.return_type == 'mapped':
+                call = f"wrapMapped({call})"
+            if func.callbacks:
+                code += "    try {\n"
+                code += f"      return {call};\n"
+                code += "    } finally {\n"
+                code += f"      endCallbacks({CALL_ID_PARAM});\n"
+                code += "    }\n"
+            else:
+                code += f"    return {call};\n"
+            code += "  },\n"
+        for func in vector_funcs:
+            name = vector_name(func)
+            out_type = VECTOR_RETURN_TYPES[func.return_type][0]
+            typed_args = ", ".join(f"{param} as ReadonlyArray<number>" for param, _ in func.params)
+            args = ", ".join(f"numberArray({param})" for param, _ in func.params)
+            code += f"  {name}({self._vector_params(func)}): {out_type} {{\n"
+            code += "    if (Platform.OS === 'ios') {\n"
+            code += f"      return new {out_type}(Native{module}.{name}({typed_args}) as unknown as ArrayBuffer);\n"
+            code += "    }\n"
+            code += f"    return {out_type}.from(Native{module}.{name}({args}));\n"
+            code += "  },\n"
+        code += "};\n\n"
+
+        code += f"""export const NimCore = new Proxy(Native{module}, {{
+  get(target, property) {{
+    if (typeof property === 'string' && property in wrappers) {{
+      return wrappers[property as keyof {core_type}];
+    }}
+    return Reflect.get(target, property);
+  }},
+}}) as unknown as {core_type};
+"""
+
+    def _generate_callback_routing(self) -> str:
+        """Per-call callback registry; Android deliveries name the call they belong to."""
+        channels = [func.callback_channel(name) for func in self.functions for name in func.callbacks]
+        if not channels:
+            return ""
+        channel_list = ", ".join(f"'{channel}'" for channel in channels)
+        return f"""// Android delivers callback invocations through the event ring on
+// "<jsName>.<param>", each payload led by the id of the call it belongs to
+const callbackChannels = new Set<string>([{channel_list}]);
+const callbackCalls = new Map<number, Record<string, (...args: any[]) => void>>();
+let lastCallId = 0;
+
+function beginCallbacks(callbacks: Record<string, (...args: any[]) => void>): number {{
+  lastCallId = (lastCallId % 0x7fffffff) + 1;
+  if (Platform.OS === 'android') {{
+    attachWakeups();
+    callbackCalls.set(lastCallId, callbacks);
+  }}
+  return lastCallId;
+}}
+
+// Deliveries queued during the call are dispatched before its callbacks are dropped
+function endCallbacks(callId: number): void {{
+  if (callbackCalls.has(callId)) {{
+    flushEvents();
+    callbackCalls.delete(callId);
+  }}
+}}
+"""
+
+    @staticmethod
+    def _vector_params(func: NimFunction) -> str:
+        return ', '.join(f"{name}: {VECTOR_PARAM_TYPES[ptype][0]} | ReadonlyArray<number>" for name, ptype in func.params)
+
+    def _generate_constants(self) -> str:
+        """Generate the values evaluated at generation time."""
+        code = "// Evaluated at generation time from literal-returning procs and exported Nim consts\n"
+        code += "export const NimConstants = {\n"
+        for const in self.constants:
+            code += f"  {const.name}: {self._constant_literal(const.value)},\n"
+        code += "} as const;\n\n"
+        return code
+
+    @staticmethod
+    def _constant_literal(value) -> str:
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, float):
+            if math.isnan(value):
+                return "NaN"
+            if math.isinf(value):
+                return "Infinity" if value > 0 else "-Infinity"
+            return repr(value)
+        if isinstance(value, int):
+            return str(value)
+        return json.dumps(value)
+
+    @staticmethod
+    def _constant_type(value) -> str:
+        if isinstance(value, bool):
+            return "boolean"
+        if isinstance(value, str):
+            return "string"
+        return "number"
+
+    def _uses_handles(self, func: NimFunction) -> bool:
+        return func.return_type in self.handle_types or any(
+            ptype in self.handle_types for _, ptype in func.params)
+
+    def _facade_type(self, nim_type: str) -> str:
+        """TypeScript type in the facade, where handles use their typed wrappers."""
+        if nim_type in self.handle_types:
+            return nim_type
+        if nim_type == 'mapped':
+            return 'MappedBlob'
+        return self.type_mapper.nim_to_ts_type(nim_type)
+
+    def _facade_params(self, func: NimFunction, skip: int = 0) -> str:
+        return ', '.join(f"{name}: {ptype if ptype in self.handle_types else self._ts_param_type(func, name, ptype)}"
+                         for name, ptype in func.params[skip:])
+
+    def _generate_handle(self, handle) -> str:
+        """Generate the typed interface and Android wrapper of a handle type."""
+        methods = self.handle_methods(handle)
+        release_js = next((func.js_name or func.name) for func in self.functions if func.name == handle.release)
+
+        module = self.config.module_name
+        code = ""
+        if handle is next(iter(self.handle_types.values())):
+            code += """// Android hands out plain { __nimHandle } maps, wrapped so they expose methods;
+// iOS returns jsi::HostObjects that already do
+interface NimHandleFinalizer {
+  register(target: object, release: () => void, token: object): void;
+  unregister(token: object): void;
+}
+
+// Releases Android handles that JS dropped without release(). Runtimes without
+// FinalizationRegistry keep them alive until the module is invalidated
+const FinalizationRegistryImpl = (globalThis as any).FinalizationRegistry;
+const handleFinalizer: NimHandleFinalizer | undefined = FinalizationRegistryImpl
+  ? new FinalizationRegistryImpl((release: () => void) => release())
+  : undefined;
+
+class NimHandleRef {
+  constructor(readonly ref: Object, release: (ref: Object) => void) {
+    // The callback must not capture the wrapper, or it would never be collected
+    handleFinalizer?.register(this, () => release(ref), this);
+  }
+
+  protected forget(): void {
+    handleFinalizer?.unregister(this);
+  }
+}
+
+function nativeRef(value: unknown): any {
+  return value instanceof NimHandleRef ? value.ref : value;
+}
+
+"""
+        code += f"export interface {handle.name} {{\n"
+        signatures = []
+        for func in methods:
+            signatures.append((handle.method_name(func), self._facade_params(func, skip=1),
+                               self._facade_type(func.return_type), func))
+        for method, params, ret_type, _ in signatures:
+            code += f"  {method}({params}): {ret_type};\n"
+        code += "  release(): void;\n}\n\n"
+
+        code += f"class Android{handle.name} extends NimHandleRef implements {handle.name} {{\n"
+        code += "  constructor(ref: Object) {\n"
+        code += f"    super(ref, (native) => Native{module}.{release_js}(native));\n"
+        code += "  }\n"
+        for method, params, ret_type, func in signatures:
+            args = ', '.join(['this'] + [name for name, _ in func.params[1:]])
+            code += f"  {method}({params}): {ret_type} {{\n"
+            code += f"    return NimCore.{func.js_name or func.name}({args});\n"
+            code += "  }\n"
+        code += "  release(): void {\n"
+        code += "    this.forget();\n"
+        code += f"    NimCore.{release_js}(this);\n"
+        code += "  }\n}\n\n"
+
+        code += f"function wrap{handle.name}(ref: Object): {handle.name} {{\n"
+        code += f"  return Platform.OS === 'android' ? new Android{handle.name}(ref) : (ref as unknown as {handle.name});\n"
+        code += "}\n\n"
+        return code
+
+    def _generate_mapped_blob(self) -> str:
+        """Generate the MappedBlob interface and its wrapper over the native blob."""
+        module = self.config.module_name
+        return f"""// @mapped exports: read-only native memory, never copied into the JS heap.
+// iOS exposes it as an external ArrayBuffer; Android keeps a direct ByteBuffer
+// natively and copies out the ranges JS reads.
+export interface MappedBlob {{
+  readonly byteLength: number;
+  // Zero-copy bytes (iOS), null on Android and once released; must not be written to
+  readonly buffer: ArrayBuffer | null;
+  read(offset: number, length: number): Uint8Array;
+  release(): void;
+}}
+
+class NativeMappedBlob implements MappedBlob {{
+  readonly byteLength: number;
+  private view: ArrayBuffer | null | undefined;
+
+  constructor(private readonly ref: any) {{
+    this.byteLength = ref.byteLength;
+  }}
+
+  get buffer(): ArrayBuffer | null {{
+    if (this.view === undefined) {{
+      this.view = this.ref.buffer ?? null;
+    }}
+    return this.view ?? null;
+  }}
+
+  read(offset: number, length: number): Uint8Array {{
+    const buffer = this.buffer;
+    if (buffer) {{
+      const start = Math.min(Math.max(0, offset), buffer.byteLength);
+      return new Uint8Array(buffer, start, Math.min(Math.max(0, length), buffer.byteLength - start));
+    }}
+    return Uint8Array.from(Native{module}.readMappedBlob(this.ref, offset, length));
+  }}
+
+  release(): void {{
+    this.view = null;
+    Native{module}.releaseMappedBlob(this.ref);
+  }}
+}}
+
+function wrapMapped(ref: Object): MappedBlob {{
+  return new NativeMappedBlob(ref);
+}}
+
+"""
+
+    def _generate_events(self) -> str:
+        """Generate event listener registration and batched draining."""
+        module = self.config.module_name
+        channels = " | ".join(f"'{channel}'" for channel in self.event_channels) or "never"
+        dispatch = ""
+        if any(func.callbacks for func in self.functions):
+            dispatch = """  if (callbackChannels.has(channel)) {
+    const [callId, ...args] = JSON.parse(payload);
+    callbackCalls.get(callId)?.[channel]?.(...args);
+    return;
+  }
+"""
+        return f"""export type {module}EventChannel = {channels};
+export type {module}EventListener = (payload: string) => void;
+
+const DEFAULT_BATCH_SIZE = 256;
+
+const listeners = new Map<string, Set<{module}EventListener>>();
+{self._generate_callback_routing()}
+function dispatch(channel: string, payload: string): void {{
+{dispatch}  listeners.get(channel)?.forEach(listener => listener(payload));
+}}
+
+/**
+ * Drain queued native events in batches and dispatch them.
+ * Returns the number of events delivered.
+ */
+export function flushEvents(batchSize: number = DEFAULT_BATCH_SIZE): number {{
+  let delivered = 0;
+  for (;;) {{
+    const batch = Native{module}.drainEvents(batchSize);
+    for (let i = 0; i < batch.length; i += 2) {{
+      dispatch(batch[i], batch[i + 1]);
+    }}
+    delivered += batch.length / 2;
+    if (batch.length < batchSize * 2) {{
+      return delivered;
+    }}
+  }}
+}}
+
+let wakeupsAttached = false;
+
+function attachWakeups(): void {{
+  if (wakeupsAttached) {{
+    return;
+  }}
+  wakeupsAttached = true;
+  if (Platform.OS === 'android') {{
+    DeviceEventEmitter.addListener('{module}EventsPending', () => flushEvents());
+  }}
+  Native{module}.setEventsPendingListener(() => flushEvents());
+}}
+
+export function addEventListener(
+  channel: {module}EventChannel,
+  listener: {module}EventListener,
+): {{ remove: () => void }} {{
+  attachWakeups();
+  let channelListeners = listeners.get(channel);
+  if (!channelListeners) {{
+    channelListeners = new Set();
+    listeners.set(channel, channelListeners);
+  }}
+  channelListeners.add(listener);
+  return {{
+    remove: () => {{
+      channelListeners?.delete(listener);
+    }},
+  }};
+}}
+
+"""
@@ -0,0 +1,240 @@
+"""
+Vectorized companions of scalar exports.
+
+An export annotated `## @vectorize` whose parameters and result are integers
+or bools also gets a `<jsName>Many` companion: every parameter becomes an
+array of the same length, the native side loops over it writing into a
+preallocated output, and N calls cross the bridge once. Inputs of at least
+`vectorize.parallel_threshold` elements are split across worker threads
+unless the annotation reads `@vectorize(serial)`. On iOS the companion reads
+typed arrays in place and returns an ArrayBuffer over the native result;
+Android exchanges plain number arrays.
+"""
+
+from typing import List
+
+from .precompute import callee
+from ..models import NimFunction
+
+
+DEFAULT_PARALLEL_THRESHOLD = 4096
+
+# Nim type -> (TypeScript typed array, C element type). The bridges pass
+# integers through `int`, so wider parameters are not vectorizable.
+VECTOR_PARAM_TYPES = {
+    'cint': ('Int32Array', 'int32_t'),
+    'int': ('Int32Array', 'int32_t'),
+    'bool': ('Uint8Array', 'uint8_t'),
+}
+VECTOR_RETURN_TYPES = dict(VECTOR_PARAM_TYPES, int64=('Float64Array', 'double'))
+
+
+def vector_name(func: NimFunction) -> str:
+    return f"{func.js_name or func.name}Many"
+
+
+def vector_kernel_name(func: NimFunction) -> str:
+    return f"nimMany{func.name[0].upper() + func.name[1:]}"
+
+
+def vector_eligible(func: NimFunction) -> bool:
+    return bool(func.params) and func.return_type in VECTOR_RETURN_TYPES \
+        and all(ptype in VECTOR_PARAM_TYPES for _, ptype in func.params)
+
+
+def vector_functions(functions: List[NimFunction]) -> List[NimFunction]:
+    return [func for func in functions if func.vector_variant]
+
+
+def parallel_threshold(config, func: NimFunction) -> int:
+    """Element count from which the loop is split across threads; 0 keeps it serial."""
+    if func.annotations.get('vectorize') == 'serial':
+        return 0
+    return max(0, int(config.data.get('vectorize', {}).get('parallel_threshold', DEFAULT_PARALLEL_THRESHOLD)))
+
+
+def parallel_for_definition(platform: str) -> str:
+    """`nimBridgeParallelFor`: GCD's pool on iOS, a persistent worker pool on Android."""
+    if platform == 'ios':
+        body = """    size_t workers = std::max<NSUInteger>(1, NSProcessInfo.processInfo.activeProcessorCount);
+    if (threshold == 0 || count < threshold || workers < 2) {
+        body(0, count);
+        return;
+    }
+    size_t chunk = (count + workers - 1) / workers;
+    const std::function<void(size_t, size_t)> *fn = &body;
+    dispatch_apply(workers, DISPATCH_APPLY_AUTO, ^(size_t worker) {
+        size_t begin = worker * chunk;
+        if (begin < count) (*fn)(begin, std::min(count, begin + chunk));
+    });
+"""
+    else:
+        body = """    size_t workers = std::max(1u, std::thread::hardware_concurrency());
+    if (threshold == 0 || count < threshold || workers < 2) {
+        body(0, count);
+        return;
+    }
+    NimBridgeWorkerPool::shared().run(count, (count + workers - 1) / workers, body);
+"""
+    pool = worker_pool_definition() if platform != 'ios' else ""
+    return f"""{pool}
+// Vectorized companions: runs body(begin, end) over [0, count), split into
+// one chunk per core once count reaches threshold (0 = always serial)
+static void nimBridgeParallelFor(size_t count, size_t threshold, const std::function<void(size_t, size_t)> &body) {{
+{body}}}
+"""
+
+
+def worker_pool_definition() -> str:
+    """`NimBridgeWorkerPool`: one worker per extra core, started on first use and shared by every companion."""
+    return """
+// Parallel companions share these workers instead of spawning threads per call.
+// They start on the first parallel batch and live for the process; batches run
+// one at a time, the calling thread taking chunks alongside the workers.
+class NimBridgeWorkerPool {
+public:
+    static NimBridgeWorkerPool &shared() {
+        static NimBridgeWorkerPool *pool = new NimBridgeWorkerPool(std::max(1u, std::thread::hardware_concurrency()) - 1);
+        return *pool;
+    }
+
+    void run(size_t count, size_t chunk, const std::function<void(size_t, size_t)> &body) {
+        std::lock_guard<std::mutex> batch(batchMutex_);
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            body_ = &body;
+            count_ = count;
+            chunk_ = chunk;
+            next_.store(0);
+            pending_ = workers_;
+            generation_++;
+        }
+        wake_.notify_all();
+        work();
+        std::unique_lock<std::mutex> lock(mutex_);
+        done_.wait(lock, [this] { return pending_ == 0; });
+        body_ = nullptr;
+    }
+
+private:
+    explicit NimBridgeWorkerPool(size_t workers) : workers_(workers) {
+        for (size_t i = 0; i < workers_; i++) {
+            std::thread([this] { loop(); }).detach();
+        }
+    }
+
+    void loop() {
+        size_t seen = 0;
+        for (;;) {
+            {
+                std::unique_lock<std::mutex> lock(mutex_);
+                wake_.wait(lock, [&] { return generation_ != seen; });
+                seen = generation_;
+            }
+            work();
+            std::lock_guard<std::mutex> lock(mutex_);
+            if (--pending_ == 0) done_.notify_one();
+        }
+    }
+
+    // Claims chunks until the batch is exhausted
+    void work() {
+        for (size_t begin = next_.fetch_add(chunk_); begin < count_; begin = next_.fetch_add(chunk_)) {
+            (*body_)(begin, std::min(count_, begin + chunk_));
+        }
+    }
+
+    const size_t workers_;
+    std::mutex batchMutex_;
+    std::mutex mutex_;
+    std::condition_variable wake_;
+    std::condition_variable done_;
+    const std::function<void(size_t, size_t)> *body_ = nullptr;
+    size_t count_ = 0;
+    size_t chunk_ = 1;
+    std::atomic<size_t> next_{0};
+    size_t pending_ = 0;
+    size_t generation_ = 0;
+};
+"""
+
+
+def jsi_vector_definitions() -> str:
+    """`NimVectorColumn` (the typed-array inputs) and `NimVectorBuffer` (the ArrayBuffer result) of iOS companions."""
+    return """
+#include <memory>
+#include <string>
+#include <vector>
+
+// One input of a companion: a typed array of the element type is read in place,
+// a plain array of numbers is copied. The pointer is only used during the call.
+template <typename T>
+struct NimVectorColumn {
+    const T* typed = nullptr;
+    std::vector<T> copy;
+    size_t count = 0;
+
+    const T* data() const { return typed ? typed : copy.data(); }
+
+    static NimVectorColumn read(facebook::jsi::Runtime &rt, const facebook::jsi::Value &value,
+                                const char* typedArray, const char* method) {
+        NimVectorColumn column;
+        if (value.isObject()) {
+            auto object = value.getObject(rt);
+            if (object.isArray(rt)) {
+                auto array = object.getArray(rt);
+                column.count = array.size(rt);
+                column.copy.resize(column.count);
+                for (size_t i = 0; i < column.count; i++) {
+                    column.copy[i] = static_cast<T>(array.getValueAtIndex(rt, i).asNumber());
+                }
+                return column;
+            }
+            if (object.instanceOf(rt, rt.global().getPropertyAsFunction(rt, typedArray))) {
+                auto buffer = object.getPropertyAsObject(rt, "buffer").getArrayBuffer(rt);
+                size_t offset = static_cast<size_t>(object.getProperty(rt, "byteOffset").asNumber());
+                column.count = static_cast<size_t>(object.getProperty(rt, "length").asNumber());
+                column.typed = reinterpret_cast<const T*>(buffer.data(rt) + offset);
+                return column;
+            }
+        }
+        throw facebook::jsi::JSError(rt, std::string(method) + ": expected " + typedArray + " or an array of numbers");
+    }
+};
+
+// The result of a companion, handed to JS as an ArrayBuffer without copying
+template <typename T>
+class NimVectorBuffer : public facebook::jsi::MutableBuffer {
+public:
+    explicit NimVectorBuffer(size_t count) : values_(count) {}
+
+    size_t size() const override { return values_.size() * sizeof(T); }
+    uint8_t* data() override {
+        static uint8_t empty = 0;
+        return values_.empty() ? &empty : reinterpret_cast<uint8_t*>(values_.data());
+    }
+    T* values() { return values_.data(); }
+
+private:
+    std::vector<T> values_;
+};
+"""
+
+
+def vector_kernel(config, func: NimFunction) -> str:
+    """Native loop of a companion, reading the input columns and filling `out`."""
+    params = [f"const {VECTOR_PARAM_TYPES[ptype][1]}* {name}" for name, ptype in func.params]
+    out_type = VECTOR_RETURN_TYPES[func.return_type][1]
+    args = ", ".join(f"{name}[i]" for name, _ in func.params)
+    call = f"::{callee(func)}({args})"
+    if func.return_type == 'bool':
+        call = f"{call} != 0"
+    return f"""static void {vector_kernel_name(func)}({', '.join(params)}, {out_type}* out, size_t count) {{
+    nimBridgeParallelFor(count, {parallel_threshold(config, func)}, [&](size_t begin, size_t end) {{
+        for (size_t i = begin; i < end; i++) {{
+            out[i] = static_cast<{out_type}>({call});
+        }}
+    }});
+}}
+
+"""
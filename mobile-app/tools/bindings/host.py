@@ -0,0 +1,120 @@
+"""
+Host builds of the Nim core for build-time tooling.
+
+Nim emits C for the machine running the generator, every C file is compiled
+as its own task and the objects are linked with a generated C++ driver into
+one executable per variant. Used by PGO training and by the precompute
+pipeline evaluating `@precompute` exports.
+"""
+
+import platform
+import shutil
+import sys
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from .build import BuildError, BuildTask, run_command
+from .orchestrator import BindingGenerator
+
+
+HOST_OS = {"darwin": "macosx", "linux": "linux"}
+HOST_CPU = {"x86_64": "amd64", "amd64": "amd64", "arm64": "arm64", "aarch64": "arm64"}
+
+
+def host_target() -> dict:
+    """Nim --os/--cpu of the machine running the build-time programs."""
+    os_name = HOST_OS.get(sys.platform)
+    cpu = HOST_CPU.get(platform.machine().lower())
+    if not os_name or not cpu:
+        raise ValueError(f"Host builds are not supported on {sys.platform}/{platform.machine()}")
+    return {"os": os_name, "cpu": cpu}
+
+
+class HostBuild:
+    """Nim core compiled for the host and linked with a driver under `out_dir`.
+
+    `name` prefixes the build tasks, e.g. `pgo-objects:<variant>`.
+    """
+
+    def __init__(self, name: str, generator: BindingGenerator, out_dir: Path, driver: str,
+                 nim_flags: List[str], c_flags: List[str], cc: str, cxx: str,
+                 nim_lib_path: Optional[Path] = None):
+        self.name = name
+        self.generator = generator
+        self.nim_dir = generator.nim_dir
+        self.out_dir = out_dir
+        self.driver = driver
+        self.nim_flags = nim_flags
+        self.c_flags = c_flags
+        self.cc = cc
+        self.cxx = cxx
+        self.nim_lib_path = nim_lib_path
+        self.nim_source = generator.config.data.get('build', {}).get('nim_source', 'nimbridge.nim')
+        self.target = host_target()
+
+    @property
+    def cache_dir(self) -> Path:
+        return self.out_dir / "cache"
+
+    @property
+    def driver_dir(self) -> Path:
+        return self.out_dir / "driver"
+
+    def binary(self, variant: str) -> Path:
+        return self.out_dir / "bin" / variant
+
+    def nim_command(self) -> List[str]:
+        return [
+            "nim", "c", "-c", f"--os:{self.target['os']}", f"--cpu:{self.target['cpu']}",
+            *self.nim_flags, "--app:staticlib", "--noMain:on",
+            f"--nimcache:{self.cache_dir}", self.nim_source,
+        ]
+
+    def compile_nim(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        run_command(self.nim_command(), self.nim_dir)
+
+    def objects_task(self, variant: str) -> str:
+        return f"{self.name}-objects:{variant}"
+
+    def link_task(self, variant: str) -> str:
+        return f"{self.name}-link:{variant}"
+
+    def objects_action(self, variant: str, flags: List[str]) -> Callable[[], List[BuildTask]]:
+        """Fan out one compile per emitted C file, plus the driver (built without `flags`)."""
+        def action() -> List[BuildTask]:
+            obj_dir = self.out_dir / "obj" / variant
+            shutil.rmtree(obj_dir, ignore_errors=True)
+            obj_dir.mkdir(parents=True)
+            include_args = [f"-I{self.nim_lib_path}"] if self.nim_lib_path else []
+            parent = self.objects_task(variant)
+            tasks = [
+                BuildTask(f"cc:{self.name}:{variant}:{c_file.name}",
+                          self.command_action([self.cc, "-c", "-w", *flags, *include_args, f"-I{self.nim_dir}",
+                                               "-o", str(obj_dir / f"{c_file.name}.o"), str(c_file)]),
+                          deps=[parent])
+                for c_file in sorted(self.cache_dir.glob("*.c"))
+            ]
+            if not tasks:
+                raise BuildError(f"No C files in {self.cache_dir}")
+            driver = self.driver_dir / self.driver
+            tasks.append(BuildTask(f"cc:{self.name}:{variant}:{self.driver}",
+                                   self.command_action([self.cxx, "-c", "-std=c++17", *self.c_flags,
+                                                        f"-I{self.driver_dir}", "-o",
+                                                        str(obj_dir / f"{driver.stem}.o"), str(driver)]),
+                                   deps=[parent]))
+            return tasks
+        return action
+
+    def link_action(self, variant: str, flags: List[str] = ()) -> Callable[[], None]:
+        def action() -> None:
+            objects = sorted(str(path) for path in (self.out_dir / "obj" / variant).glob("*.o"))
+            binary = self.binary(variant)
+            binary.parent.mkdir(parents=True, exist_ok=True)
+            run_command([self.cxx, *flags, "-o", str(binary), *objects, "-lpthread", "-lm"], self.nim_dir)
+        return action
+
+    def command_action(self, cmd: List[str]) -> Callable[[], None]:
+        def action() -> None:
+            run_command(cmd, self.nim_dir)
+        return action
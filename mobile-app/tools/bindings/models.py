@@ -2,8 +2,8 @@
 Data models and type mapping for Nim bridge generator.
 """
 
-from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple, Optional, Union
 
 from .config import GeneratorConfig
 
@@ -16,21 +16,68 @@ class NimFunction:
     params: List[Tuple[str, str]]  # List of (name, type) tuples
     memory_type: Optional[str] = None  # 'literal' or 'allocated' for string returns
     js_name: Optional[str] = None  # Optional JavaScript/TypeScript name mapping
+    # Callback parameters (type 'callback' in params) mapped to their (name, type) arguments
+    callbacks: Dict[str, List[Tuple[str, str]]] = field(default_factory=dict)
+    # Doc comment annotations (`## @name` or `## @name(args)`) mapped to their argument text
+    annotations: Dict[str, str] = field(default_factory=dict)
+    # Value of a zero-argument proc whose body is a single literal expression
+    literal_value: Optional[Union[str, int, float, bool]] = None
+    # Also exposed as a Promise-returning `<jsName>Async` run off the JS thread
+    async_variant: bool = False
+    # Also exposed as an array-in/array-out `<jsName>Many` (`## @vectorize`)
+    vector_variant: bool = False
+    # (lo, values) lookup table of a `## @precompute(lo..hi)` export, evaluated at build time
+    precomputed: Optional[Tuple[int, List[Union[int, bool]]]] = None
+
+    def callback_channel(self, param_name: str) -> str:
+        """Event channel used to deliver a callback parameter through the event ring."""
+        return f"{self.js_name or self.name}.{param_name}"
+
+
+@dataclass
+class NimConstant:
+    """A value known at generation time: an exported Nim const or a folded literal proc."""
+    name: str
+    value: Union[str, int, float, bool]
+    exported: bool = True
+    folded_proc: bool = False  # replaces a native zero-argument function of the same JS name
+
+
+@dataclass
+class NimHandleType:
+    """An exported Nim `ref object` surfaced to JS as a native handle."""
+    name: str
+    release: str  # Nim proc annotated with @release that drops the bridge's reference
+
+    def method_name(self, func: NimFunction) -> str:
+        """JS method name on the handle: the export name without the type prefix."""
+        js_name = func.js_name or func.name
+        prefix = self.name[0].lower() + self.name[1:]
+        if js_name.startswith(prefix) and len(js_name) > len(prefix):
+            rest = js_name[len(prefix):]
+            return rest[0].lower() + rest[1:]
+        return js_name
 
 
 class TypeMapper:
     """Handles type conversions between Nim and target languages."""
 
-    def __init__(self, config: GeneratorConfig):
+    def __init__(self, config: GeneratorConfig, handle_types: Iterable[str] = ()):
         self.config = config
         self.type_mappings = config.data.get('type_mappings', {})
+        self.handle_types = set(handle_types)
 
     def nim_to_cpp_type(self, nim_type: str) -> str:
         """Convert Nim type to C++ type."""
+        # `mapped` (a `## @mapped` export) returns a pointer; its length goes through an out-parameter
+        if nim_type in self.handle_types or nim_type == 'mapped':
+            return 'void*'
         cpp_mappings = self.type_mappings.get('cpp', {})
         return cpp_mappings.get(nim_type, nim_type)
 
     def nim_to_ts_type(self, nim_type: str) -> str:
         """Convert Nim type to TypeScript type."""
+        if nim_type in self.handle_types or nim_type == 'mapped':
+            return 'Object'
         ts_mappings = self.type_mappings.get('typescript', {})
         return ts_mappings.get(nim_type, 'any')
\ No newline at end of file
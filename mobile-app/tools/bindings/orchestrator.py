@@ -2,17 +2,45 @@
 Main orchestrator for binding generation process.
 """
 
+import copy
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from .config import GeneratorConfig
-from .models import NimFunction
+from .models import NimConstant, NimFunction, NimHandleType
 from .parser import NimParser
+from .profiles import load_p95_ms
+from .profiling import Profiler
+from .reachability import CallSiteScanner, source_files
 from .generators import (
     CppWrapperGenerator, ObjcHeaderGenerator, ObjcBridgeGenerator,
     AndroidKotlinGenerator, AndroidKotlinPackageGenerator, AndroidJNIGenerator,
-    TypeScriptInterfaceGenerator, CMakeGenerator
+    TypeScriptInterfaceGenerator, TypeScriptModuleGenerator, CMakeGenerator,
+    EventRingHeaderGenerator, SyncBudgetHeaderGenerator, MemoryTelemetryHeaderGenerator
 )
+from .fingerprint import bridge_fingerprint, fingerprint_path, publish_fingerprint
+from .generators.base import CodeGenerator
+from .generators.emitter import Emitter, spill_bytes
+from .generators.fragments import FragmentCache, fragment_cache_dir, fragment_cache_enabled
+from .generators.budget import frame_budget_ms, records_sync_budget
+from .generators.dispatch import format_savings
+from .generators.glue import NimGlueGenerator, glue_module, glue_sources, unsupported_glue_types
+from .generators.memory import records_memory, uses_scratch
+from .generators.precompute import (
+    PrecomputedTablesHeaderGenerator, load_tables, max_entries, precompute_eligible, precompute_range,
+    precomputed_functions, sources_digest, tables_path,
+)
+from .generators.shards import BridgeShardGenerator, shard_count, shard_file_name, stale_shard_files
+from .generators.mapped import is_blob_release, mapped_eligible, mapped_functions, mapped_release
+from .generators.vectorize import vector_eligible, vector_name
+
+
+def generation_workers(config: GeneratorConfig) -> int:
+    return max(1, int(config.data.get('generation', {}).get('workers', min(8, os.cpu_count() or 1))))
 
 
 class BindingGenerator:
@@ -21,24 +49,67 @@ class BindingGenerator:
     def __init__(self, config: GeneratorConfig):
         self.config = config
         base_dir = Path(__file__).parent.parent.parent
+        self.base_dir = base_dir
         self.nim_dir = base_dir / config.nim_dir
         self.output_dir = base_dir / config.output_dir
         self.parser = NimParser()
         self.functions: List[NimFunction] = []
+        self.event_channels: List[str] = []
+        self.handle_types: List[NimHandleType] = []
+        self.constants: List[NimConstant] = []
+        self.dispatch_savings: List[str] = []
+        self.glue_exports: List[str] = []
+        self.pruned: List[str] = []
+        # Whether any compiled export calls nimBridgeScratch, bridged or not
+        self.scratch = False
+        self.generation_timings: List[Tuple[str, float]] = []
+        self.generation_wall = 0.0
+        self.generation_workers = 0
+        self.fragment_caches: List[FragmentCache] = []
+        self.written_files: List[Path] = []
+        self.generated_files: List[Path] = []
+        # Set by long-lived callers (watch mode): per-target output is summarised by them
+        self.quiet = False
+        # Parsed Nim files and fragment caches kept across runs by long-lived callers
+        self.parse_cache: Optional[Dict[Path, tuple]] = None
+        self._fragment_stores: Dict[Path, FragmentCache] = {}
+        self.profiler = Profiler()
 
     def discover_functions(self) -> bool:
         """Discover all exported functions from Nim files."""
-        nim_files = list(self.nim_dir.glob("*.nim"))
+        if glue_sources(self.config):
+            with self.profiler.phase("glue", "discover"):
+                if not self.generate_glue():
+                    return False
+
+        nim_files = sorted(self.nim_dir.glob("*.nim"))
         if not nim_files:
             print(f"No Nim files found in {self.nim_dir}")
             return False
 
+        self.functions, self.event_channels, self.handle_types, self.constants = [], [], [], []
+        self.pruned = []
+        declared_handles = []
         for nim_file in nim_files:
-            functions = self.parser.parse_nim_exports(nim_file)
+            with self.profiler.phase(f"parse {nim_file.name}", "parse"):
+                functions, channels, handles, constants = self._parse_nim_file(nim_file)
             self.functions.extend(functions)
-            if functions:
+            if functions and not self.quiet:
                 print(f"Found {len(functions)} exported functions in {nim_file.name}")
 
+            for channel in channels:
+                if channel not in self.event_channels:
+                    self.event_channels.append(channel)
+
+            declared_handles.extend(handles)
+            self.constants.extend(constants)
+
+        # Exports skipped or pruned below are still compiled into the Nim library,
+        # so the bridges must define nimBridgeScratch for them as well
+        self.scratch = uses_scratch(self.functions)
+        self._resolve_mapped_exports()
+        self._resolve_handle_types(declared_handles)
+
         if not self.functions:
             print("No exported functions found!")
             return False
@@ -55,52 +126,519 @@ class BindingGenerator:
                 func.js_name = func.name
 
             # Mark functions that should return booleans
-            if func.name in boolean_returns:
+            if func.name in boolean_returns or 'boolean' in func.annotations:
                 func.return_type = 'bool'
+                if func.literal_value is not None:
+                    func.literal_value = bool(func.literal_value)
+
+        if self.config.data.get('fold_constants', False):
+            self._fold_constants()
+        else:
+            self.constants = []
+
+        with self.profiler.phase("select variants", "discover"):
+            self._select_async_variants()
+            self._select_vector_variants()
+            self._attach_precomputed_tables()
+        if self.config.data.get('prune', {}).get('enabled', False):
+            with self.profiler.phase("prune", "discover"):
+                self._prune_unreachable()
+
+        return True
+
+    def _parse_nim_file(self, nim_file: Path) -> tuple:
+        """Exports, event channels, declared handle types and exported constants of one Nim file.
+
+        With a `parse_cache`, files whose size and mtime are unchanged are not
+        parsed again; discovery annotates the functions in place, so each run
+        gets its own copy.
+        """
+        if self.parse_cache is None:
+            return self._parse_nim_file_uncached(nim_file)
+        stat = nim_file.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self.parse_cache.get(nim_file)
+        if cached is None or cached[0] != stamp:
+            cached = self.parse_cache[nim_file] = (stamp, self._parse_nim_file_uncached(nim_file))
+        return copy.deepcopy(cached[1])
+
+    def _parse_nim_file_uncached(self, nim_file: Path) -> tuple:
+        return (self.parser.parse_nim_exports(nim_file), self.parser.parse_event_channels(nim_file),
+                self.parser.parse_handle_types(nim_file),
+                [const for const in self.parser.parse_constants(nim_file) if const.exported])
+
+    def generate_glue(self) -> bool:
+        """Write the `{.exportc.}` wrapper module for the `## @bridge` procs of `glue.sources`.
+
+        The file is only rewritten when its content changes, so Nim builds
+        are not invalidated by regenerating identical glue. A missing source
+        is an error and leaves the existing glue untouched: dropping its
+        wrappers would silently remove exports the app calls.
+        """
+        missing = [self.base_dir / path for path in glue_sources(self.config)
+                   if not (self.base_dir / path).exists()]
+        for source in missing:
+            print(f"Error: glue source {source} not found")
+        if missing:
+            return False
+
+        sources, procs, object_types = [], [], set()
+        for path in glue_sources(self.config):
+            source = self.base_dir / path
+            sources.append(source)
+            procs.extend(self.parser.parse_bridged_procs(source))
+            object_types.update(self.parser.parse_object_types(source))
 
+        bridged = []
+        for func in procs:
+            unsupported = unsupported_glue_types(func, object_types)
+            if unsupported:
+                print(f"Warning: not bridging {func.name}: no glue marshalling for {', '.join(unsupported)}")
+                continue
+            bridged.append(func)
+
+        code = NimGlueGenerator(bridged, self.config, sources, object_types, self.nim_dir).generate()
+        path = self.nim_dir / glue_module(self.config)
+        if not path.exists() or path.read_text() != code:
+            path.write_text(code)
+            print(f"Generated {path}")
+        self.glue_exports = [func.name for func in bridged]
         return True
 
-    def generate_all(self) -> None:
-        """Generate all binding files based on configuration."""
+    def _select_async_variants(self) -> None:
+        """Give functions whose measured p95 exceeds the frame budget a Promise variant."""
+        reports = [self.base_dir / path for path in self.config.data.get('frame_budget', {}).get('reports', [])]
+        if not reports:
+            return
+
+        p95_ms = load_p95_ms(reports)
+        budget = frame_budget_ms(self.config)
+        for func in self.functions:
+            p95 = p95_ms.get(func.js_name, p95_ms.get(func.name))
+            if p95 is None or p95 <= budget:
+                continue
+            types = {func.return_type, *(ptype for _, ptype in func.params)}
+            uses_handles = bool(types & {handle.name for handle in self.handle_types})
+            if func.callbacks or uses_handles or func.return_type in ('void', 'mapped'):
+                print(f"Warning: {func.js_name} exceeds the frame budget (p95 {p95:.1f} ms) "
+                      f"but callbacks, handles, mapped blobs and void returns cannot be made async")
+                continue
+            func.async_variant = True
+            print(f"{func.js_name}: p95 {p95:.1f} ms > {budget:g} ms budget, adding {func.js_name}Async")
+
+    def _select_vector_variants(self) -> None:
+        """Give `@vectorize` exports their array-in/array-out companion."""
+        for func in self.functions:
+            if 'vectorize' not in func.annotations:
+                continue
+            if not vector_eligible(func):
+                print(f"Warning: {func.name} is annotated @vectorize but only procs taking and returning "
+                      f"integers or bools can be vectorized")
+                continue
+            func.vector_variant = True
+
+    def nim_sources(self) -> List[Path]:
+        """Nim files the exports are compiled from: the Nim directory plus the glue sources."""
+        glue = [self.base_dir / path for path in glue_sources(self.config)]
+        return sorted(self.nim_dir.glob("*.nim")) + [path for path in glue if path.exists()]
+
+    def _attach_precomputed_tables(self) -> None:
+        """Give `@precompute` exports the table tools/precompute.py evaluated for them.
+
+        Tables are only used when they were computed from the current Nim
+        sources over the annotated range.
+        """
+        annotated = [func for func in self.functions if 'precompute' in func.annotations]
+        if not annotated:
+            return
+        path = tables_path(self.config, self.base_dir)
+        data = load_tables(path)
+        fresh = data.get('digest') == sources_digest(self.nim_sources())
+        for func in annotated:
+            try:
+                lo, hi = precompute_range(func)
+            except ValueError as e:
+                print(f"Warning: {e}")
+                continue
+            if not precompute_eligible(func):
+                print(f"Warning: {func.name} is annotated @precompute but only procs taking one integer "
+                      f"and returning an integer or bool can be tabulated")
+                continue
+            if hi - lo + 1 > max_entries(self.config):
+                print(f"Warning: {func.name}: @precompute({lo}..{hi}) exceeds precompute.max_entries "
+                      f"({max_entries(self.config)})")
+                continue
+            table = data.get('tables', {}).get(func.name)
+            if not fresh or not table or (table.get('lo'), table.get('hi')) != (lo, hi) \
+                    or len(table.get('values', [])) != hi - lo + 1:
+                state = "is stale" if table and not fresh else "has no matching table"
+                print(f"Warning: {func.name} {state} in {path.name}; calling Nim directly "
+                      f"(run tools/precompute.py)")
+                continue
+            func.precomputed = (lo, table['values'])
+
+    def _prune_unreachable(self) -> None:
+        """Drop exports (and Async/Many companions) the app's JS sources never use.
+
+        Names in `prune.keep` always stay. Handle methods and release hooks
+        stay as long as some kept export returns their handle type.
+        """
+        prune_config = self.config.data.get('prune', {})
+        files = source_files([self.base_dir / path for path in prune_config.get('sources', ['src', 'index.ts'])],
+                             exclude=[self.output_dir])
+        scanner = CallSiteScanner(Path(self.config.output_dir).name, prune_config.get('identifiers', []))
+        used = scanner.scan(files)
+        if used is None:
+            print(f"Warning: not pruning exports: {'; '.join(scanner.dynamic_uses)}")
+            return
+        if not used:
+            print(f"Warning: not pruning exports: no uses of the module found in {len(files)} source files")
+            return
+        keep = set(prune_config.get('keep', []))
+        used |= keep
+
+        kept = {func.name for func in self.functions
+                if {func.name, func.js_name, f"{func.js_name}Async", vector_name(func)} & used}
+        live_handles = {func.return_type for func in self.functions if func.name in kept} \
+            & {handle.name for handle in self.handle_types}
+        kept.update(func.name for func in self.functions if func.params and func.params[0][1] in live_handles)
+
+        self.pruned = [func.js_name for func in self.functions if func.name not in kept]
+        self.functions = [func for func in self.functions if func.name in kept]
+        for func in self.functions:
+            if {func.name, func.js_name} & keep:
+                continue
+            if func.async_variant and f"{func.js_name}Async" not in used:
+                func.async_variant = False
+                self.pruned.append(f"{func.js_name}Async")
+            if func.vector_variant and vector_name(func) not in used:
+                func.vector_variant = False
+                self.pruned.append(vector_name(func))
+
+        self.handle_types = [handle for handle in self.handle_types if handle.name in live_handles]
+        if self.pruned:
+            print(f"Pruned {len(self.pruned)} exports not used by the app: {', '.join(self.pruned)}")
+
+    def _fold_constants(self) -> None:
+        """Move literal-returning zero-argument procs out of the native bridge.
+
+        Their values are emitted into the TypeScript module alongside the
+        exported Nim consts, so calling them no longer crosses the bridge.
+        """
+        names = {const.name for const in self.constants}
+        native = []
+        for func in self.functions:
+            if func.literal_value is None:
+                native.append(func)
+                continue
+            if func.js_name in names:
+                print(f"Warning: not folding {func.name}: '{func.js_name}' is also an exported const")
+                native.append(func)
+                continue
+            self.constants.append(NimConstant(func.js_name, func.literal_value, folded_proc=True))
+        self.functions = native
+
+    def _resolve_mapped_exports(self) -> None:
+        """Turn `@mapped` exports into blob returns, checking the release hooks they name.
+
+        The trailing length out-parameter is filled in by the bridges, so it
+        is dropped from the parameters. The release hooks are not exports of
+        their own and go with the other void procs in _resolve_handle_types.
+        """
+        releases = {func.name for func in self.functions if is_blob_release(func)}
+        kept = []
+        for func in self.functions:
+            if 'mapped' not in func.annotations:
+                kept.append(func)
+                continue
+            release = mapped_release(func)
+            if not mapped_eligible(func):
+                print(f"Warning: skipping {func.name}: @mapped procs return a pointer and take a trailing "
+                      f"`ptr csize_t` length after string, number or bool parameters")
+            elif release and release not in releases:
+                print(f"Warning: skipping {func.name}: @mapped release proc {release} must be an exported "
+                      f"@release proc taking a single pointer and returning nothing")
+            else:
+                func.params = func.params[:-1]
+                func.return_type = 'mapped'
+                kept.append(func)
+        self.functions = kept
+
+    def _resolve_handle_types(self, declared: List[str]) -> None:
+        """Pair exported ref object types with their @release hooks.
+
+        Types used by exports but lacking a release hook would leak every
+        instance, so functions referring to them are dropped with a warning.
+        """
+        releases = {}
+        for func in self.functions:
+            if 'release' not in func.annotations or is_blob_release(func):
+                continue
+            if len(func.params) != 1 or func.params[0][1] not in declared or func.return_type != 'void':
+                print(f"Warning: @release proc {func.name} must take a single exported ref object and return nothing")
+                continue
+            releases.setdefault(func.params[0][1], func.name)
+
+        self.handle_types = [NimHandleType(name, releases[name]) for name in declared if name in releases]
+        unreleased = set(declared) - set(releases)
+
+        kept = []
+        for func in self.functions:
+            types = [func.return_type] + [ptype for _, ptype in func.params]
+            missing = sorted(unreleased.intersection(types))
+            if missing:
+                print(f"Warning: skipping {func.name}: no @release proc for {', '.join(missing)}")
+            elif func.return_type == 'void' and func.name not in releases.values():
+                continue
+            else:
+                kept.append(func)
+        self.functions = kept
+
+    def _build_targets(self) -> Tuple[Dict[str, Tuple[object, Path]], List[Tuple[Path, str]]]:
+        """Generator and output path of every target, plus the (directory, extension) of shard outputs."""
         generators = {}
+        context = {"event_channels": self.event_channels, "handle_types": self.handle_types,
+                   "constants": self.constants, "scratch": self.scratch}
+        events_header = EventRingHeaderGenerator(self.functions, self.config, **context)
+        budget_header = SyncBudgetHeaderGenerator(self.functions, self.config, **context)
+        memory_header = MemoryTelemetryHeaderGenerator(self.functions, self.config, **context)
+        tables_header = PrecomputedTablesHeaderGenerator(self.functions, self.config, **context)
+        tabulated = bool(precomputed_functions(self.functions))
+
+        shard_dirs = []
 
         if self.config.generate_ios:
+            objc_bridge = ObjcBridgeGenerator(self.functions, self.config, **context)
             generators.update({
-                "C++ wrapper": (CppWrapperGenerator(self.functions, self.config),
+                "C++ wrapper": (CppWrapperGenerator(self.functions, self.config, **context),
                                self.output_dir / "ios" / f"{self.config.library_name}.h"),
-                "Objective-C++ header": (ObjcHeaderGenerator(self.functions, self.config),
+                "Objective-C++ header": (ObjcHeaderGenerator(self.functions, self.config, **context),
                                         self.output_dir / "ios" / f"{self.config.module_name}.h"),
-                "Objective-C++ bridge": (ObjcBridgeGenerator(self.functions, self.config),
+                "Objective-C++ bridge": (objc_bridge,
                                         self.output_dir / "ios" / f"{self.config.module_name}.mm"),
             })
+            for index in range(1, shard_count(self.config)):
+                generators[f"Objective-C++ bridge shard {index}"] = (
+                    BridgeShardGenerator(objc_bridge, index),
+                    self.output_dir / "ios" / shard_file_name(self.config, index, "mm")
+                )
+            shard_dirs.append((self.output_dir / "ios", "mm"))
+            if events_header.has_events:
+                generators["iOS event ring header"] = (
+                    events_header, self.output_dir / "ios" / f"{self.config.module_name}Events.h"
+                )
+            if records_sync_budget(self.config):
+                generators["iOS sync budget header"] = (
+                    budget_header, self.output_dir / "ios" / f"{self.config.module_name}Budget.h"
+                )
+            if records_memory(self.config):
+                generators["iOS memory telemetry header"] = (
+                    memory_header, self.output_dir / "ios" / f"{self.config.module_name}Memory.h"
+                )
+            if tabulated:
+                generators["iOS precomputed tables header"] = (
+                    tables_header, self.output_dir / "ios" / f"{self.config.module_name}Precomputed.h"
+                )
 
         if self.config.generate_typescript:
             generators["TypeScript TurboModule spec"] = (
-                TypeScriptInterfaceGenerator(self.functions, self.config),
+                TypeScriptInterfaceGenerator(self.functions, self.config, **context),
                 self.output_dir / "src" / f"Native{self.config.module_name}.ts"
             )
+            generators["TypeScript module"] = (
+                TypeScriptModuleGenerator(self.functions, self.config, **context),
+                self.output_dir / "src" / f"{self.config.module_name}.ts"
+            )
 
         if self.config.generate_android:
             package_path = self.config.package_name.replace('.', '/')
+            jni_bridge = AndroidJNIGenerator(self.functions, self.config, **context)
+            cpp_dir = self.output_dir / "android" / "src" / "main" / "cpp"
             generators.update({
-                "Android Kotlin module": (AndroidKotlinGenerator(self.functions, self.config),
+                "Android Kotlin module": (AndroidKotlinGenerator(self.functions, self.config, **context),
                                         self.output_dir / "android" / "src" / "main" / "java" / package_path / f"{self.config.module_name}Module.kt"),
                 "Android Kotlin package": (AndroidKotlinPackageGenerator(self.config),
                                          self.output_dir / "android" / "src" / "main" / "java" / package_path / f"{self.config.module_name}Package.kt"),
-                "Android JNI bridge": (AndroidJNIGenerator(self.functions, self.config),
-                                      self.output_dir / "android" / "src" / "main" / "cpp" / f"{self.config.module_name}.cpp"),
-                "Android CMake configuration": (CMakeGenerator(self.functions, self.config),
+                "Android JNI bridge": (jni_bridge, cpp_dir / f"{self.config.module_name}.cpp"),
+                "Android CMake configuration": (CMakeGenerator(self.functions, self.config, self.nim_dir),
                                               self.output_dir / "android" / "src" / "main" / "cpp" / "CMakeLists.txt"),
             })
+            for index in range(1, shard_count(self.config)):
+                generators[f"Android JNI bridge shard {index}"] = (
+                    BridgeShardGenerator(jni_bridge, index), cpp_dir / shard_file_name(self.config, index, "cpp")
+                )
+            shard_dirs.append((cpp_dir, "cpp"))
+            if events_header.has_events:
+                generators["Android event ring header"] = (
+                    events_header, self.output_dir / "android" / "src" / "main" / "cpp" / f"{self.config.module_name}Events.h"
+                )
+            if records_sync_budget(self.config):
+                generators["Android sync budget header"] = (
+                    budget_header, self.output_dir / "android" / "src" / "main" / "cpp" / f"{self.config.module_name}Budget.h"
+                )
+            if records_memory(self.config):
+                generators["Android memory telemetry header"] = (
+                    memory_header, cpp_dir / f"{self.config.module_name}Memory.h"
+                )
+            if tabulated:
+                generators["Android precomputed tables header"] = (
+                    tables_header, cpp_dir / f"{self.config.module_name}Precomputed.h"
+                )
+        return generators, shard_dirs
+
+    def _attach_fragment_caches(self, generators: Dict[str, Tuple[object, Path]]) -> None:
+        """Per-function fragments of unchanged exports are reused from the previous run."""
+        self.fragment_caches = []
+        if fragment_cache_enabled(self.config):
+            cache_dir = fragment_cache_dir(self.config, self.output_dir)
+            for generator, _ in generators.values():
+                if isinstance(generator, CodeGenerator):
+                    path = cache_dir / f"{type(generator).__name__}.json"
+                    if path not in self._fragment_stores:
+                        self._fragment_stores[path] = FragmentCache(path)
+                    generator.fragments = self._fragment_stores[path]
+                    generator.fragments.begin()
+                    self.fragment_caches.append(generator.fragments)
+
+    def _run_groups(self, generators: Dict[str, Tuple[object, Path]], run_group) -> Dict[str, tuple]:
+        """Run `run_group` over the targets concurrently, one group per bridge; results keyed by name."""
+        # Shards render from their bridge generator's state, so they run in its group
+        groups: Dict[int, List[str]] = {}
+        for name, (generator, _) in generators.items():
+            groups.setdefault(id(getattr(generator, 'bridge', generator)), []).append(name)
+
+        start = time.perf_counter()
+        results: Dict[str, tuple] = {}
+        workers = generation_workers(self.config)
+        if workers == 1:
+            # Inline, so profilers and tracebacks see the generators on the calling thread
+            for names in groups.values():
+                results.update(run_group([(name, *generators[name]) for name in names]))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(run_group, [(name, *generators[name]) for name in names])
+                           for names in groups.values()]
+                for future in futures:
+                    results.update(future.result())
+        self.generation_timings = [(name, results[name][0]) for name in generators]
+        self.generation_wall = time.perf_counter() - start
+        self.generation_workers = min(workers, len(groups))
+        return results
+
+    def render(self) -> Dict[Path, str]:
+        """Generate every output in memory as {path: content}, without writing any of them.
+
+        Discovery still refreshes the glue module, which the parser and the
+        Nim compiler read from `nim_dir`. Fragment caches are used but only
+        saved by generate_all().
+        """
+        generators, _ = self._build_targets()
+        self._attach_fragment_caches(generators)
+        results = self._run_groups(generators, self._render_group)
+        for cache in self.fragment_caches:
+            cache.save(persist=False)
+        files = {}
+        for name, (_, file_path) in generators.items():
+            _, error, text = results[name]
+            if error is not None:
+                raise RuntimeError(f"Error generating {name}: {error}") from error
+            files[file_path] = text
+        return files
+
+    def generate_all(self, compare_dispatch: bool = True) -> None:
+        """Generate all binding files based on configuration.
 
+        `compare_dispatch=False` skips rendering the unrolled bridge the
+        table dispatch savings in the summary are measured against.
+        """
+        self.dispatch_savings = []
+        with self.profiler.phase("build targets", "generate"):
+            generators, shard_dirs = self._build_targets()
+            self._attach_fragment_caches(generators)
+        results = self._run_groups(generators, self._emit_group)
+        with self.profiler.phase("save fragment caches", "write"):
+            for cache in self.fragment_caches:
+                cache.save()
+
+        self.generated_files, self.written_files = [], []
         for name, (generator, file_path) in generators.items():
+            _, error, written = results[name]
+            if error is not None:
+                print(f"Error generating {name}: {error}")
+                continue
+            self.generated_files.append(file_path)
+            if written:
+                self.written_files.append(file_path)
+            if not self.quiet:
+                print(f"{'Generated' if written else 'Unchanged'} {file_path}")
+            if compare_dispatch and getattr(generator, 'dispatch', None):
+                with self.profiler.phase(f"compare dispatch {file_path.name}", "summary"):
+                    self._compare_dispatch(generator, file_path.name, file_path.read_text())
+
+        # The podspec globs ios/*.mm, so shards from a run with more of them must go
+        for directory, extension in shard_dirs:
+            for path in stale_shard_files(directory, self.config, extension):
+                path.unlink()
+                print(f"Removed stale shard {path}")
+
+        # Lets `make codegen` / `make pod-install` skip when nothing they read changed
+        fingerprint_file = fingerprint_path(self.config, self.base_dir, self.output_dir)
+        with self.profiler.phase("fingerprint", "write"):
+            published = publish_fingerprint(fingerprint_file, bridge_fingerprint(self.output_dir))
+        if published and not self.quiet:
+            print(f"Generated {fingerprint_file}")
+
+    def _emit_group(self, targets: List[Tuple[str, CodeGenerator, Path]]
+                    ) -> Dict[str, Tuple[float, Optional[Exception], bool]]:
+        """Stream each target to its file; a failing or unchanged target leaves its file untouched."""
+        results = {}
+        for name, generator, file_path in targets:
+            start = time.perf_counter()
+            code = Emitter(file_path, spill_bytes(self.config))
             try:
-                code = generator.generate()
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                file_path.write_text(code)
-                print(f"Generated {file_path}")
+                # Spilled chunks are written while rendering; "write" is the final flush, compare and rename
+                with self.profiler.phase(f"render {file_path.name}", "render", target=name):
+                    if isinstance(generator, CodeGenerator):
+                        generator.emit(code)
+                    else:
+                        code += generator.generate()
+                with self.profiler.phase(f"write {file_path.name}", "write"):
+                    written = code.commit()
+                results[name] = (time.perf_counter() - start, None, written)
             except Exception as e:
-                print(f"Error generating {name}: {e}")
+                code.discard()
+                results[name] = (time.perf_counter() - start, e, False)
+        return results
+
+    def _render_group(self, targets: List[Tuple[str, CodeGenerator, Path]]
+                      ) -> Dict[str, Tuple[float, Optional[Exception], str]]:
+        """Generate each target into memory."""
+        results = {}
+        for name, generator, file_path in targets:
+            start = time.perf_counter()
+            code = Emitter()
+            try:
+                with self.profiler.phase(f"render {file_path.name}", "render", target=name):
+                    if isinstance(generator, CodeGenerator):
+                        generator.emit(code)
+                    else:
+                        code += generator.generate()
+                results[name] = (time.perf_counter() - start, None, code.getvalue())
+            except Exception as e:
+                results[name] = (time.perf_counter() - start, e, "")
+        return results
+
+    def _compare_dispatch(self, generator, file_name: str, code: str) -> None:
+        """Measure a table-dispatched bridge against its fully unrolled equivalent."""
+        unrolled_config = replace(self.config, data={**self.config.data, 'dispatch': {'mode': 'unrolled'}})
+        context = {"event_channels": self.event_channels, "handle_types": self.handle_types,
+                   "constants": self.constants, "scratch": self.scratch}
+        unrolled = type(generator)(self.functions, unrolled_config, **context).generate()
+        shapes = generator.dispatch.shapes
+        self.dispatch_savings.append(
+            f"{format_savings(file_name, unrolled, code)}, "
+            f"{len(generator.dispatch)} exports through {len(shapes)} shape trampolines"
+        )
 
     def print_summary(self) -> None:
         """Print generation summary."""
@@ -108,7 +646,51 @@ class BindingGenerator:
         print("\nGenerated files:")
         print("  iOS: nim_functions.h, NimBridge.h, NimBridge.mm")
         print("  Android: NimBridgeModule.kt, NimBridgePackage.kt, NimBridge.cpp, CMakeLists.txt")
-        print("  TypeScript: NativeNimBridge.ts (TurboModule spec)")
+        print("  TypeScript: NativeNimBridge.ts (TurboModule spec), NimBridge.ts")
+        if self.event_channels or any(func.callbacks for func in self.functions):
+            print("  Events: NimBridgeEvents.h (iOS + Android)")
+        if self.handle_types:
+            print(f"  Handles: {', '.join(handle.name for handle in self.handle_types)}")
+        if self.constants:
+            print(f"  Constants folded into NimBridge.ts: {', '.join(const.name for const in self.constants)}")
+        if self.glue_exports:
+            print(f"  Nim glue: {glue_module(self.config)} wraps @bridge procs {', '.join(self.glue_exports)}")
+        if self.pruned:
+            print(f"  Pruned (unused by the app): {', '.join(self.pruned)}")
+        if records_sync_budget(self.config):
+            print("  Sync budget: NimBridgeBudget.h (iOS + Android), getSyncBudgetReport()")
+        if records_memory(self.config):
+            print("  Memory telemetry: NimBridgeMemory.h (iOS + Android), getNativeMemoryStats() "
+                  "(build Nim with -d:nimBridgeTelemetry)")
+        tabulated = precomputed_functions(self.functions)
+        if tabulated:
+            print(f"  Precomputed tables: {self.config.module_name}Precomputed.h (iOS + Android) for "
+                  f"{', '.join(func.js_name for func in tabulated)}")
+        async_funcs = [func.js_name for func in self.functions if func.async_variant]
+        if async_funcs:
+            print(f"  Async variants: {', '.join(name + 'Async' for name in async_funcs)}")
+        mapped_funcs = mapped_functions(self.functions)
+        if mapped_funcs:
+            print(f"  Mapped blobs: {', '.join(func.js_name for func in mapped_funcs)} "
+                  f"(external ArrayBuffers on iOS, direct ByteBuffers on Android)")
+        vector_funcs = [vector_name(func) for func in self.functions if func.vector_variant]
+        if vector_funcs:
+            print(f"  Vectorized companions: {', '.join(vector_funcs)}")
+        if shard_count(self.config) > 1:
+            print(f"  Shards: {shard_count(self.config)} translation units per bridge "
+                  f"(NimBridgeShard<N>.mm / .cpp, listed in CMakeLists.txt)")
+        if self.generation_timings:
+            slowest = max(self.generation_timings, key=lambda timing: timing[1])
+            print(f"  Generation: {len(self.generation_timings)} files in {self.generation_wall:.2f}s on "
+                  f"{self.generation_workers} worker(s), slowest {slowest[0]} ({slowest[1]:.2f}s)")
+        if self.fragment_caches:
+            hits = sum(cache.hits for cache in self.fragment_caches)
+            misses = sum(cache.misses for cache in self.fragment_caches)
+            print(f"  Fragment cache: {hits} function fragment(s) reused, {misses} rendered")
+        if self.dispatch_savings:
+            print("  Table dispatch (generated source vs. unrolled):")
+            for line in self.dispatch_savings:
+                print(f"    {line}")
         print("\nNext steps:")
         print("1. Review the generated files")
         print("2. Run 'pod install' in ios/ directory (for iOS)")
@@ -4,80 +4,487 @@ Nim source code parser for extracting exported functions.
 
 import re
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
-from .models import NimFunction
+from .models import NimConstant, NimFunction
 
 
 class NimParser:
     """Parses Nim files to extract exported functions."""
 
+    # Start of an exported proc; the parameter list is matched separately so
+    # callback parameters with their own parentheses are handled correctly.
+    PROC_START = re.compile(r'proc\s+(\w+)\*\s*\(')
+    PROC_TAIL = re.compile(r'\s*:\s*(\w+)\s*{[^}]*exportc[^}]*}')
+    PROC_TAIL_VOID = re.compile(r'\s*{[^}]*exportc[^}]*}')
+    ANNOTATION = re.compile(r'@(\w+)(?:\(([^)]*)\))?')
+    REF_OBJECT = re.compile(r'^\s*(\w+)\*\s*=\s*ref\s+object\b', re.MULTILINE)
+    OBJECT = re.compile(r'^\s*(\w+)\*\s*=\s*object\b', re.MULTILINE)
+    # Business-logic proc with a body: `proc name*(...): Type =`, pragmas optional
+    BRIDGED_TAIL = re.compile(r'\s*:\s*([\w\[\]]+)\s*(?:{[^}]*})?\s*=')
+    CALLBACK_TYPE = re.compile(r'^proc\s*\((.*)\)\s*(?::\s*(\w+))?\s*\{\.\s*cdecl\s*\.\}$', re.DOTALL)
+    EVENTS_ANNOTATION = re.compile(r'^##\s*@events\s*:?\s*(.+)$', re.MULTILINE)
+    CONST_ENTRY = re.compile(r'^(\w+)(\*)?\s*(?::\s*\w+\s*)?=\s*(.+)$')
+    NUMBER_LITERAL = re.compile(
+        r"-?(?:0[xXbBoO][0-9a-fA-F_]+|\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?)(?:'([iIuUfF])\d*)?")
+    CONVERSION = re.compile(r'\.(cstring|string|cint|int|int32|int64|float|float32|float64|cdouble)\b')
+    STRING_ESCAPES = {
+        'n': '\n', 'l': '\n', 'r': '\r', 'c': '\r', 't': '\t', '\\': '\\', '"': '"', "'": "'",
+        'a': '\a', 'b': '\b', 'e': '\x1b', 'f': '\f', 'v': '\v',
+    }
+    LITERAL_TYPES = {
+        'cstring': (str,), 'string': (str,), 'bool': (bool,),
+        'cint': (int,), 'int': (int,), 'int64': (int,), 'float': (int, float),
+    }
+
     def parse_nim_exports(self, nim_file: Path) -> List[NimFunction]:
         """Parse Nim file and extract exported functions."""
+        content = self._read(nim_file)
+        if content is None:
+            return []
+
+        return self._extract_functions(content)
+
+    def parse_event_channels(self, nim_file: Path) -> List[str]:
+        """Parse module-level `## @events name, ...` channel declarations."""
+        content = self._read(nim_file)
+        if content is None:
+            return []
+
+        channels = []
+        for match in self.EVENTS_ANNOTATION.finditer(content):
+            for name in re.split(r'[,\s]+', match.group(1).strip()):
+                if not name:
+                    continue
+                if not re.fullmatch(r'\w+', name):
+                    print(f"Warning: ignoring invalid event channel name '{name}' in {nim_file.name}")
+                    continue
+                if name not in channels:
+                    channels.append(name)
+        return channels
+
+    def parse_handle_types(self, nim_file: Path) -> List[str]:
+        """Parse exported `Name* = ref object` type declarations."""
+        content = self._read(nim_file)
+        if content is None:
+            return []
+        return [match.group(1) for match in self.REF_OBJECT.finditer(content)]
+
+    def parse_object_types(self, nim_file: Path) -> List[str]:
+        """Parse exported `Name* = object` type declarations."""
+        content = self._read(nim_file)
+        if content is None:
+            return []
+        return [match.group(1) for match in self.OBJECT.finditer(content)]
+
+    def parse_bridged_procs(self, nim_file: Path) -> List[NimFunction]:
+        """Parse business-logic procs annotated `## @bridge` for the generated export glue."""
+        content = self._read(nim_file)
+        if content is None:
+            return []
+
+        functions = []
+        for match in self.PROC_START.finditer(content):
+            params_end = self._find_closing_paren(content, match.end())
+            if params_end == -1:
+                continue
+            tail = self.BRIDGED_TAIL.match(content, params_end + 1)
+            if not tail or 'exportc' in tail.group(0):
+                continue
+            annotations = self._parse_annotations(content, match.start(), tail.end())
+            if 'bridge' not in annotations:
+                continue
+            params = self._parse_parameters(content[match.end():params_end])
+            functions.append(NimFunction(match.group(1), tail.group(1), params, annotations=annotations))
+        return functions
+
+    def parse_constants(self, nim_file: Path) -> List[NimConstant]:
+        """Parse `const` declarations whose values are literals."""
+        content = self._read(nim_file)
+        if content is None:
+            return []
+        return self._extract_constants(content)
+
+    @staticmethod
+    def _read(nim_file: Path) -> Optional[str]:
         try:
             with open(nim_file, 'r') as f:
-                content = f.read()
+                return f.read()
         except IOError as e:
             print(f"Error reading {nim_file}: {e}")
-            return []
-
-        return self._extract_functions(content)
+            return None
 
     def _extract_functions(self, content: str) -> List[NimFunction]:
         """Extract functions from Nim source content."""
         functions = []
+        constants = {const.name: const.value for const in self._extract_constants(content)}
 
-        # Regex to match exported Nim procs with optional doc comments
-        pattern = r'proc\s+(\w+)\*\s*\((.*?)\)\s*:\s*(\w+)\s*{[^}]*exportc[^}]*}'
-
-        for match in re.finditer(pattern, content, re.MULTILINE | re.DOTALL):
+        for match in self.PROC_START.finditer(content):
             func_name = match.group(1)
-            params_str = match.group(2)
-            return_type = match.group(3)
+            params_end = self._find_closing_paren(content, match.end())
+            if params_end == -1:
+                continue
+
+            tail = self.PROC_TAIL.match(content, params_end + 1)
+            if tail:
+                return_type = tail.group(1)
+                annotations = self._parse_annotations(content, match.start(), tail.end())
+            else:
+                # Procs without a return value are only bridged as handle release hooks
+                tail = self.PROC_TAIL_VOID.match(content, params_end + 1)
+                if not tail:
+                    continue
+                annotations = self._parse_annotations(content, match.start(), tail.end())
+                if 'release' not in annotations:
+                    continue
+                return_type = 'void'
+
+            params_str = content[match.end():params_end]
 
             # Parse memory annotation for string returns
-            memory_type = self._detect_memory_type(content, match, return_type)
+            memory_type = self._detect_memory_type(content, match.start(), tail.end(), return_type)
 
             # Parse parameters
             params = self._parse_parameters(params_str)
 
-            functions.append(NimFunction(func_name, return_type, params, memory_type))
+            callbacks = self._extract_callbacks(func_name, params)
+            if callbacks is None:
+                continue
+
+            literal_value = None
+            if not params and return_type != 'void' and 'allocated' not in annotations:
+                literal_value = self._fold_literal(content, tail.end(), return_type, constants)
+
+            functions.append(NimFunction(func_name, return_type, params, memory_type,
+                                         callbacks=callbacks, annotations=annotations,
+                                         literal_value=literal_value))
 
         return functions
 
-    def _detect_memory_type(self, content: str, match: re.Match, return_type: str) -> Optional[str]:
+    def _extract_constants(self, content: str) -> List[NimConstant]:
+        """Extract `const` entries, both single-line and indented sections."""
+        constants = []
+        values = {}
+        in_section = False
+        for line in content.split('\n'):
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            if not line[0].isspace():
+                in_section = False
+                if stripped == 'const':
+                    in_section = True
+                    continue
+                if not stripped.startswith('const '):
+                    continue
+                stripped = stripped[len('const '):].strip()
+            elif not in_section:
+                continue
+
+            match = self.CONST_ENTRY.match(stripped)
+            if not match:
+                continue
+            value = self._eval_literal(match.group(3), values)
+            if value is None:
+                continue
+            values[match.group(1)] = value
+            constants.append(NimConstant(match.group(1), value, exported=bool(match.group(2))))
+        return constants
+
+    def _fold_literal(self, content: str, sig_end: int, return_type: str, constants: Dict):
+        """Value of a proc body consisting of a single literal expression, if any."""
+        line_end = content.find('\n', sig_end)
+        if line_end == -1:
+            line_end = len(content)
+        inline = content[sig_end:line_end].strip()
+        if not inline.startswith('='):
+            return None
+
+        statements = [inline[1:].strip()] if inline[1:].strip() else []
+        pos = line_end
+        while not statements and pos < len(content):
+            nxt = content.find('\n', pos + 1)
+            if nxt == -1:
+                nxt = len(content)
+            line = content[pos + 1:nxt]
+            if line.strip() and not line[0].isspace():
+                break
+            if line.strip() and not line.strip().startswith('#'):
+                statements.append(line.strip())
+                # Any further statement makes the body non-literal
+                rest = nxt
+                while rest < len(content):
+                    following = content.find('\n', rest + 1)
+                    following = len(content) if following == -1 else following
+                    next_line = content[rest + 1:following]
+                    if next_line.strip() and not next_line[0].isspace():
+                        break
+                    if next_line.strip() and not next_line.strip().startswith('#'):
+                        return None
+                    rest = following
+            pos = nxt
+
+        if len(statements) != 1:
+            return None
+        statement = statements[0]
+        for prefix in ('return ', 'result = '):
+            if statement.startswith(prefix):
+                statement = statement[len(prefix):]
+
+        value = self._eval_literal(statement, constants)
+        expected = self.LITERAL_TYPES.get(return_type)
+        if value is None or not expected or not isinstance(value, expected):
+            return None
+        # bool is an int subclass in Python but not in Nim
+        if isinstance(value, bool) and bool not in expected:
+            return None
+        return value
+
+    def _eval_literal(self, expr: str, constants: Dict):
+        """Evaluate literals, const references and `&` string concatenation."""
+        terms = []
+        i, n = 0, len(expr)
+        while True:
+            while i < n and expr[i].isspace():
+                i += 1
+            term, i = self._eval_term(expr, i, constants)
+            if term is None:
+                return None
+            terms.append(term)
+            while i < n and expr[i].isspace():
+                i += 1
+            if i < n and expr[i] == '&':
+                i += 1
+                continue
+            if i < n and expr[i] != '#':
+                return None
+            break
+
+        if len(terms) == 1:
+            return terms[0]
+        if all(isinstance(term, str) for term in terms):
+            return ''.join(terms)
+        return None
+
+    def _eval_term(self, expr: str, i: int, constants: Dict):
+        """Evaluate a single literal term starting at `i`; returns (value, end)."""
+        n = len(expr)
+        value = None
+        if expr.startswith('"""', i):
+            return None, i
+        if expr.startswith(('r"', 'R"'), i):
+            i += 2
+            chars = []
+            while i < n:
+                if expr[i] == '"':
+                    if expr.startswith('""', i):
+                        chars.append('"')
+                        i += 2
+                        continue
+                    break
+                chars.append(expr[i])
+                i += 1
+            if i >= n:
+                return None, i
+            value, i = ''.join(chars), i + 1
+        elif i < n and expr[i] == '"':
+            i += 1
+            chars = []
+            while i < n and expr[i] != '"':
+                if expr[i] == '\\' and i + 1 < n:
+                    esc = expr[i + 1]
+                    if esc in self.STRING_ESCAPES:
+                        chars.append(self.STRING_ESCAPES[esc])
+                        i += 2
+                    elif esc in 'xX' and re.fullmatch(r'[0-9a-fA-F]{2}', expr[i + 2:i + 4]):
+                        chars.append(chr(int(expr[i + 2:i + 4], 16)))
+                        i += 4
+                    else:
+                        return None, i
+                    continue
+                chars.append(expr[i])
+                i += 1
+            if i >= n:
+                return None, i
+            value, i = ''.join(chars), i + 1
+        else:
+            number = self.NUMBER_LITERAL.match(expr, i)
+            ident = re.compile(r'[A-Za-z_]\w*').match(expr, i)
+            if number:
+                text = number.group(0).split("'")[0].replace('_', '')
+                suffix = (number.group(1) or '').lower()
+                is_based = text.lstrip('-')[:2].lower() in ('0x', '0b', '0o')
+                try:
+                    if suffix == 'f' or (not is_based and ('.' in text or 'e' in text.lower())):
+                        value = float(text)
+                    else:
+                        value = int(text, 0) if not re.fullmatch(r'-?0\d+', text) else int(text, 10)
+                except ValueError:
+                    return None, i
+                i = number.end()
+            elif ident:
+                name = ident.group(0)
+                if name in ('true', 'false'):
+                    value = name == 'true'
+                elif name in constants:
+                    value = constants[name]
+                else:
+                    return None, i
+                i = ident.end()
+            else:
+                return None, i
+
+        conversion = self.CONVERSION.match(expr, i)
+        if conversion:
+            target = conversion.group(1)
+            if target in ('cstring', 'string'):
+                if not isinstance(value, str):
+                    return None, i
+            elif isinstance(value, str) or isinstance(value, bool):
+                return None, i
+            elif target.startswith(('float', 'cdouble')):
+                value = float(value)
+            else:
+                value = int(value)
+            i = conversion.end()
+        return value, i
+
+    @staticmethod
+    def _find_closing_paren(content: str, start: int) -> int:
+        """Return the index of the parenthesis closing the one opened before `start`."""
+        depth = 1
+        for i in range(start, len(content)):
+            if content[i] == '(':
+                depth += 1
+            elif content[i] == ')':
+                depth -= 1
+                if depth == 0:
+                    return i
+        return -1
+
+    def _parse_annotations(self, content: str, sig_start: int, sig_end: int) -> Dict[str, str]:
+        """Collect `## @name(args)` annotations around a proc signature.
+
+        Both doc comments directly above the proc and the leading doc comment
+        lines of its body are considered.
+        """
+        doc_lines = []
+
+        # Lines directly above the signature
+        pos = content.rfind('\n', 0, sig_start)
+        while pos > 0:
+            prev = content.rfind('\n', 0, pos)
+            line = content[prev + 1:pos].strip()
+            if not line.startswith('##'):
+                break
+            doc_lines.append(line)
+            pos = prev
+
+        # Leading doc comment lines of the body
+        pos = content.find('\n', sig_end)
+        while pos != -1:
+            nxt = content.find('\n', pos + 1)
+            line = content[pos + 1:nxt if nxt != -1 else len(content)].strip()
+            if not line.startswith('##'):
+                break
+            doc_lines.append(line)
+            pos = nxt
+
+        annotations = {}
+        for line in doc_lines:
+            for match in self.ANNOTATION.finditer(line):
+                annotations[match.group(1)] = (match.group(2) or '').strip()
+        return annotations
+
+    def _detect_memory_type(self, content: str, func_start_pos: int, func_end_pos: int,
+                            return_type: str) -> Optional[str]:
         """Detect memory management type from annotations or implementation."""
         if return_type not in ['cstring', 'string']:
             return None
 
-        # Check for doc comment annotations
-        func_start_pos = match.start()
-        lines_before = content[:func_start_pos].split('\n')
-
-        for i in range(len(lines_before) - 1, max(0, len(lines_before) - 5), -1):
-            line = lines_before[i].strip()
+        # Check for doc comment annotations on the (up to) four lines ending at the
+        # signature, walking back line by line instead of splitting the whole prefix
+        pos = func_start_pos
+        for _ in range(4):
+            prev = content.rfind('\n', 0, pos)
+            if prev == -1:
+                break
+            line = content[prev + 1:pos].strip()
             if '@literal' in line:
                 return 'literal'
             elif '@allocated' in line:
                 return 'allocated'
+            elif '@scratch' in line:
+                return 'scratch'
             elif line and not line.startswith('##'):
                 break
+            pos = prev
 
         # Fallback: detect from implementation
-        func_start = match.end()
-        next_proc = content.find('\nproc ', func_start)
-        func_body = content[func_start:next_proc if next_proc != -1 else len(content)]
+        next_proc = content.find('\nproc ', func_end_pos)
+        func_body = content[func_end_pos:next_proc if next_proc != -1 else len(content)]
 
+        if '@scratch' in func_body or 'scratchCString' in func_body:
+            return 'scratch'
         return 'allocated' if 'allocCString' in func_body else 'literal'
 
+    def _extract_callbacks(self, func_name: str,
+                           params: List[Tuple[str, str]]) -> Optional[Dict[str, List[Tuple[str, str]]]]:
+        """Replace `proc (...) {.cdecl.}` parameter types with 'callback'.
+
+        Returns the callback signatures by parameter name, or None when the
+        function uses a callback shape the bridge cannot deliver.
+        """
+        callbacks = {}
+        for i, (name, ptype) in enumerate(params):
+            if not ptype.startswith('proc'):
+                continue
+            match = self.CALLBACK_TYPE.match(ptype)
+            if not match:
+                print(f"Warning: skipping {func_name}: callback '{name}' must be a {{.cdecl.}} proc type")
+                return None
+            if match.group(2) and match.group(2) != 'void':
+                print(f"Warning: skipping {func_name}: callback '{name}' must not return a value")
+                return None
+            callback_params = self._parse_parameters(match.group(1))
+            if any(ctype.startswith('proc') for _, ctype in callback_params):
+                print(f"Warning: skipping {func_name}: nested callbacks are not supported")
+                return None
+            callbacks[name] = callback_params
+            params[i] = (name, 'callback')
+        return callbacks
+
+    @staticmethod
+    def _split_top_level(params_str: str) -> List[str]:
+        """Split on commas that are not nested inside parentheses or pragmas."""
+        parts, depth, current = [], 0, ''
+        for char in params_str:
+            if char in '([{':
+                depth += 1
+            elif char in ')]}':
+                depth -= 1
+            if char == ',' and depth == 0:
+                parts.append(current)
+                current = ''
+            else:
+                current += char
+        parts.append(current)
+        return parts
+
     @staticmethod
     def _parse_parameters(params_str: str) -> List[Tuple[str, str]]:
         """Parse parameter string into list of (name, type) tuples."""
         params = []
+        untyped = []  # `a, b: int` shares the type of the last name
         if params_str.strip():
-            for param in params_str.split(','):
+            for param in NimParser._split_top_level(params_str):
                 param = param.strip()
                 if ':' in param:
                     name, ptype = param.split(':', 1)
-                    params.append((name.strip(), ptype.strip()))
-        return params
\ No newline at end of file
+                    ptype = ' '.join(ptype.split('=', 1)[0].split())
+                    params.extend((pending, ptype) for pending in untyped)
+                    params.append((name.strip(), ptype))
+                    untyped = []
+                elif re.fullmatch(r'\w+', param):
+                    untyped.append(param)
+        return params
@@ -0,0 +1,161 @@
+"""
+Profile-guided optimization pipeline for the Nim core library.
+
+Builds an instrumented host binary from the Nim-emitted C and a generated
+training driver, runs every scenario of the scenario file (concurrently, one
+raw profile each), merges the profiles and installs the result where the
+Android CMake build and the iOS clang invocations pick it up.
+"""
+
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .build import BuildError, BuildTask, TaskGraph, run_command
+from .generators import CppWrapperGenerator
+from .generators.pgo import (
+    PROFILE_FILE, PgoDriverGenerator, load_scenarios, pgo_dir, profdata_command,
+    profile_c_flags, profile_nim_flags, resolve_build_profile,
+)
+from .host import HostBuild
+from .orchestrator import BindingGenerator
+
+
+INSTRUMENT_FLAGS = ["-fprofile-instr-generate"]
+
+
+class PgoPipeline:
+    """Task graph training a PGO profile for the Nim core of a BindingGenerator.
+
+    With `measure`, uninstrumented baseline and profile-optimized binaries are
+    also built from the same C and timed against each other.
+    """
+
+    def __init__(self, generator: BindingGenerator, scenarios_file: Path,
+                 nim_lib_path: Optional[Path] = None, measure: bool = False, measure_runs: int = 3):
+        self.generator = generator
+        self.config = generator.config
+        self.nim_dir = generator.nim_dir
+        self.out_dir = pgo_dir(self.config, generator.base_dir)
+        self.measure = measure
+        self.measure_runs = max(1, measure_runs)
+
+        pgo_config = self.config.data.get('pgo', {})
+        profile = resolve_build_profile(self.config)
+        self.nim_flags = profile_nim_flags(self.config, profile)
+        self.c_flags = ["-O2"] + profile_c_flags(profile)
+        self.host = HostBuild("pgo", generator, self.out_dir, "pgo_driver.cpp", self.nim_flags, self.c_flags,
+                              pgo_config.get('cc', 'clang'), pgo_config.get('cxx', 'clang++'), nim_lib_path)
+
+        if not generator.discover_functions():
+            raise ValueError("No exported functions found")
+        self.scenarios = load_scenarios(scenarios_file)
+        if not self.scenarios:
+            raise ValueError(f"{scenarios_file}: no scenarios")
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def profile_path(self) -> Path:
+        return self.out_dir / PROFILE_FILE
+
+    def build_graph(self, graph: TaskGraph) -> TaskGraph:
+        """Populate `graph` with the training (and optional measuring) tasks."""
+        graph.add(BuildTask("pgo-driver", self._write_driver,
+                            description=f"Generate {self.out_dir.name}/driver/pgo_driver.cpp"))
+        graph.add(BuildTask("nim-compile:host", self._compile_nim, description=" ".join(self.host.nim_command())))
+
+        variants = ["instrumented"] + (["baseline", "optimized"] if self.measure else [])
+        for variant in variants:
+            deps = ["nim-compile:host", "pgo-driver"] + (["pgo-merge"] if variant == "optimized" else [])
+            graph.add(BuildTask(self.host.objects_task(variant),
+                                self.host.objects_action(variant, self._variant_flags(variant)), deps=deps,
+                                description=f"{self.host.cc} -c {' '.join(self._variant_flags(variant))} (per C file)"))
+            graph.add(BuildTask(self.host.link_task(variant),
+                                self.host.link_action(variant, INSTRUMENT_FLAGS if variant == "instrumented" else []),
+                                deps=[self.host.objects_task(variant)],
+                                description=f"{self.host.cxx} -o {self.host.binary(variant)}"))
+
+        train_tasks = []
+        for scenario in self.scenarios:
+            name = f"pgo-train:{scenario['name']}"
+            graph.add(BuildTask(name, self._train_action(scenario['name']),
+                                deps=[self.host.link_task("instrumented")],
+                                description=f"LLVM_PROFILE_FILE=raw/{scenario['name']}-%p.profraw"))
+            train_tasks.append(name)
+
+        graph.add(BuildTask("pgo-merge", self._merge, deps=train_tasks,
+                            description=f"{' '.join(profdata_command(self.config))} merge -output={self.profile_path}"))
+        graph.add(BuildTask("pgo-install", self._install, deps=["pgo-merge"],
+                            description=f"Copy {PROFILE_FILE} into android/src/main/cpp"))
+
+        if self.measure:
+            graph.add(BuildTask("pgo-measure", self._measure,
+                                deps=[self.host.link_task("baseline"), self.host.link_task("optimized")],
+                                description=f"Best of {self.measure_runs} runs per scenario, baseline vs. optimized"))
+        return graph
+
+    def _compile_nim(self) -> None:
+        self.host.compile_nim()
+        shutil.rmtree(self.out_dir / "raw", ignore_errors=True)
+
+    def _write_driver(self) -> None:
+        driver_dir = self.host.driver_dir
+        driver_dir.mkdir(parents=True, exist_ok=True)
+        context = {"event_channels": self.generator.event_channels,
+                   "handle_types": self.generator.handle_types, "constants": self.generator.constants,
+                   "scratch": self.generator.scratch}
+        functions = self.generator.functions
+        (driver_dir / f"{self.config.library_name}.h").write_text(
+            CppWrapperGenerator(functions, self.config, **context).generate())
+        (driver_dir / "pgo_driver.cpp").write_text(
+            PgoDriverGenerator(functions, self.config, self.scenarios, **context).generate())
+
+    def _variant_flags(self, variant: str) -> List[str]:
+        if variant == "instrumented":
+            return self.c_flags + INSTRUMENT_FLAGS
+        if variant == "optimized":
+            return self.c_flags + [f"-fprofile-instr-use={self.profile_path}"]
+        return list(self.c_flags)
+
+    def _train_action(self, scenario: str) -> Callable[[], None]:
+        def action() -> None:
+            raw_dir = self.out_dir / "raw"
+            raw_dir.mkdir(parents=True, exist_ok=True)
+            run_command([str(self.host.binary("instrumented")), scenario], self.nim_dir,
+                        env={"LLVM_PROFILE_FILE": str(raw_dir / f"{scenario}-%p.profraw")})
+        return action
+
+    def _merge(self) -> None:
+        raw = sorted(str(path) for path in (self.out_dir / "raw").glob("*.profraw"))
+        if not raw:
+            raise BuildError("Training produced no .profraw files")
+        run_command([*profdata_command(self.config), "merge", f"-output={self.profile_path}", *raw], self.nim_dir)
+
+    def _install(self) -> None:
+        if self.config.generate_android:
+            cpp_dir = self.generator.output_dir / "android" / "src" / "main" / "cpp"
+            cpp_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(self.profile_path, cpp_dir / PROFILE_FILE)
+
+    def _measure(self) -> None:
+        for variant in ("baseline", "optimized"):
+            best: Dict[str, float] = {}
+            for _ in range(self.measure_runs):
+                for line in run_command([str(self.host.binary(variant))], self.nim_dir).splitlines():
+                    name, _, millis = line.rpartition(" ")
+                    if name:
+                        best[name] = min(best.get(name, float("inf")), float(millis))
+            self.timings[variant] = best
+
+    def print_report(self) -> None:
+        """Print the merged profile location and, when measured, per-scenario speedups."""
+        print(f"\nPGO profile: {self.profile_path}")
+        print(f"  Build profile flags: {' '.join(self.nim_flags)} | C: {' '.join(self.c_flags)}")
+        if not self.timings:
+            return
+        baseline, optimized = self.timings.get("baseline", {}), self.timings.get("optimized", {})
+        print(f"\n  {'Scenario':<24} {'Baseline':>12} {'PGO':>12} {'Speedup':>8}")
+        for name in baseline:
+            if name in optimized and optimized[name] > 0:
+                print(f"  {name:<24} {baseline[name]:>10.2f}ms {optimized[name]:>10.2f}ms "
+                      f"{baseline[name] / optimized[name]:>7.2f}x")
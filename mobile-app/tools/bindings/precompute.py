@@ -0,0 +1,92 @@
+"""
+Build-time evaluation of `@precompute` exports.
+
+Builds the Nim core for the host together with a generated driver that calls
+every annotated export over its range, and stores the results with a digest
+of the Nim sources in the tables file the bridge generators read.
+"""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+from .build import BuildError, BuildTask, TaskGraph, run_command
+from .generators import CppWrapperGenerator
+from .generators.pgo import profile_c_flags, profile_nim_flags, resolve_build_profile
+from .generators.precompute import (
+    PrecomputeDriverGenerator, precompute_dir, precompute_eligible, precompute_range, sources_digest,
+    tables_path,
+)
+from .host import HostBuild
+from .orchestrator import BindingGenerator
+
+
+class PrecomputePipeline:
+    """Task graph evaluating the `@precompute` exports of a BindingGenerator."""
+
+    def __init__(self, generator: BindingGenerator, nim_lib_path: Optional[Path] = None):
+        self.generator = generator
+        self.config = generator.config
+        self.out_dir = precompute_dir(self.config, generator.base_dir)
+        self.tables_path = tables_path(self.config, generator.base_dir)
+
+        precompute_config = self.config.data.get('precompute', {})
+        profile = resolve_build_profile(self.config)
+        self.host = HostBuild("precompute", generator, self.out_dir, "precompute_driver.cpp",
+                              profile_nim_flags(self.config, profile), ["-O2"] + profile_c_flags(profile),
+                              precompute_config.get('cc', 'cc'), precompute_config.get('cxx', 'c++'), nim_lib_path)
+
+        if not generator.discover_functions():
+            raise ValueError("No exported functions found")
+        self.targets = [func for func in generator.functions
+                        if 'precompute' in func.annotations and precompute_eligible(func)]
+        if not self.targets:
+            raise ValueError("No exports annotated @precompute(lo..hi) taking one integer")
+        # Digest of the sources being compiled, checked by the generator before using the tables
+        self.digest = sources_digest(generator.nim_sources())
+        self.tables = {}
+
+    def build_graph(self, graph: TaskGraph) -> TaskGraph:
+        graph.add(BuildTask("precompute-driver", self._write_driver,
+                            description=f"Generate {self.out_dir.name}/driver/{self.host.driver}"))
+        graph.add(BuildTask("nim-compile:host", self.host.compile_nim, description=" ".join(self.host.nim_command())))
+        graph.add(BuildTask(self.host.objects_task("evaluate"),
+                            self.host.objects_action("evaluate", self.host.c_flags), deps=["nim-compile:host", "precompute-driver"],
+                            description=f"{self.host.cc} -c {' '.join(self.host.c_flags)} (per C file)"))
+        graph.add(BuildTask(self.host.link_task("evaluate"), self.host.link_action("evaluate"),
+                            deps=[self.host.objects_task("evaluate")],
+                            description=f"{self.host.cxx} -o {self.host.binary('evaluate')}"))
+        graph.add(BuildTask("precompute-tables", self._write_tables, deps=[self.host.link_task("evaluate")],
+                            description=f"Evaluate {len(self.targets)} exports into {self.tables_path.name}"))
+        return graph
+
+    def _write_driver(self) -> None:
+        self.host.driver_dir.mkdir(parents=True, exist_ok=True)
+        context = {"event_channels": self.generator.event_channels,
+                   "handle_types": self.generator.handle_types, "constants": self.generator.constants}
+        functions = self.generator.functions
+        (self.host.driver_dir / f"{self.config.library_name}.h").write_text(
+            CppWrapperGenerator(functions, self.config, **context).generate())
+        (self.host.driver_dir / self.host.driver).write_text(
+            PrecomputeDriverGenerator(functions, self.config, **context).generate())
+
+    def _write_tables(self) -> None:
+        output = run_command([str(self.host.binary("evaluate"))], self.generator.nim_dir)
+        try:
+            tables = json.loads(output)
+        except json.JSONDecodeError as e:
+            raise BuildError(f"Precompute driver printed invalid JSON: {e}")
+        for func in self.targets:
+            lo, hi = precompute_range(func)
+            if len(tables.get(func.name, {}).get('values', [])) != hi - lo + 1:
+                raise BuildError(f"Precompute driver returned no complete table for {func.name}")
+        self.tables = tables
+        self.tables_path.parent.mkdir(parents=True, exist_ok=True)
+        self.tables_path.write_text(json.dumps({"digest": self.digest, "tables": tables}, indent=2) + "\n")
+
+    def print_report(self) -> None:
+        print(f"\nPrecomputed tables: {self.tables_path}")
+        for func in self.targets:
+            lo, hi = precompute_range(func)
+            print(f"  {func.js_name or func.name}: {lo}..{hi} ({hi - lo + 1} entries)")
+        print("Regenerate the bindings (make nim-bindings) to embed them.")
@@ -0,0 +1,61 @@
+"""
+Sync call timing reports used to pick functions for async variants.
+"""
+
+import json
+import math
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _entry_p95_ms(entry: dict):
+    """p95 in milliseconds from a report entry, or None if it has no timings."""
+    samples = entry.get('samplesUs')
+    if samples:
+        return percentile(samples, 95) / 1000.0
+    if 'p95Ms' in entry:
+        return float(entry['p95Ms'])
+    if 'p95Us' in entry:
+        return float(entry['p95Us']) / 1000.0
+    return None
+
+
+def load_p95_ms(paths: Iterable[Path]) -> Dict[str, float]:
+    """Worst p95 per function across reports.
+
+    Accepts the bridge's sync budget report (`{"functions": {name: {...}}}`),
+    a plain `{name: {...}}` mapping, or a host benchmark list
+    `[{"name": ..., ...}]`. Entries carry `samplesUs`, `p95Ms` or `p95Us`.
+    """
+    result = {}
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Warning: ignoring budget report {path}: {e}")
+            continue
+
+        if isinstance(data, dict) and isinstance(data.get('functions'), dict):
+            entries = data['functions'].items()
+        elif isinstance(data, dict):
+            entries = data.items()
+        elif isinstance(data, list):
+            entries = [(entry.get('name'), entry) for entry in data if isinstance(entry, dict)]
+        else:
+            entries = []
+
+        for name, entry in entries:
+            if not name or not isinstance(entry, dict):
+                continue
+            p95 = _entry_p95_ms(entry)
+            if p95 is not None:
+                result[name] = max(result.get(name, 0.0), p95)
+    return result
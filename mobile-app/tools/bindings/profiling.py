@@ -0,0 +1,194 @@
+"""
+Phase profiling of a generation run (`generate_bindings.py --profile`).
+
+Each phase (config load, discovery, the parse of each Nim file, the render
+and the write of each output, ...) records wall time, the CPU time of its
+thread and the peak Python heap while it ran (tracemalloc). The phases are
+written as JSON and as a Chrome trace-event file, which opens in
+chrome://tracing or https://ui.perfetto.dev. With `python=True` a cProfile of
+the run is written too, and its hottest functions go into the JSON.
+
+Peak memory is exact for properly nested phases. tracemalloc keeps a single
+peak for the whole process, so `--profile` runs the generators on one worker
+unless `-j` says otherwise.
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_PROFILE_DIR = "build/profile"
+HOTSPOT_COUNT = 25
+
+
+class Phase:
+    """One timed span; `peak` is the tracemalloc peak while it ran."""
+
+    def __init__(self, name: str, category: str, args: dict):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.thread = threading.get_ident()
+        self.thread_name = threading.current_thread().name
+        self.start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        self.memory_start = tracemalloc.get_traced_memory()[0]
+        self.peak = self.memory_start
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.allocated = 0
+
+
+class Profiler:
+    """Records phases when enabled; `phase()` costs next to nothing otherwise."""
+
+    def __init__(self, enabled: bool = False, python: bool = False):
+        self.enabled = enabled
+        self.python = python and enabled
+        self.phases: List[Phase] = []
+        self._stacks = threading.local()
+        self._lock = threading.Lock()
+        self._origin = 0.0
+        self._cpu_origin = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = 0
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        tracemalloc.start()
+        self._origin = time.perf_counter()
+        self._cpu_origin = time.process_time()
+        if self.python:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> None:
+        if not self.enabled:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+        self.wall = time.perf_counter() - self._origin
+        self.cpu = time.process_time() - self._cpu_origin
+        # Phases reset the tracemalloc peak, so the run's peak is the largest one seen
+        self.peak = max([tracemalloc.get_traced_memory()[1]] + [phase.peak for phase in self.phases])
+        tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def phase(self, name: str, category: str, **args):
+        if not self.enabled:
+            yield
+            return
+        stack = getattr(self._stacks, 'phases', None)
+        if stack is None:
+            stack = self._stacks.phases = []
+        if stack:
+            # The parent's peak so far is kept before the child restarts the measurement
+            stack[-1].peak = max(stack[-1].peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        phase = Phase(name, category, args)
+        stack.append(phase)
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            phase.wall = time.perf_counter() - phase.start
+            phase.cpu = time.thread_time() - phase.cpu_start
+            phase.allocated = current - phase.memory_start
+            phase.peak = max(phase.peak, peak)
+            stack.pop()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, phase.peak)
+            with self._lock:
+                self.phases.append(phase)
+
+    def _thread_ids(self) -> Dict[int, Tuple[int, str]]:
+        """Small stable ids (and names) for the threads, in order of first appearance."""
+        ids: Dict[int, Tuple[int, str]] = {}
+        for phase in sorted(self.phases, key=lambda phase: phase.start):
+            ids.setdefault(phase.thread, (len(ids) + 1, phase.thread_name))
+        return ids
+
+    def hotspots(self) -> List[dict]:
+        if self._profile is None:
+            return []
+        stats = pstats.Stats(self._profile, stream=io.StringIO())
+        rows = []
+        for (file, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({"function": f"{Path(file).name}:{line}({function})", "calls": calls,
+                         "self_ms": round(tottime * 1000, 3), "cumulative_ms": round(cumtime * 1000, 3)})
+        rows.sort(key=lambda row: row["self_ms"], reverse=True)
+        return rows[:HOTSPOT_COUNT]
+
+    def report(self) -> dict:
+        threads = self._thread_ids()
+        phases = [{
+            "name": phase.name, "category": phase.category, "thread": threads[phase.thread][0],
+            "start_ms": round((phase.start - self._origin) * 1000, 3),
+            "wall_ms": round(phase.wall * 1000, 3), "cpu_ms": round(phase.cpu * 1000, 3),
+            "allocated_bytes": phase.allocated, "peak_bytes": phase.peak, **({"args": phase.args} if phase.args else {}),
+        } for phase in sorted(self.phases, key=lambda phase: phase.start)]
+        totals = {"wall_ms": round(self.wall * 1000, 3), "cpu_ms": round(self.cpu * 1000, 3),
+                  "peak_traced_bytes": self.peak}
+        if resource is not None:
+            # ru_maxrss is in KiB on Linux and in bytes on macOS
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            totals["peak_rss_bytes"] = rss if sys.platform == "darwin" else rss * 1024
+        return {"totals": totals, "phases": phases, "hotspots": self.hotspots()}
+
+    def chrome_trace(self) -> dict:
+        """Complete ("X") events per phase plus thread names, in microseconds."""
+        threads = self._thread_ids()
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in threads.values()]
+        for phase in self.phases:
+            events.append({
+                "name": phase.name, "cat": phase.category, "ph": "X", "pid": pid, "tid": threads[phase.thread][0],
+                "ts": round((phase.start - self._origin) * 1e6, 1), "dur": round(phase.wall * 1e6, 1),
+                "args": {"cpu_ms": round(phase.cpu * 1000, 3), "peak_bytes": phase.peak,
+                         "allocated_bytes": phase.allocated, **phase.args},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, directory: Path) -> List[Path]:
+        """Write profile.json, trace.json and (with cProfile) generation.prof into `directory`."""
+        directory.mkdir(parents=True, exist_ok=True)
+        written = [directory / "profile.json", directory / "trace.json"]
+        written[0].write_text(json.dumps(self.report(), indent=2) + "\n")
+        written[1].write_text(json.dumps(self.chrome_trace()) + "\n")
+        if self._profile is not None:
+            written.append(directory / "generation.prof")
+            self._profile.dump_stats(str(written[-1]))
+        return written
+
+    def print_report(self, limit: int = 15) -> None:
+        report = self.report()
+        totals = report["totals"]
+        print(f"\nProfile: {totals['wall_ms']:.0f} ms wall, {totals['cpu_ms']:.0f} ms CPU, "
+              f"peak Python heap {totals['peak_traced_bytes'] / 1024:.0f} KiB"
+              + (f", peak RSS {totals['peak_rss_bytes'] / 1048576:.1f} MiB" if 'peak_rss_bytes' in totals else ""))
+        print(f"  {'phase':<48} {'wall ms':>9} {'cpu ms':>9} {'peak KiB':>9}")
+        for phase in sorted(report["phases"], key=lambda phase: phase["wall_ms"], reverse=True)[:limit]:
+            print(f"  {phase['name'][:48]:<48} {phase['wall_ms']:>9.1f} {phase['cpu_ms']:>9.1f} "
+                  f"{phase['peak_bytes'] / 1024:>9.0f}")
+        if report["hotspots"]:
+            print("  Hottest functions (self time):")
+            for row in report["hotspots"][:10]:
+                print(f"    {row['self_ms']:>9.1f} ms  {row['calls']:>8}  {row['function']}")
@@ -0,0 +1,114 @@
+"""
+JS call-site analysis for dead-export elimination.
+
+Finds the names the app's TypeScript/JavaScript sources use on the bridge
+module: member accesses (`NimCore.fibonacci(...)`, `NimCore['isPrime']`) and
+destructuring (`const { factorize } = NimCore`) of every binding imported
+from the generated module. The analysis is conservative: computed member
+access or passing the module object around makes every export reachable.
+"""
+
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+SOURCE_SUFFIXES = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs')
+SKIPPED_DIRS = ('node_modules', '.git', 'build', 'dist', 'Pods')
+
+IMPORT = re.compile(r'import\s+(?!type\b)([^;]*?)\s+from\s+[\'"]([^\'"]+)[\'"]', re.DOTALL)
+REQUIRE = re.compile(r'(?:const|let|var)\s+(\w+|\{[^}]*\})\s*=\s*require\(\s*[\'"]([^\'"]+)[\'"]\s*\)')
+STRING_KEY = re.compile(r'\s*[\'"](\w+)[\'"]\s*\]')
+
+
+def source_files(paths: Iterable[Path], exclude: Iterable[Path] = ()) -> List[Path]:
+    """TS/JS files under `paths`, skipping dependency and build directories and `exclude`."""
+    excluded = [path.resolve() for path in exclude]
+    files = []
+    for path in paths:
+        candidates = [path] if path.is_file() else sorted(path.rglob('*')) if path.is_dir() else []
+        for candidate in candidates:
+            if candidate.suffix not in SOURCE_SUFFIXES or not candidate.is_file():
+                continue
+            if any(part in SKIPPED_DIRS for part in candidate.parts):
+                continue
+            resolved = candidate.resolve()
+            if any(resolved == root or root in resolved.parents for root in excluded):
+                continue
+            files.append(candidate)
+    return files
+
+
+class CallSiteScanner:
+    """Collects the module members used by the app; `dynamic_uses` lists why analysis gave up."""
+
+    def __init__(self, module_specifier: str, identifiers: Iterable[str] = ()):
+        self.module_specifier = module_specifier
+        self.identifiers = set(identifiers)
+        self.used: Set[str] = set()
+        self.dynamic_uses: List[str] = []
+
+    def scan(self, files: Iterable[Path]) -> Optional[Set[str]]:
+        """Names used on the module, or None when some use cannot be resolved statically."""
+        for path in files:
+            try:
+                self._scan_source(path.read_text(errors='replace'), path.name)
+            except OSError as e:
+                print(f"Warning: cannot read {path}: {e}")
+        return None if self.dynamic_uses else self.used
+
+    def _module_bindings(self, source: str) -> Set[str]:
+        bindings = set(self.identifiers)
+        for match in list(IMPORT.finditer(source)) + list(REQUIRE.finditer(source)):
+            clause, specifier = match.groups()
+            if self.module_specifier not in specifier:
+                continue
+            for part in re.split(r',(?![^{]*})', clause):
+                part = part.strip()
+                if part.startswith('{'):
+                    for name in part.strip('{}').split(','):
+                        name = name.strip()
+                        if not name or name.startswith('type '):
+                            continue
+                        local = name.split(':')[-1].split(' as ')[-1].strip()
+                        # Names imported from the module are either the module object or a member of it
+                        bindings.add(local)
+                        self.used.add(name.split(':')[0].split(' as ')[0].strip())
+                elif part.startswith('* as '):
+                    bindings.add(part[len('* as '):].strip())
+                elif re.fullmatch(r'\w+', part):
+                    bindings.add(part)
+        return bindings
+
+    def _scan_source(self, source: str, file_name: str) -> None:
+        statements = [match.span() for match in list(IMPORT.finditer(source)) + list(REQUIRE.finditer(source))]
+        for binding in self._module_bindings(source):
+            pattern = re.compile(rf'(?<![\w.$]){re.escape(binding)}\b')
+            for match in pattern.finditer(source):
+                if not any(start <= match.start() < end for start, end in statements):
+                    self._classify_use(source, match.end(), binding, file_name)
+
+    def _classify_use(self, source: str, end: int, binding: str, file_name: str) -> None:
+        rest = source[end:end + 200]
+        member = re.match(r'\s*(?:\?\.|\.)\s*(\w+)', rest)
+        if member:
+            self.used.add(member.group(1))
+            return
+        if re.match(r'\s*(?:\?\.)?\[', rest):
+            key = STRING_KEY.match(rest[rest.index('[') + 1:])
+            if key:
+                self.used.add(key.group(1))
+            else:
+                self.dynamic_uses.append(f"{file_name}: computed access on {binding}")
+            return
+
+        before = source[:end - len(binding)].rstrip()
+        destructure = re.search(r'\{([^{}]*)\}\s*=\s*$', before)
+        if destructure:
+            for name in destructure.group(1).split(','):
+                name = name.split(':')[0].split('=')[0].strip().lstrip('.')
+                if name:
+                    self.used.add(name)
+            return
+        if before.endswith(('typeof', 'keyof')):
+            return
+        self.dynamic_uses.append(f"{file_name}: {binding} used as a value")
@@ -0,0 +1,154 @@
+"""
+Long-lived generation server for build-system integration.
+
+Gradle tasks, Xcode build phases and the scaffolder otherwise start a fresh
+`generate_bindings.py` for every build, paying for interpreter startup,
+imports and a full parse each time. The server keeps one BindingGenerator
+warm (parsed Nim files and fragment caches in memory) and answers requests
+on a Unix socket. `tools/bindings_client.py` talks to it and falls back to
+the one-shot CLI when no server is running. Requests are handled one at a
+time.
+
+Operations:
+
+- `ping`: is the server up, and for which config.
+- `generate`: write the bindings. Returns the written files, the unchanged
+  count and the log.
+- `check`: render in memory. Returns the outputs that differ from the files
+  on disk.
+- `render`: return every output as {path: content}.
+- `shutdown`: stop the server.
+"""
+
+import contextlib
+import io
+import json
+import os
+import socketserver
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from .client import request, socket_path
+from .config import GeneratorConfig
+from .orchestrator import BindingGenerator
+
+
+def stale_outputs(files: Dict[Path, str]) -> list:
+    """Rendered outputs whose file is missing or has different content."""
+    stale = []
+    for path, text in files.items():
+        try:
+            current = path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            current = None
+        if current != text:
+            stale.append(path)
+    return stale
+
+
+class GenerationServer(socketserver.UnixStreamServer):
+    """Answers generation requests from one warm BindingGenerator."""
+
+    def __init__(self, config_file: Path, configure: Callable[[GeneratorConfig], None], path: Path):
+        self.config_file = config_file
+        self.configure = configure
+        self.generator: Optional[BindingGenerator] = None
+        self._config_stamp = None
+        self.stopping = False
+        super().__init__(str(path), _RequestHandler)
+
+    def warm_generator(self) -> BindingGenerator:
+        """The generator, rebuilt whenever the config file changed."""
+        stat = self.config_file.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if self.generator is None or stamp != self._config_stamp:
+            config = GeneratorConfig.from_file(self.config_file)
+            self.configure(config)
+            self.generator = BindingGenerator(config)
+            self.generator.parse_cache = {}
+            self._config_stamp = stamp
+        return self.generator
+
+    def handle_request_data(self, data: dict) -> dict:
+        op = data.get('op')
+        if op == 'ping':
+            return {"ok": True, "pid": os.getpid(), "config": str(self.config_file)}
+        if op == 'shutdown':
+            self.stopping = True
+            return {"ok": True}
+        if op not in ('generate', 'check', 'render'):
+            return {"ok": False, "error": f"unknown op {op!r}"}
+
+        start = time.perf_counter()
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            try:
+                generator = self.warm_generator()
+                generator.quiet = True
+                if not generator.discover_functions():
+                    return {"ok": False, "error": "no exported functions", "log": log.getvalue()}
+                if op == 'generate':
+                    generator.generate_all(compare_dispatch=False)
+                    response = {"written": [str(path) for path in generator.written_files],
+                                "unchanged": len(generator.generated_files) - len(generator.written_files)}
+                    failed = len(generator.generated_files) < len(generator.generation_timings)
+                else:
+                    files = generator.render()
+                    if op == 'check':
+                        response = {"stale": [str(path) for path in stale_outputs(files)]}
+                    else:
+                        response = {"files": {str(path): text for path, text in files.items()}}
+                    failed = False
+            except Exception as e:
+                return {"ok": False, "error": f"{type(e).__name__}: {e}", "log": log.getvalue()}
+        response.update({"ok": not failed, "log": log.getvalue(),
+                         "ms": round((time.perf_counter() - start) * 1000, 1)})
+        return response
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            data = json.loads(line)
+        except ValueError:
+            response = {"ok": False, "error": "request is not a JSON line"}
+        else:
+            response = self.server.handle_request_data(data)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def serve(config_file: Path, configure: Callable[[GeneratorConfig], None]) -> int:
+    """Run the generation server in the foreground until shut down or interrupted."""
+    try:
+        config = GeneratorConfig.from_file(config_file)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    path = socket_path(config.data, BindingGenerator(config).base_dir)
+    if path.exists():
+        try:
+            running = request(path, 'ping', timeout=5)
+        except OSError:
+            running = None
+        if running:
+            print(f"Error: a generation server (pid {running.get('pid')}) is already listening on {path}")
+            return 1
+        path.unlink()  # left behind by a server that did not shut down cleanly
+
+    server = GenerationServer(config_file, configure, path)
+    try:
+        generator = server.warm_generator()
+        generator.quiet = True
+        generator.discover_functions()  # fills the parse cache before the first request
+        print(f"Generation server for {generator.base_dir} listening on {path} (Ctrl-C to stop)")
+        while not server.stopping:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+    print("Generation server stopped")
+    return 0
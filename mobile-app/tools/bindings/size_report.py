@@ -0,0 +1,402 @@
+"""
+Per-export native code size and load-cost report.
+
+Reads the built objects, archives and shared libraries with the pure-Python
+ELF reader and attributes their bytes to the exports of the bridge:
+
+- Relocatable objects (`.o`, `.a` members) are linked into one reference
+  graph, with one edge per relocation. An export owns its Nim symbol, its JNI
+  wrappers and every function and data object that only it reaches. Bytes
+  reached from several exports, or from other entry points (JNI_OnLoad,
+  dispatch trampolines, NimMain), are reported as shared.
+- Shared libraries have their references resolved at link time, so only the
+  export's own symbols are attributed. Their load cost is the number of
+  dynamic symbols and of dynamic relocations in the export's data.
+
+`relocs` counts the fixups in an export's code and data, and `imports` the
+distinct undefined symbols they reference. Both are proxies for work the
+dynamic loader does at startup.
+"""
+
+import bisect
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .elf import (
+    AR_MAGIC, ELF_MAGIC, ET_DYN, ET_EXEC, ET_REL, SHN_ABS, SHN_COMMON, SHN_UNDEF, SHT_ANDROID_REL,
+    SHT_ANDROID_RELA, SHT_ANDROID_RELR, STB_GLOBAL, STB_LOCAL, STT_COMMON, STT_FUNC, STT_OBJECT, STT_SECTION,
+    STT_TLS, STV_DEFAULT, THIN_AR_MAGIC, ElfFile, read_archive,
+)
+from .generators.android import AndroidKotlinGenerator, jni_class_name
+from .models import NimFunction
+
+DEFAULT_INPUTS = [
+    "modules/nim-bridge/android/build/intermediates/cxx/*/*/obj/{abi}/lib{library}.so",
+    "modules/nim-bridge/android/.cxx/*/*/{abi}/CMakeFiles/{library}.dir/**/*.o",
+]
+DEFAULT_BASELINE = "tools/size_baseline.json"
+DEFAULT_MAX_GROWTH_BYTES = 64
+DEFAULT_MAX_GROWTH_PERCENT = 5.0
+
+SIZE_METRICS = ('code', 'data', 'wrapper')
+COUNT_METRICS = ('relocs', 'imports', 'dynsym', 'dyn_relocs')
+ROOT_SECTIONS = ('.init_array', '.fini_array', '.ctors', '.dtors', '.preinit_array')
+# Symbols landing this close before a relocation target still own it (PC-relative addend bias)
+TARGET_SLACK = 8
+SHARED = "(shared)"
+
+
+def report_inputs(config, base_dir: Path, abi: Optional[str] = None) -> List[Path]:
+    """Files matching `size_report.inputs` for `abi` (default: first configured ABI)."""
+    abi = abi or (config.data.get('cmake', {}).get('android_abis') or ["arm64-v8a"])[0]
+    patterns = config.data.get('size_report', {}).get('inputs', DEFAULT_INPUTS)
+    paths = []
+    for pattern in patterns:
+        pattern = pattern.format(abi=abi, library=config.library_name)
+        root = Path(pattern).anchor
+        matches = sorted(Path(root).glob(pattern[len(root):]) if root else base_dir.glob(pattern))
+        paths.extend(path for path in matches if path not in paths)
+    return paths
+
+
+def wrapper_symbols(config, func: NimFunction) -> List[str]:
+    """JNI entry points generated for an export (iOS wrappers live in Mach-O objects)."""
+    class_name = jni_class_name(config)
+    names = [f"Java_{class_name}_native{func.name[0].upper()}{func.name[1:]}"]
+    if func.vector_variant:
+        names.append(f"Java_{class_name}_{AndroidKotlinGenerator._vector_native_name(func)}")
+    return names
+
+
+@dataclass
+class _Node:
+    name: str
+    size: int
+    code: bool
+    exported: bool = False
+    relocs: int = 0
+    edges: Set[int] = field(default_factory=set)
+    imports: Set[str] = field(default_factory=set)
+
+
+class _ObjectGraph:
+    """Reference graph over the functions and data of a set of relocatable objects."""
+
+    def __init__(self):
+        self.nodes: List[_Node] = []
+        self.globals: Dict[str, int] = {}
+        self.roots: List[int] = []
+        self._starts: Dict[tuple, List[int]] = {}
+        self._ids: Dict[tuple, List[int]] = {}
+        self._rest: Dict[tuple, int] = {}
+        self._weak: Set[str] = set()
+
+    def _add(self, node: _Node) -> int:
+        self.nodes.append(node)
+        return len(self.nodes) - 1
+
+    def add_object(self, unit: int, elf: ElfFile) -> None:
+        weak = self._weak
+        for section in elf.sections:
+            if not section.allocated or section.size == 0:
+                continue
+            key = (unit, section.index)
+            symbols = sorted((sym for sym in elf.symbols
+                              if sym.shndx == section.index and sym.size > 0
+                              and sym.type in (STT_FUNC, STT_OBJECT, STT_TLS)),
+                             key=lambda sym: (sym.value, sym.bind == STB_LOCAL))
+            starts, ids, covered = [], [], 0
+            for sym in symbols:
+                if starts and starts[-1] == sym.value:
+                    node_id = ids[-1]  # alias of the previous symbol
+                else:
+                    node_id = self._add(_Node(sym.name, sym.size, section.executable))
+                    starts.append(sym.value)
+                    ids.append(node_id)
+                    covered += sym.size
+                if sym.bind != STB_LOCAL:
+                    self.nodes[node_id].exported |= sym.visibility == STV_DEFAULT
+                    if sym.name not in self.globals or sym.name in weak:
+                        self.globals[sym.name] = node_id
+                        weak.discard(sym.name)
+                        if sym.bind != STB_GLOBAL:
+                            weak.add(sym.name)
+            self._starts[key], self._ids[key] = starts, ids
+            # Bytes no symbol covers: string literals, constant pools, padding
+            rest = self._add(_Node(f"({section.name})", max(0, section.size - covered), section.executable))
+            self._rest[key] = rest
+            if section.name.startswith(ROOT_SECTIONS):
+                self.roots.extend(ids + [rest])
+
+        for sym in elf.symbols:
+            if sym.shndx == SHN_COMMON or (sym.type == STT_COMMON and sym.defined):
+                if sym.name not in self.globals:
+                    node_id = self._add(_Node(sym.name, sym.size, False, exported=sym.visibility == STV_DEFAULT))
+                    self.globals[sym.name] = node_id
+
+    def locate(self, unit: int, shndx: int, offset: int) -> Optional[int]:
+        key = (unit, shndx)
+        if key not in self._starts:
+            return None
+        starts, ids = self._starts[key], self._ids[key]
+        index = bisect.bisect_right(starts, offset) - 1
+        if index >= 0 and offset < starts[index] + self.nodes[ids[index]].size:
+            return ids[index]
+        if index + 1 < len(starts) and starts[index + 1] - offset <= TARGET_SLACK:
+            return ids[index + 1]
+        return self._rest[key]
+
+    def add_references(self, unit: int, elf: ElfFile) -> None:
+        for section in elf.relocation_sections():
+            target_section = section.info
+            if target_section >= len(elf.sections) or not elf.sections[target_section].allocated:
+                continue
+            for reloc in elf.relocations(section):
+                source = self.locate(unit, target_section, reloc.offset)
+                if source is None or reloc.symbol == 0 or reloc.symbol >= len(elf.symbols):
+                    continue
+                node = self.nodes[source]
+                node.relocs += 1
+                sym = elf.symbols[reloc.symbol]
+                if sym.shndx == SHN_UNDEF or sym.shndx == SHN_COMMON:
+                    target = self.globals.get(sym.name)
+                    if target is None:
+                        node.imports.add(sym.name)
+                elif sym.shndx == SHN_ABS:
+                    continue
+                elif sym.type == STT_SECTION:
+                    target = self.locate(unit, sym.shndx, max(0, sym.value + (reloc.addend or 0)))
+                elif sym.bind != STB_LOCAL and sym.name in self.globals:
+                    # Interposable definitions resolve to the winning copy
+                    target = self.globals[sym.name]
+                else:
+                    target = self.locate(unit, sym.shndx, sym.value)
+                if target is not None and target != source:
+                    node.edges.add(target)
+
+    def reachable(self, roots: Iterable[int]) -> Set[int]:
+        seen = set(roots)
+        queue = deque(seen)
+        while queue:
+            for target in self.nodes[queue.popleft()].edges:
+                if target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+        return seen
+
+
+class SizeReport:
+    """Collects ELF inputs and attributes their size to the exports of `functions`."""
+
+    def __init__(self, functions: List[NimFunction], config):
+        self.functions = functions
+        self.config = config
+        self.graph = _ObjectGraph()
+        self.object_inputs: List[str] = []
+        self.shared: Dict[str, ElfFile] = {}
+        self.skipped: List[str] = []
+        self._objects: List[ElfFile] = []
+
+    def add_input(self, path: Path) -> None:
+        data = path.read_bytes()
+        if data.startswith(AR_MAGIC) or data.startswith(THIN_AR_MAGIC):
+            for member, body in read_archive(data, path.name):
+                self._add_elf(body, f"{path.name}({member})")
+        else:
+            self._add_elf(data, path.name)
+
+    def _add_elf(self, data: bytes, name: str) -> None:
+        if not data.startswith(ELF_MAGIC):
+            self.skipped.append(name)
+            return
+        elf = ElfFile(data, name)
+        if elf.type == ET_REL:
+            self.graph.add_object(len(self._objects), elf)
+            self._objects.append(elf)
+            self.object_inputs.append(name)
+        elif elf.type in (ET_DYN, ET_EXEC):
+            self.shared[name] = elf
+        else:
+            self.skipped.append(name)
+
+    def build(self) -> Dict:
+        """{"images": {name: {"inputs", "exports": {jsName: metrics}, "totals"}}, "skipped": [...]}"""
+        images = {}
+        if self._objects:
+            images["objects"] = self._object_image()
+        for name, elf in self.shared.items():
+            images[name] = self._shared_image(elf)
+        return {"images": images, "skipped": self.skipped}
+
+    def _groups(self, resolve) -> Dict[str, Dict[str, List]]:
+        groups = {}
+        for func in self.functions:
+            groups[func.js_name or func.name] = {
+                "export": [node for node in resolve([func.name])],
+                "wrapper": [node for node in resolve(wrapper_symbols(self.config, func))],
+            }
+        return groups
+
+    def _object_image(self) -> Dict:
+        graph = self.graph
+        for unit, elf in enumerate(self._objects):
+            graph.add_references(unit, elf)
+
+        groups = self._groups(lambda names: [graph.globals[name] for name in names if name in graph.globals])
+        owned_roots = {node for group in groups.values() for nodes in group.values() for node in nodes}
+        other_roots = [node_id for node_id, node in enumerate(graph.nodes)
+                       if node.exported and node_id not in owned_roots] + graph.roots
+
+        reach_count: Dict[int, int] = {}
+        reached: Dict[str, Set[int]] = {}
+        for name, group in list(groups.items()) + [(SHARED, {"export": other_roots})]:
+            reached[name] = graph.reachable(node for nodes in group.values() for node in nodes)
+            for node in reached[name]:
+                reach_count[node] = reach_count.get(node, 0) + 1
+
+        exports = {}
+        for name, group in groups.items():
+            exclusive = [node for node in reached[name] if reach_count[node] == 1]
+            wrappers = set(group["wrapper"])
+            imports: Set[str] = set()
+            for node in exclusive:
+                imports |= graph.nodes[node].imports
+            exports[name] = {
+                "code": sum(graph.nodes[node].size for node in exclusive
+                            if graph.nodes[node].code and node not in wrappers),
+                "data": sum(graph.nodes[node].size for node in exclusive if not graph.nodes[node].code),
+                "wrapper": sum(graph.nodes[node].size for node in wrappers),
+                "relocs": sum(graph.nodes[node].relocs for node in exclusive),
+                "imports": len(imports),
+            }
+            if not group["export"]:
+                exports[name]["missing"] = True
+
+        reached_any = set(reach_count)
+        return {
+            "inputs": self.object_inputs,
+            "exports": exports,
+            "totals": {
+                "code": sum(node.size for node in graph.nodes if node.code),
+                "data": sum(node.size for node in graph.nodes if not node.code),
+                "shared": sum(graph.nodes[node].size for node, count in reach_count.items() if count > 1),
+                "unreachable": sum(node.size for node_id, node in enumerate(graph.nodes)
+                                   if node_id not in reached_any),
+                "relocs": sum(node.relocs for node in graph.nodes),
+                "imports": len(set().union(*(node.imports for node in graph.nodes))),
+            },
+        }
+
+    def _shared_image(self, elf: ElfFile) -> Dict:
+        by_name = {sym.name: sym for sym in elf.symbols if sym.defined and sym.size > 0}
+        dynamic = {sym.name for sym in elf.dynamic_symbols if sym.defined}
+        dyn_relocs, packed = [], False
+        for section in elf.relocation_sections():
+            if not section.allocated:
+                continue
+            if section.type in (SHT_ANDROID_REL, SHT_ANDROID_RELA, SHT_ANDROID_RELR):
+                packed = True
+            dyn_relocs.extend(reloc.offset for reloc in elf.relocations(section))
+        dyn_relocs.sort()
+
+        def relocs_in(sym) -> int:
+            if sym.type == STT_FUNC:
+                return 0
+            return bisect.bisect_left(dyn_relocs, sym.value + sym.size) - bisect.bisect_left(dyn_relocs, sym.value)
+
+        groups = self._groups(lambda names: [by_name[name] for name in names if name in by_name])
+        exports = {}
+        for name, group in groups.items():
+            symbols = group["export"] + group["wrapper"]
+            exports[name] = {
+                "code": sum(sym.size for sym in group["export"]),
+                "wrapper": sum(sym.size for sym in group["wrapper"]),
+                "dynsym": sum(1 for sym in symbols if sym.name in dynamic),
+                "dyn_relocs": sum(relocs_in(sym) for sym in symbols),
+            }
+            if not group["export"]:
+                exports[name]["missing"] = True
+
+        totals = {
+            "code": sum(section.size for section in elf.sections if section.allocated and section.executable),
+            "data": sum(section.size for section in elf.sections if section.allocated and not section.executable),
+            "dynsym": len(dynamic),
+            "dyn_relocs": len(dyn_relocs),
+        }
+        report = {"inputs": [elf.name], "exports": exports, "totals": totals}
+        if packed:
+            report["note"] = "Android packed relocations are not decoded; dyn_relocs undercounts"
+        if elf.symbol_section is not None and elf.symbol_section.name == ".dynsym":
+            report["note"] = "stripped: only exported symbols are visible"
+        return report
+
+
+def diff_reports(baseline: Dict, current: Dict, max_growth_bytes: int = DEFAULT_MAX_GROWTH_BYTES,
+                 max_growth_percent: float = DEFAULT_MAX_GROWTH_PERCENT) -> Dict[str, List[str]]:
+    """Changes against `baseline`: {"regressions": [...], "changes": [...]} as printable lines.
+
+    Sizes regress when they grow by more than both thresholds; relocation and
+    symbol counts regress on any growth.
+    """
+    result = {"regressions": [], "changes": []}
+    for image, report in current.get("images", {}).items():
+        base_image = baseline.get("images", {}).get(image)
+        if base_image is None:
+            result["changes"].append(f"{image}: new image")
+            continue
+        rows = [(f"{image} {name}", metrics, base_image["exports"].get(name))
+                for name, metrics in report["exports"].items()]
+        rows.append((f"{image} (total)", report["totals"], base_image["totals"]))
+        for label, metrics, base in rows:
+            if base is None:
+                result["changes"].append(f"{label}: new export")
+                continue
+            for metric, value in metrics.items():
+                if metric not in base or not isinstance(value, int) or isinstance(value, bool):
+                    continue
+                delta = value - base[metric]
+                if delta == 0:
+                    continue
+                line = f"{label} {metric}: {base[metric]} -> {value} ({delta:+d})"
+                if metric in COUNT_METRICS:
+                    regressed = delta > 0
+                else:
+                    percent = delta * 100.0 / base[metric] if base[metric] else float('inf')
+                    regressed = delta > max_growth_bytes and percent > max_growth_percent
+                result["regressions" if regressed else "changes"].append(line)
+        for name in base_image["exports"]:
+            if name not in report["exports"]:
+                result["changes"].append(f"{image} {name}: removed")
+    for image in baseline.get("images", {}):
+        if image not in current.get("images", {}):
+            result["changes"].append(f"{image}: not among the inputs of this run")
+    return result
+
+
+def print_report(report: Dict) -> None:
+    for image, data in report["images"].items():
+        print(f"\n{image} ({len(data['inputs'])} input(s))")
+        if data.get("note"):
+            print(f"  Note: {data['note']}")
+        columns = [metric for metric in SIZE_METRICS + COUNT_METRICS
+                   if any(metric in metrics for metrics in data["exports"].values())]
+        print(f"  {'export':<24}" + "".join(f"{metric:>12}" for metric in columns))
+        ordered = sorted(data["exports"].items(),
+                         key=lambda item: -sum(item[1].get(metric, 0) for metric in SIZE_METRICS))
+        for name, metrics in ordered:
+            suffix = "  (symbol not found)" if metrics.get("missing") else ""
+            print(f"  {name:<24}" + "".join(f"{metrics.get(metric, 0):>12}" for metric in columns) + suffix)
+        print("  totals: " + ", ".join(f"{metric} {value}" for metric, value in data["totals"].items()))
+    if report.get("skipped"):
+        print(f"\nSkipped {len(report['skipped'])} non-ELF input(s): {', '.join(report['skipped'][:5])}"
+              + (" ..." if len(report['skipped']) > 5 else ""))
+
+
+def load_report(path: Path) -> Optional[Dict]:
+    if not path.is_file():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
@@ -0,0 +1,310 @@
+"""
+Watch mode: regenerate the bindings whenever the Nim sources or the config change.
+
+One BindingGenerator stays alive between cycles. It keeps the parsed Nim
+files and the fragment caches in memory, so a cycle only parses the edited
+files and renders the edited exports. Unchanged outputs are not rewritten,
+so Metro reloads only what changed. Changes arrive through inotify on Linux,
+or by polling file stats elsewhere. Bursts of saves are debounced, and a
+file only counts as changed when its content did.
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import struct
+import sys
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .config import GeneratorConfig
+from .orchestrator import BindingGenerator
+from .generators.glue import glue_sources
+from .generators.precompute import tables_path
+
+DEFAULT_DEBOUNCE_MS = 100
+DEFAULT_POLL_INTERVAL_MS = 250
+BACKENDS = ("auto", "inotify", "poll")
+
+
+class WatchRoot(NamedTuple):
+    """Files named like `pattern` in `directory` (and its subdirectories if `recursive`)."""
+    directory: Path
+    pattern: str
+    recursive: bool = False
+
+    def matches(self, path: Path) -> bool:
+        if not fnmatch(path.name, self.pattern):
+            return False
+        if self.recursive:
+            return self.directory in path.parents
+        return path.parent == self.directory
+
+    def files(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        found = self.directory.rglob(self.pattern) if self.recursive else self.directory.glob(self.pattern)
+        return [path for path in found if path.is_file()]
+
+
+def watch_settings(config: GeneratorConfig) -> Tuple[float, float, str]:
+    """(debounce seconds, poll interval seconds, backend) from the `watch` section."""
+    settings = config.data.get('watch', {})
+    backend = settings.get('backend', 'auto')
+    if backend not in BACKENDS:
+        raise ValueError(f"watch.backend must be one of {', '.join(BACKENDS)}, not {backend!r}")
+    return (settings.get('debounce_ms', DEFAULT_DEBOUNCE_MS) / 1000,
+            settings.get('poll_interval_ms', DEFAULT_POLL_INTERVAL_MS) / 1000, backend)
+
+
+def watch_roots(generator: BindingGenerator, config_file: Path) -> List[WatchRoot]:
+    """Everything a generation run reads: Nim sources, glue sources, config, tables, pruning sources."""
+    config = generator.config
+    files = [config_file.resolve(), tables_path(config, generator.base_dir).resolve()]
+    files.extend((generator.base_dir / path).resolve() for path in glue_sources(config))
+    files.extend((generator.base_dir / path).resolve() for path in config.data.get('frame_budget', {}).get('reports', []))
+    roots = [WatchRoot(generator.nim_dir.resolve(), "*.nim")]
+    roots.extend(WatchRoot(path.parent, path.name) for path in files)
+    prune = config.data.get('prune', {})
+    if prune.get('enabled', False):
+        for source in prune.get('sources', ['src', 'index.ts']):
+            path = (generator.base_dir / source).resolve()
+            if path.is_dir():
+                roots.extend(WatchRoot(path, pattern, recursive=True) for pattern in ("*.ts", "*.tsx", "*.js", "*.jsx"))
+            else:
+                roots.append(WatchRoot(path.parent, path.name))
+    return roots
+
+
+class PollingWatcher:
+    """Detects changes by comparing file stats every `interval` seconds."""
+
+    def __init__(self, roots: List[WatchRoot], interval: float):
+        self.roots = roots
+        self.interval = interval
+        self._stats = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        stats = {}
+        for root in self.roots:
+            for path in root.files():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Paths changed, created or deleted within `timeout` seconds (forever if None)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else max(0.0, deadline - time.monotonic())
+            time.sleep(min(self.interval, remaining))
+            stats = self._scan()
+            changed = {path for path in stats.keys() | self._stats.keys() if stats.get(path) != self._stats.get(path)}
+            self._stats = stats
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify on the watched directories, through libc (no extra dependency)."""
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots: List[WatchRoot]):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.roots = roots
+        self._dirs: Dict[int, Path] = {}
+        for root in roots:
+            directories = [root.directory] if root.directory.is_dir() else []
+            if root.recursive and directories:
+                directories.extend(path for path in root.directory.rglob("*") if path.is_dir())
+            for directory in directories:
+                self._add(directory)
+
+    def _add(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._dirs[wd] = directory
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Watched paths touched within `timeout` seconds (forever if None)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return set()
+            changed = self._read()
+            if changed:
+                return changed
+
+    def _read(self) -> Set[Path]:
+        data = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and any(
+                        root.recursive and (root.directory == path or root.directory in path.parents)
+                        for root in self.roots):
+                    self._add(path)
+                continue
+            if any(root.matches(path) for root in self.roots):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def file_watcher(roots: List[WatchRoot], config: GeneratorConfig):
+    """The configured watcher; `auto` prefers inotify and falls back to polling."""
+    _, interval, backend = watch_settings(config)
+    if backend != "poll":
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            if backend == "inotify" or sys.platform.startswith("linux"):
+                print(f"Warning: inotify unavailable ({e}); polling every {int(interval * 1000)} ms")
+    return PollingWatcher(roots, interval)
+
+
+def _digest(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+class WatchSession:
+    """Regenerates the bindings on every change until interrupted."""
+
+    def __init__(self, config_file: Path, configure: Callable[[GeneratorConfig], None]):
+        self.config_file = config_file.resolve()
+        self.configure = configure
+        self.generator: Optional[BindingGenerator] = None
+        self.watcher = None
+        self.roots: List[WatchRoot] = []
+        self._digests: Dict[Path, Optional[str]] = {}
+
+    def _load(self) -> bool:
+        """(Re)load the config and start from a fresh generator."""
+        try:
+            config = GeneratorConfig.from_file(self.config_file)
+            self.configure(config)
+            watch_settings(config)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {e}")
+            return False
+        # After the first run, cycles print their own one-line summary instead
+        quiet = self.generator is not None
+        self.generator = BindingGenerator(config)
+        self.generator.parse_cache = {}
+        self.generator.quiet = quiet
+        return True
+
+    def _rewatch(self) -> None:
+        if self.watcher is not None:
+            self.watcher.close()
+        self.roots = watch_roots(self.generator, self.config_file)
+        self.watcher = file_watcher(self.roots, self.generator.config)
+        self._snapshot()
+
+    def _snapshot(self) -> None:
+        """Remember watched contents, including files this cycle wrote itself (the glue module)."""
+        self._digests = {path: _digest(path) for root in self.roots for path in root.files()}
+
+    def _generate(self) -> bool:
+        generator = self.generator
+        try:
+            if not generator.discover_functions():
+                return False
+            generator.generate_all(compare_dispatch=False)
+        except Exception as e:
+            print(f"Error: {e}")
+            return False
+        return True
+
+    def run(self) -> int:
+        if not self._load():
+            return 1
+        if not self._generate():
+            return 1
+        self.generator.print_summary()
+        self.generator.quiet = True
+        self._rewatch()
+        debounce = watch_settings(self.generator.config)[0]
+        print(f"\nWatching {len(self._digests)} file(s) for changes (Ctrl-C to stop)...")
+        try:
+            while True:
+                changed = self.watcher.wait()
+                while True:
+                    more = self.watcher.wait(debounce)
+                    if not more:
+                        break
+                    changed |= more
+                changed = {path for path in changed if _digest(path) != self._digests.get(path)}
+                if changed:
+                    self._cycle(changed)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+        finally:
+            self.watcher.close()
+        return 0
+
+    def _cycle(self, changed: Set[Path]) -> None:
+        start = time.perf_counter()
+        names = ", ".join(sorted(path.name for path in changed))
+        reload = self.config_file in changed
+        if reload and not self._load():
+            self._snapshot()
+            return
+        ok = self._generate()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stamp = time.strftime("%H:%M:%S")
+        if ok:
+            generator = self.generator
+            hits = sum(cache.hits for cache in generator.fragment_caches)
+            misses = sum(cache.misses for cache in generator.fragment_caches)
+            print(f"[{stamp}] {names}: rewrote {len(generator.written_files)} of "
+                  f"{len(generator.generated_files)} file(s) in {elapsed_ms:.0f} ms "
+                  f"({misses} fragment(s) rendered, {hits} reused)")
+            for path in generator.written_files:
+                print(f"  {path.relative_to(generator.base_dir)}")
+        else:
+            print(f"[{stamp}] {names}: generation failed after {elapsed_ms:.0f} ms; keeping previous outputs")
+        if reload:
+            self._rewatch()
+        else:
+            self._snapshot()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Generate or check the bindings through a running generation server
+Falls back to the one-shot tools/generate_bindings.py when no server is
+listening; start one with `generate_bindings.py --server`
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from bindings.client import request, socket_path
+
+OPS = {"generate": [], "check": ["--check"]}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("op", choices=["generate", "check", "status", "stop"],
+                        help="generate: write the bindings; check: exit 1 if any output is stale; "
+                             "status / stop: query or stop the server")
+    parser.add_argument("--no-fallback", action="store_true",
+                        help="Fail instead of running the one-shot generator when no server is listening")
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    tools_dir = Path(__file__).parent
+    config_file = tools_dir / "generator_config.json"
+
+    try:
+        config_data = json.loads(config_file.read_text())
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    path = socket_path(config_data, tools_dir.parent)
+
+    try:
+        response = request(path, "ping" if args.op == "status" else "shutdown" if args.op == "stop" else args.op)
+    except (OSError, ValueError) as e:
+        print(f"Error: generation server at {path} did not answer: {e}")
+        return 1
+
+    if response is None:
+        if args.op in ("status", "stop"):
+            print(f"No generation server listening on {path}")
+            return 1 if args.op == "status" else 0
+        if args.no_fallback:
+            print(f"Error: no generation server listening on {path}")
+            return 1
+        # No server: run the one-shot generator in this process's place
+        script = str(tools_dir / "generate_bindings.py")
+        os.execv(sys.executable, [sys.executable, script, *OPS[args.op]])
+
+    sys.stdout.write(response.get("log", ""))
+    if not response.get("ok"):
+        print(f"Error: {response.get('error', 'generation failed')}")
+        return 1
+    if args.op == "status":
+        print(f"Generation server (pid {response['pid']}) listening on {path}")
+    elif args.op == "stop":
+        print("Generation server stopped")
+    elif args.op == "generate":
+        for written in response["written"]:
+            print(f"Generated {written}")
+        print(f"✅ {len(response['written'])} file(s) written, {response['unchanged']} unchanged "
+              f"({response['ms']:.0f} ms via generation server)")
+    else:
+        for stale in response["stale"]:
+            print(f"Stale: {stale}")
+        print(f"{len(response['stale'])} stale output(s)" if response["stale"] else "Bindings are up to date")
+        return 1 if response["stale"] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Concurrent native build driver for Nim -> React Native
+Runs Nim compilation per platform/ABI, binding generation and header copying
+as a task graph, with independent steps executed in parallel
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from bindings import GeneratorConfig, BindingGenerator
+from bindings.build import NativeBuildPipeline, TaskGraph, find_nim_lib_path, print_plan
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of tasks to run concurrently (default: CPU count)")
+    parser.add_argument("--platform", action="append", choices=["ios", "android"], dest="platforms",
+                        help="Platform to build (repeatable, default: all enabled in config)")
+    parser.add_argument("--abi", action="append", dest="abis",
+                        help="Android ABI to build (repeatable, default: cmake.android_abis)")
+    parser.add_argument("--build-profile",
+                        help="Build profile: debug, release, danger or one from build.profiles (default: build.profile)")
+    parser.add_argument("--nim-lib-path", type=Path,
+                        help="Directory containing nimbase.h (default: auto-detect)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print the task graph without running it")
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    config_file = Path(__file__).parent / "generator_config.json"
+
+    try:
+        config = GeneratorConfig.from_file(config_file)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.build_profile:
+        config.data.setdefault('build', {})['profile'] = args.build_profile
+
+    platforms = args.platforms
+    if not platforms:
+        platforms = []
+        # iOS artifacts can only be built on macOS hosts
+        if config.generate_ios and sys.platform == "darwin":
+            platforms.append("ios")
+        if config.generate_android:
+            platforms.append("android")
+
+    nim_lib_path = args.nim_lib_path or find_nim_lib_path()
+
+    try:
+        pipeline = NativeBuildPipeline(BindingGenerator(config), platforms,
+                                       android_abis=args.abis, nim_lib_path=nim_lib_path)
+        graph = pipeline.build_graph(TaskGraph(jobs=args.jobs))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.dry_run:
+        print_plan(graph)
+        return 0
+
+    start = time.perf_counter()
+    ok = graph.run()
+    graph.print_summary(time.perf_counter() - start)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
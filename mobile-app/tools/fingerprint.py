@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Spec-fingerprint gate for React Native codegen and pod install
+`check <step>` exits 0 when the step's last successful run is still current
+and 1 when it has to run; `record <step>` marks a successful run
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from bindings import GeneratorConfig, BindingGenerator
+from bindings.fingerprint import StepGate
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("action", choices=["check", "record"],
+                        help="check: exit 0 if the step can be skipped; record: stamp a successful run")
+    parser.add_argument("step", help="Gated step: codegen or pods")
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    config_file = Path(__file__).parent / "generator_config.json"
+
+    try:
+        config = GeneratorConfig.from_file(config_file)
+        generator = BindingGenerator(config)
+        gate = StepGate(config, generator.base_dir, generator.output_dir)
+        if args.action == "record":
+            gate.record(args.step)
+            return 0
+        reason = gate.stale_reason(args.step)
+    except (FileNotFoundError, ValueError) as e:
+        # Any doubt means running the step
+        print(f"Error: {e}")
+        return 1
+
+    if reason:
+        print(f"{args.step}: {reason}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
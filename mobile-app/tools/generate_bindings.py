@@ -4,29 +4,158 @@ Automatic binding generator for Nim -> React Native
 Parses Nim exported functions and generates all necessary bridge code
 """
 
+import argparse
+import sys
 from pathlib import Path
 from bindings import GeneratorConfig, BindingGenerator
+from bindings.batch import BatchGenerator
+from bindings.profiling import DEFAULT_PROFILE_DIR, Profiler
+from bindings.server import serve, stale_outputs
+from bindings.watch import WatchSession
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", action="append", type=Path, default=[], metavar="PATH",
+                        help="Generator config (repeatable, default: tools/generator_config.json); several "
+                             "configs, or one with `targets`, are generated in one run sharing the Nim parse")
+    parser.add_argument("--budget-report", action="append", type=Path, default=[], metavar="PATH",
+                        help="Sync budget report or benchmark output; functions whose p95 exceeds "
+                             "frame_budget.budget_ms get a Promise variant (repeatable)")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="Number of output files generated concurrently (default: generation.workers)")
+    parser.add_argument("--glue-only", action="store_true",
+                        help="Only regenerate the Nim export glue of the @bridge business procs")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate the affected outputs whenever the Nim sources "
+                             "or generator_config.json change")
+    parser.add_argument("--check", action="store_true",
+                        help="Generate in memory and exit 1 if any output on disk is stale; writes nothing")
+    parser.add_argument("--server", action="store_true",
+                        help="Serve generate/check requests from tools/bindings_client.py on a Unix socket, "
+                             "keeping the parsed sources warm")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="Record wall/CPU time and peak memory per phase into DIR/profile.json and a "
+                             f"Chrome trace DIR/trace.json (default DIR: <output_dir>/{DEFAULT_PROFILE_DIR})")
+    parser.add_argument("--profile-python", action="store_true",
+                        help="With --profile, also run cProfile (DIR/generation.prof) and report the hottest functions")
+    return parser.parse_args()
+
+
+def apply_overrides(config: GeneratorConfig, args) -> None:
+    """Apply the command line overrides to a freshly loaded config."""
+    if args.budget_report:
+        reports = config.data.setdefault('frame_budget', {}).setdefault('reports', [])
+        reports.extend(str(path.resolve()) for path in args.budget_report)
+
+    if args.jobs:
+        config.data.setdefault('generation', {})['workers'] = args.jobs
 
 
 def main():
     """Main entry point."""
-    config_file = Path(__file__).parent / "generator_config.json"
+    args = parse_args()
+    config_files = [path.resolve() for path in args.config] or [Path(__file__).parent / "generator_config.json"]
+    config_file = config_files[0]
+
+    if args.watch or args.server:
+        try:
+            batched = len(config_files) > 1 or len(GeneratorConfig.from_file(config_file).targets()) > 1
+        except (FileNotFoundError, ValueError):
+            batched = False  # reported by the watch session or the server
+        if batched:
+            print("Error: --watch and --server generate a single target; pass one --config without `targets`")
+            return 1
+
+    if args.watch:
+        return WatchSession(config_file, lambda config: apply_overrides(config, args)).run()
 
+    if args.server:
+        return serve(config_file, lambda config: apply_overrides(config, args))
+
+    profiler = Profiler(enabled=args.profile is not None, python=args.profile_python)
+    profiler.start()
     try:
-        config = GeneratorConfig.from_file(config_file)
+        with profiler.phase("config load", "config"):
+            configs = [target for path in config_files for target in GeneratorConfig.from_file(path).targets()]
     except (FileNotFoundError, ValueError) as e:
         print(f"Error: {e}")
         print("Please ensure generator_config.json exists and contains all required fields.")
         return
 
-    generator = BindingGenerator(config)
+    for config in configs:
+        apply_overrides(config, args)
+        if profiler.enabled and not args.jobs:
+            # tracemalloc keeps one peak per process, so per-phase peaks need one phase at a time
+            config.data.setdefault('generation', {})['workers'] = 1
 
-    if not generator.discover_functions():
-        return
+    if len(configs) > 1:
+        return generate_batch(configs, profiler, args)
+
+    generator = BindingGenerator(configs[0])
+    generator.profiler = profiler
+
+    if args.glue_only:
+        return 0 if generator.generate_glue() else 1
+
+    with profiler.phase("discovery", "discover"):
+        found = generator.discover_functions()
+    if not found:
+        return 1
+
+    if args.check:
+        stale = stale_outputs(generator.render())
+        for path in stale:
+            print(f"Stale: {path}")
+        print(f"{len(stale)} stale output(s)" if stale else "Bindings are up to date")
+        return 1 if stale else 0
 
-    generator.generate_all()
+    with profiler.phase("generation", "generate"):
+        generator.generate_all()
     generator.print_summary()
 
+    write_profile(profiler, args, generator.output_dir)
+
+
+def generate_batch(configs, profiler: Profiler, args) -> int:
+    """Generate several targets, parsing their shared Nim sources once."""
+    batch = BatchGenerator(configs, profiler)
+    try:
+        batch.validate()
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.glue_only:
+        return 0 if all([generator.generate_glue() for generator in batch.generators]) else 1
+
+    with profiler.phase("discovery", "discover"):
+        found = batch.discover_functions()
+    if not found:
+        return 1
+
+    if args.check:
+        stale = stale_outputs(batch.render())
+        for path in stale:
+            print(f"Stale: {path}")
+        print(f"{len(stale)} stale output(s)" if stale else "Bindings are up to date")
+        return 1 if stale else 0
+
+    with profiler.phase("generation", "generate"):
+        succeeded = batch.generate_all()
+    batch.print_summary()
+
+    write_profile(profiler, args, batch.generators[0].output_dir)
+    return 0 if succeeded else 1
+
+
+def write_profile(profiler: Profiler, args, output_dir: Path) -> None:
+    if profiler.enabled:
+        profiler.stop()
+        profiler.print_report()
+        for path in profiler.write(Path(args.profile) if args.profile else output_dir / DEFAULT_PROFILE_DIR):
+            print(f"Wrote {path}")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Profile-guided optimization for the Nim core library
+Builds an instrumented host binary, runs the training scenarios, merges the
+profile and installs it for the Android CMake and iOS clang builds
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from bindings import GeneratorConfig, BindingGenerator
+from bindings.build import TaskGraph, find_nim_lib_path, print_plan
+from bindings.pgo import PgoPipeline
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of tasks to run concurrently (default: CPU count)")
+    parser.add_argument("--scenarios", type=Path,
+                        help="Scenario file (default: pgo.scenarios from the config)")
+    parser.add_argument("--build-profile",
+                        help="Build profile to train and measure with (default: build.profile)")
+    parser.add_argument("--measure", action="store_true",
+                        help="Also time uninstrumented baseline and PGO-optimized host builds")
+    parser.add_argument("--nim-lib-path", type=Path,
+                        help="Directory containing nimbase.h (default: auto-detect)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print the task graph without running it")
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    tools_dir = Path(__file__).parent
+    config_file = tools_dir / "generator_config.json"
+
+    try:
+        config = GeneratorConfig.from_file(config_file)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.build_profile:
+        config.data.setdefault('build', {})['profile'] = args.build_profile
+    scenarios = args.scenarios or tools_dir.parent / config.data.get('pgo', {}).get('scenarios', 'tools/pgo_scenarios.json')
+
+    try:
+        pipeline = PgoPipeline(BindingGenerator(config), scenarios,
+                               nim_lib_path=args.nim_lib_path or find_nim_lib_path(), measure=args.measure)
+        graph = pipeline.build_graph(TaskGraph(jobs=args.jobs))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.dry_run:
+        print_plan(graph)
+        return 0
+
+    start = time.perf_counter()
+    ok = graph.run()
+    graph.print_summary(time.perf_counter() - start)
+    if ok:
+        pipeline.print_report()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
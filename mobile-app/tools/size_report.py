@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Per-export native code size and load-cost report
+Attributes the code, data and relocations of the built Android objects and
+libraries (ELF) to the exports of the bridge and compares them against a
+saved baseline
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from bindings import GeneratorConfig, BindingGenerator
+from bindings.elf import ElfError
+from bindings.size_report import (
+    DEFAULT_BASELINE, DEFAULT_MAX_GROWTH_BYTES, DEFAULT_MAX_GROWTH_PERCENT, SizeReport, diff_reports,
+    load_report, print_report, report_inputs,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--input", action="append", type=Path, dest="inputs",
+                        help="Object, archive or shared library to read (repeatable, default: size_report.inputs)")
+    parser.add_argument("--abi",
+                        help="Android ABI substituted into size_report.inputs (default: first of cmake.android_abis)")
+    parser.add_argument("--json", type=Path, help="Also write the report as JSON")
+    parser.add_argument("--baseline", type=Path,
+                        help=f"Baseline to compare against (default: size_report.baseline or {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write this report as the new baseline instead of comparing")
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_args()
+    config_file = Path(__file__).parent / "generator_config.json"
+
+    try:
+        config = GeneratorConfig.from_file(config_file)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    generator = BindingGenerator(config)
+    if not generator.discover_functions():
+        return 1
+
+    inputs = args.inputs or report_inputs(config, generator.base_dir, args.abi)
+    if not inputs:
+        print("Error: no built objects found; build the Android library first or pass --input")
+        return 1
+
+    report = SizeReport(generator.functions, config)
+    try:
+        for path in inputs:
+            report.add_input(path)
+    except (OSError, ElfError) as e:
+        print(f"Error: {e}")
+        return 1
+    result = report.build()
+    print_report(result)
+
+    if args.json:
+        args.json.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nWrote {args.json}")
+
+    settings = config.data.get('size_report', {})
+    baseline_path = args.baseline or generator.base_dir / settings.get('baseline', DEFAULT_BASELINE)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nSaved baseline {baseline_path}")
+        return 0
+
+    baseline = load_report(baseline_path)
+    if baseline is None:
+        print(f"\nNo baseline at {baseline_path} (save one with --save-baseline)")
+        return 0
+
+    diff = diff_reports(baseline, result,
+                        settings.get('max_growth_bytes', DEFAULT_MAX_GROWTH_BYTES),
+                        settings.get('max_growth_percent', DEFAULT_MAX_GROWTH_PERCENT))
+    print(f"\nCompared with {baseline_path}:")
+    for line in diff["changes"]:
+        print(f"  {line}")
+    for line in diff["regressions"]:
+        print(f"  ❌ {line}")
+    if not diff["changes"] and not diff["regressions"]:
+        print("  no changes")
+    if diff["regressions"]:
+        print(f"\n❌ {len(diff['regressions'])} size/load-cost regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ type
 
 proc createUser*(id: int, name: string, email: string): User =
   ## Create a new user object
+  ## @bridge
   return User(id: id, name: name, email: email, active: true)
 
 proc userToJson*(user: User): string =
@@ -22,4 +23,5 @@ proc userFromJson*(jsonStr: string): User =
 
 proc validateEmail*(email: string): bool =
   ## Simple email validation
+  ## @bridge
   return "@" in email and "." in email
@@ -10,6 +10,9 @@ proc fibonacci*(n: int): int =
 
 proc isPrime*(n: int): bool =
   ## Check if a number is prime
+  ## @bridge
+  ## @vectorize
+  ## @precompute(0..<1024)
   if n < 2:
     return false
   for i in 2..(n div 2):